@@ -3,6 +3,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .utils.database import init_db
+from .utils.config import get_settings
+from .utils.tasks import attach_metrics
 from .routes import router as api_router
 
 def create_app() -> FastAPI:
@@ -29,6 +31,10 @@ def create_app() -> FastAPI:
     # Include API routes
     app.include_router(api_router, prefix="/api")
     
+    @app.on_event("startup")
+    async def start_metrics():
+        attach_metrics(get_settings().METRICS_PORT)
+    
     return app
 
 # Create the application instance
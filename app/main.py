@@ -19,6 +19,7 @@ from typing import Optional
 from app.routes import pages, api
 from app.utils.config import get_settings
 from app.utils.database import init_db, engine
+from app.utils.tasks import attach_metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -91,6 +92,7 @@ async def root():
 async def startup():
     # Initialize database
     init_db()
+    attach_metrics(settings.METRICS_PORT)
     logger.info("Application startup complete")
 
 @app.on_event("shutdown")
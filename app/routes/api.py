@@ -1,8 +1,22 @@
-from fastapi import APIRouter, HTTPException, Request
+import json
+import logging
+from collections import OrderedDict
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import AsyncGenerator, AsyncIterator, List, Dict, Optional
 from datetime import datetime
 
+from app.utils.tasks import task_manager
+from src.audio_processing.timeline import LyricTimeline
+from src.exceptions import ProcessingError
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api")
 
 class SplitRequest(BaseModel):
@@ -19,6 +33,11 @@ class QueueItem(BaseModel):
 # In-memory storage for demo purposes
 processing_queue: Dict[str, QueueItem] = {}
 
+# (job id, language) -> (line timeline, word timeline) of recently synced jobs
+MAX_TIMELINES = 64
+timelines: "OrderedDict[tuple, tuple]" = OrderedDict()
+timeline_lookups = SingleFlight()
+
 @router.post("/split")
 async def process_audio(request: SplitRequest):
     """
@@ -72,3 +91,107 @@ async def get_status(url: str):
         "created_at": item.created_at.isoformat(),
         "updated_at": item.updated_at.isoformat()
     }
+
+async def _lyric_events(segments: AsyncGenerator, job_id: str) -> AsyncIterator[str]:
+    """Frame lyric segments as server-sent events, then "done" (or "error")"""
+    try:
+        async for segment in segments:
+            yield f"event: segment\ndata: {json.dumps(segment.to_dict())}\n\n"
+    except Exception as e:
+        logger.error(f"Lyrics stream for job {job_id} failed: {str(e)}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        return
+    finally:
+        # Stop transcribing as soon as the client goes away
+        await segments.aclose()
+    yield "event: done\ndata: {}\n\n"
+
+async def _job_vocals(job_id: str) -> str:
+    """Path of a finished job's vocals stem (HTTP 404/409 otherwise)"""
+    # The job lookup queries the database; keep it off the event loop
+    status = await run_in_threadpool(task_manager.get_job_status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    vocals = (status.get("stems") or {}).get("vocals")
+    if status.get("status") != "completed" or not vocals:
+        raise HTTPException(status_code=409, detail="Job has no vocals stem yet")
+    return vocals
+
+async def _job_timelines(job_id: str, language: str) -> tuple:
+    """Karaoke line and word timelines of a job, built once and kept"""
+    key = (job_id, language)
+    if key in timelines:
+        timelines.move_to_end(key)
+        return timelines[key]
+    # Players poll; concurrent polls of one job share a single lookup
+    return await timeline_lookups.do(key, lambda: _build_timelines(job_id, language))
+
+async def _build_timelines(job_id: str, language: str) -> tuple:
+    """Timelines from the job's cached lyrics (HTTP 409 until transcribed)"""
+    vocals = Path(await _job_vocals(job_id))
+
+    from src.audio_processing.lyrics_generator import LyricsGenerator
+
+    # Only ever served from the lyrics cache: transcribing is the stream's job
+    try:
+        segments = await LyricsGenerator().lookup_lyrics(vocals, language, vocals=vocals)
+    except ProcessingError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Vocals stem no longer exists")
+    if segments is None:
+        raise HTTPException(status_code=409, detail="Lyrics have not been transcribed yet")
+    lines = LyricTimeline.from_segments(segments).karaoke_lines()
+    built = timelines[(job_id, language)] = (lines, lines.estimate_words())
+    while len(timelines) > MAX_TIMELINES:
+        timelines.popitem(last=False)
+    return built
+
+@router.get("/jobs/{job_id}/lyrics/at")
+async def lyrics_at(
+    job_id: str,
+    t: float = Query(..., ge=0, description="Playback position in seconds"),
+    words: bool = False,
+    language: str = "en"
+):
+    """
+    Get the karaoke line (and optionally the word) active at a playback time
+
+    Players poll this instead of downloading the whole transcript. "next" is
+    the upcoming line, so a player knows when to ask again. Lyrics must have
+    been transcribed first (e.g. through the stream endpoint); until then
+    this answers 409.
+    """
+    lines, word_timeline = await _job_timelines(job_id, language)
+    index = lines.active(t)
+    upcoming = lines.next_after(t)
+    result = {
+        "t": t,
+        "line": lines.unit(index) if index is not None else None,
+        "next": lines.unit(upcoming) if upcoming is not None else None,
+    }
+    if words:
+        word = word_timeline.active(t)
+        result["word"] = word_timeline.unit(word) if word is not None else None
+    return result
+
+@router.get("/jobs/{job_id}/lyrics/stream")
+async def stream_lyrics(job_id: str, language: str = "en"):
+    """
+    Stream the synchronized lyrics of a finished job as server-sent events
+
+    Lines are transcribed from the job's vocals stem and pushed as soon as
+    each window decodes: one "segment" event per line ({text, start, end}),
+    then "done", or "error" if transcription fails midway.
+    """
+    vocals = Path(await _job_vocals(job_id))
+
+    from src.audio_processing.lyrics_generator import LyricsGenerator
+
+    segments = LyricsGenerator().stream_lyrics(vocals, language=language, vocals=vocals)
+    return StreamingResponse(
+        _lyric_events(segments, job_id),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,29 +1,62 @@
+import asyncio
 import os
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Union
 import logging
 
+import numpy as np
+
+from src.audio_processing.activity import clip_regions, separate_active
+from src.audio_processing.audio_io import AudioSource, DecodedAudio, load_pcm
+from src.audio_processing.backends import SeparationBackend, get_backend, select_stems
+from src.audio_processing.chunking import CrossfadeStitcher, WavStreamWriter, plan_around
+
 from .config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Separation backend and stems used when a request does not pick them
+SEPARATION_BACKEND = "demucs:htdemucs"
+DEFAULT_STEMS = ("instrumental", "vocals")
+
+# ffmpeg encoder arguments per output format
+CODECS: Dict[str, list] = {
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "192k"],
+    "flac": ["-c:a", "flac"],
+    "opus": ["-c:a", "libopus", "-b:a", "160k", "-ar", "48000"],  # Opus has no 44.1 kHz
+    "aac": ["-c:a", "aac", "-b:a", "192k"],
+    "m4a": ["-c:a", "aac", "-b:a", "192k"],
+    "wav": ["-c:a", "pcm_s16le"],
+}
+# Samples piped to an encoder per write; only this much of a stem is ever
+# converted to bytes at once
+ENCODE_BLOCK_SAMPLES = 1 << 16
+
 class AudioProcessor:
     """Handles audio processing tasks like downloading and splitting audio."""
     
     def __init__(self):
         self.output_dir = Path(settings.OUTPUT_FOLDER)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # One ffmpeg encoder per core at most, shared by all jobs
+        self._encode_slots = asyncio.Semaphore(os.cpu_count() or 1)
+        # Previews never queue behind full-track separations of other jobs
+        self._preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
     
     async def download_audio(self, url: str, output_path: Path) -> bool:
-        """Download audio from a YouTube URL."""
+        """Download the best audio stream of a YouTube URL as is.
+
+        The stream is not converted here; the pipeline decodes it exactly
+        once (see DecodedAudio), so an extra ffmpeg pass to WAV is wasted.
+        """
         try:
             cmd = [
                 "yt-dlp",
-                "-x",  # Extract audio
-                "--audio-format", "wav",
+                "-f", "bestaudio/best",
                 "-o", str(output_path),
                 url
             ]
@@ -46,68 +79,264 @@ class AudioProcessor:
             logger.error(f"Error downloading audio: {str(e)}")
             return False
     
-    async def split_audio(self, input_path: Path, output_dir: Path) -> Dict[str, Path]:
-        """Split audio into stems using Demucs."""
+    async def split_audio(
+        self,
+        input_path: AudioSource,
+        output_dir: Path,
+        backend: Optional[str] = SEPARATION_BACKEND,
+        stems: Optional[Iterable[str]] = DEFAULT_STEMS
+    ) -> Dict[str, Path]:
+        """Split audio into stems in process (vocals and instrumental by default).
+
+        The model is loaded once per process and reused, so a job only pays
+        for decoding and inference; `backend` picks Spleeter (fast) or
+        Demucs (best quality) per request. Only the requested stems are
+        written. `input_path` may be a DecodedAudio shared with other stages.
+        """
         try:
-            cmd = [
-                "demucs",
-                "--two-stems=vocals",
-                "-n", "htdemucs",
-                "-o", str(output_dir),
-                str(input_path)
-            ]
-            
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            separation = get_backend(backend)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._separate_to_files, input_path, output_dir, separation,
+                tuple(stems or DEFAULT_STEMS)
             )
-            
-            stdout, stderr = await result.communicate()
-            
-            if result.returncode != 0:
-                logger.error(f"Failed to split audio: {stderr.decode()}")
-                return {}
-            
-            # Return paths to the split stems
-            return {
-                "vocals": output_dir / "htdemucs" / f"{input_path.stem}" / "vocals.wav",
-                "instrumental": output_dir / "htdemucs" / f"{input_path.stem}" / "no_vocals.wav"
-            }
-            
         except Exception as e:
             logger.error(f"Error splitting audio: {str(e)}")
             return {}
+
+    async def separate_audio(
+        self,
+        input_path: AudioSource,
+        backend: Optional[str] = SEPARATION_BACKEND,
+        stems: Optional[Iterable[str]] = DEFAULT_STEMS,
+        start: int = 0,
+        length: Optional[int] = None,
+        priority: bool = False,
+        regions: Optional[list] = None
+    ) -> Dict[str, np.ndarray]:
+        """Split audio (or a window of it) into in-memory stems for encode_stems().
+
+        Silent stretches are not sent through the model and come back as
+        zeros.
+
+        Args:
+            start: First sample of the window to separate
+            length: Samples in the window (to the end by default)
+            priority: Run on the preview executor instead of the shared one
+            regions: Active regions of the whole input (see active_regions);
+                detected per window when omitted
+
+        Returns:
+            Mapping of stem name to (samples, 2) float32 audio at the
+            backend's sample rate, or {} on failure
+        """
+        try:
+            separation = get_backend(backend)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._preview_executor if priority else None,
+                self._separate, input_path, separation, tuple(stems or DEFAULT_STEMS),
+                start, length, regions
+            )
+        except Exception as e:
+            logger.error(f"Error splitting audio: {str(e)}")
+            return {}
+
+    async def separate_around(
+        self,
+        input_path: AudioSource,
+        preview: Dict[str, np.ndarray],
+        start: int,
+        backend: Optional[str] = SEPARATION_BACKEND,
+        stems: Optional[Iterable[str]] = DEFAULT_STEMS,
+        overlap: int = 44100,
+        regions: Optional[list] = None
+    ) -> Dict[str, np.ndarray]:
+        """Complete full-length stems around an already separated preview window.
+
+        Only the audio before and after the preview goes through the model;
+        the three parts are crossfaded together, so publishing a preview
+        first adds no separation work.
+
+        Args:
+            input_path: Audio the preview was cut from
+            preview: Stems of the window starting at `start`
+            start: First sample of the preview window
+            overlap: Samples crossfaded at each seam
+            regions: Active regions of the whole input
+
+        Returns:
+            Full-length stems, or {} on failure
+        """
+        try:
+            waveform = self._load(input_path, get_backend(backend).sample_rate)
+            length = len(next(iter(preview.values())))
+            parts = []
+            for part_start, part_length in plan_around(len(waveform), start, length, overlap):
+                if part_start == start:
+                    parts.append(preview)
+                    continue
+                part = await self.separate_audio(
+                    input_path, backend, stems, part_start, part_length, regions=regions
+                )
+                if not part:
+                    return {}
+                parts.append(part)
+
+            pieces: Dict[str, list] = {}
+            stitcher = CrossfadeStitcher(
+                overlap, lambda name, samples: pieces.setdefault(name, []).append(samples)
+            )
+            for part in parts:
+                stitcher.push(part)
+            stitcher.finish()
+            return {name: np.concatenate(chunks) for name, chunks in pieces.items()}
+        except Exception as e:
+            logger.error(f"Error splitting audio: {str(e)}")
+            return {}
+
+    @staticmethod
+    def _load(input_path: AudioSource, sample_rate: int) -> np.ndarray:
+        """Stereo PCM of a file or decoded buffer at the given rate."""
+        if isinstance(input_path, DecodedAudio):
+            return input_path.at(sample_rate, 2)
+        return load_pcm(input_path, sample_rate=sample_rate)
+
+    @classmethod
+    def _separate(
+        cls,
+        input_path: AudioSource,
+        backend: SeparationBackend,
+        stems: tuple,
+        start: int = 0,
+        length: Optional[int] = None,
+        regions: Optional[list] = None
+    ) -> Dict[str, np.ndarray]:
+        """Separate a file or decoded buffer (or a window of it) into the requested stems."""
+        waveform = cls._load(input_path, backend.sample_rate)
+        end = min(len(waveform), len(waveform) if length is None else start + length)
+        if regions is not None:
+            regions = clip_regions(regions, start, end)
+        separated = separate_active(
+            backend.separate, waveform[start:end], backend.sample_rate, regions
+        )
+        return select_stems(separated, stems)
+
+    @classmethod
+    def _separate_to_files(
+        cls,
+        input_path: AudioSource, output_dir: Path, backend: SeparationBackend, stems: tuple
+    ) -> Dict[str, Path]:
+        """Separate a file or decoded buffer and write one WAV per requested stem."""
+        source = Path(input_path.path if isinstance(input_path, DecodedAudio) else input_path)
+        outputs = cls._separate(input_path, backend, stems)
+
+        stem_dir = output_dir / source.stem
+        stem_dir.mkdir(parents=True, exist_ok=True)
+        paths = {}
+        for name, samples in outputs.items():
+            paths[name] = stem_dir / f"{name}.wav"
+            with WavStreamWriter(str(paths[name]), backend.sample_rate, samples.shape[1]) as writer:
+                writer.write(samples)
+        return paths
     
     async def convert_format(self, input_path: Path, output_format: str) -> Optional[Path]:
         """Convert audio file to the specified format."""
+        output_path = input_path.with_suffix(f".{output_format}")
+        if await self.encode(input_path, output_path, output_format):
+            return output_path
+        return None
+
+    async def encode_stems(
+        self,
+        stems: Dict[str, Union[Path, np.ndarray]],
+        output_format: str,
+        destinations: Dict[str, Path],
+        sample_rate: int = 44100
+    ) -> Dict[str, Path]:
+        """Encode every stem concurrently, straight to its final location.
+
+        Args:
+            stems: Stem name to audio file, or to (samples, channels) float32
+                audio piped to ffmpeg without an intermediate WAV
+            output_format: One of CODECS
+            destinations: Stem name to final output path
+            sample_rate: Sample rate of in-memory stems
+
+        Returns:
+            Stem name to encoded path for the stems that succeeded
+        """
+        names = list(stems)
+        encoded = await asyncio.gather(*(
+            self.encode(stems[name], destinations[name], output_format, sample_rate)
+            for name in names
+        ))
+        return {name: destinations[name] for name, ok in zip(names, encoded) if ok}
+
+    @staticmethod
+    async def _feed(stdin: asyncio.StreamWriter, samples: np.ndarray) -> None:
+        """Pipe float32 PCM to an encoder block by block, then close its input."""
         try:
-            output_path = input_path.with_suffix(f".{output_format}")
-            
-            cmd = [
-                "ffmpeg",
-                "-i", str(input_path),
-                "-vn",
-                "-ar", "44100",
-                "-ac", "2",
-                "-b:a", "192k",
-                "-y",  # Overwrite output file if it exists
-                str(output_path)
-            ]
-            
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            await result.communicate()
-            
+            for start in range(0, len(samples), ENCODE_BLOCK_SAMPLES):
+                block = samples[start:start + ENCODE_BLOCK_SAMPLES]
+                stdin.write(np.ascontiguousarray(block, dtype="<f4").tobytes())
+                await stdin.drain()
+            stdin.close()
+            await stdin.wait_closed()
+        except (BrokenPipeError, ConnectionResetError):
+            # The encoder exited early; its exit status reports why
+            stdin.close()
+
+    async def encode(
+        self,
+        source: Union[Path, np.ndarray],
+        output_path: Path,
+        output_format: str,
+        sample_rate: int = 44100
+    ) -> bool:
+        """Encode a file or in-memory audio with ffmpeg (CPU-bounded)."""
+        codec = CODECS.get(output_format)
+        if codec is None:
+            logger.error(f"Unsupported output format: {output_format}")
+            return False
+
+        piped = isinstance(source, np.ndarray)
+        if piped:
+            channels = source.shape[1] if source.ndim > 1 else 1
+            inputs = ["-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0"]
+        else:
+            inputs = ["-i", str(source)]
+
+        cmd = [
+            "ffmpeg", "-nostdin", "-v", "error",
+            *inputs,
+            "-vn",
+            *([] if "-ar" in codec else ["-ar", "44100"]),
+            "-ac", "2",
+            *codec,
+            "-y",  # Overwrite output file if it exists
+            str(output_path)
+        ]
+        try:
+            async with self._encode_slots:
+                result = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.PIPE if piped else asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                # Drain stderr while feeding stdin so neither pipe can stall ffmpeg
+                errors = asyncio.ensure_future(result.stderr.read())
+                if piped:
+                    await self._feed(result.stdin, source)
+                stderr = await errors
+                await result.wait()
+
             if result.returncode != 0 or not output_path.exists():
-                return None
-                
-            return output_path
-            
+                logger.error(f"Failed to encode {output_path.name}: {stderr.decode(errors='replace')}")
+                return False
+            return True
+
         except Exception as e:
             logger.error(f"Error converting audio format: {str(e)}")
-            return None
+            return False
@@ -34,6 +34,9 @@ class Settings(BaseSettings):
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
     
+    # Prometheus metrics server
+    METRICS_PORT: int = 8001
+    
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
     
     @property
@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, func
+import logging
+
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Float, DateTime, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 from contextlib import contextmanager
@@ -14,9 +16,38 @@ SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bi
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
 def init_db():
     """Initialize the database."""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+
+def add_missing_columns(bind=engine):
+    """Add model columns missing from existing tables.
+
+    create_all() never alters a table that already exists, so columns added
+    to a model later (e.g. preview_status) are added here. Idempotent, and
+    limited to nullable columns, which old rows can leave empty.
+    """
+    inspector = inspect(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                logger.warning(f"Cannot add NOT NULL column {table.name}.{column.name} in place")
+                continue
+            logger.info(f"Adding column {table.name}.{column.name}")
+            with bind.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                    f"{column.type.compile(dialect=bind.dialect)}"
+                ))
 
 @contextmanager
 def get_db() -> Generator:
@@ -37,6 +68,11 @@ class ProcessingJob(Base):
     status = Column(String, default="queued", nullable=False)
     progress = Column(Float, default=0.0, nullable=False)
     format = Column(String, default="mp3", nullable=False)
+    # Status of the short preview published before the full result
+    preview_status = Column(String, default="pending", nullable=True)
+    # Separation backend and "+"-joined stems; with format they key the artifacts
+    backend = Column(String, nullable=True)
+    requested_stems = Column(String, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
@@ -47,9 +83,12 @@ class ProcessingJob(Base):
             "status": self.status,
             "progress": self.progress,
             "format": self.format,
+            "preview_status": self.preview_status,
+            "backend": self.backend,
+            "requested_stems": self.requested_stems.split("+") if self.requested_stems else None,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
 
 # Initialize database tables
-Base.metadata.create_all(bind=engine)
+init_db()
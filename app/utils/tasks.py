@@ -1,24 +1,105 @@
 import asyncio
+import tempfile
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, Optional, Callable, Awaitable
+from typing import Dict, Any, Optional, Callable, Awaitable, Iterable, Tuple
 from pathlib import Path
 import logging
 
+from utils.cache import init_cache, get_cached_stems, cache_stems
+from utils.fingerprint import canonical_url
+from src.audio_processing.activity import active_regions, inactive_seconds
+from src.audio_processing.audio_io import DecodedAudio
+from src.audio_processing.backends import (
+    STEM_MODELS, backend_for_stems, get_backend, normalize_stems
+)
+from src.audio_processing.chunking import loudest_window
+
 from .database import ProcessingJob, get_db
-from .audio_processor import AudioProcessor
+from .audio_processor import AudioProcessor, DEFAULT_STEMS, SEPARATION_BACKEND
 
 logger = logging.getLogger(__name__)
 
+# Default backend used by AudioProcessor.split_audio; part of the artifact cache key
+SEPARATION_MODEL = SEPARATION_BACKEND
+
+# Preview published before the full stems: its length, where it is taken
+# from ("start" or "loudest", a cheap chorus guess) and the seam crossfade
+PREVIEW_SECONDS = 30.0
+PREVIEW_MODE = "start"
+PREVIEW_OVERLAP_SECONDS = 1.0
+# Finished jobs whose results, previews and timings are kept in memory;
+# older results are still found through the artifact store
+MAX_TRACKED_JOBS = 256
+
+
+def artifact_model(
+    output_format: str, backend: str = SEPARATION_MODEL, stems: Tuple[str, ...] = DEFAULT_STEMS
+) -> str:
+    """Cache model key for final stems produced by a backend in a given format."""
+    return f"{backend}:{output_format}:{'+'.join(stems)}"
+
+
+def job_artifact_model(job: ProcessingJob) -> str:
+    """Artifact cache key of a job, from the settings stored on it.
+
+    Jobs created before backend and stems were stored used the defaults.
+    """
+    stems = tuple(job.requested_stems.split("+")) if job.requested_stems else DEFAULT_STEMS
+    return artifact_model(job.format, job.backend or SEPARATION_MODEL, stems)
+
+
+def resolve_separation(
+    backend: Optional[str], stems: Optional[Iterable[str]]
+) -> Tuple[str, Tuple[str, ...]]:
+    """Pick the backend for a request and normalise its stem list.
+
+    A bare family ("spleeter", "demucs") or no backend at all resolves to
+    the cheapest model of that family producing the requested stems, e.g.
+    "spleeter:2stems" for an instrumental-only request.
+    """
+    stems = normalize_stems(stems) or DEFAULT_STEMS
+    if backend is None or backend in STEM_MODELS:
+        backend = backend_for_stems(stems, backend or SEPARATION_MODEL.split(":")[0])
+    return backend, stems
+
 
 class TaskManager:
     """Manages background tasks for audio processing."""
     
-    def __init__(self):
+    def __init__(self, metrics: Optional[Any] = None):
         self.tasks: Dict[str, asyncio.Task] = {}
         self.audio_processor = AudioProcessor()
+        # Optional src.utils.monitoring.Metrics receiving stage timings
+        self.metrics = metrics
+        # job id -> {stage: seconds} plus seconds of silence skipped
+        self.timings: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        # (canonical URL, format, backend, stems) -> id of the job currently processing it
+        self.inflight: Dict[Tuple[str, str, str, Tuple[str, ...]], str] = {}
+        # job id -> {stem: path} of finished jobs
+        self.results: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        # job id -> {stem: path} of published previews
+        self.previews: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+
+    @staticmethod
+    def _remember(table: "OrderedDict[str, Any]", job_id: str, value: Any) -> Any:
+        """Store a per-job entry, dropping the oldest beyond MAX_TRACKED_JOBS."""
+        table[job_id] = value
+        table.move_to_end(job_id)
+        while len(table) > MAX_TRACKED_JOBS:
+            table.popitem(last=False)
+        return value
     
-    async def process_audio_task(self, job_id: str, url: str, output_format: str):
+    async def process_audio_task(
+        self,
+        job_id: str,
+        url: str,
+        output_format: str,
+        backend: str = SEPARATION_MODEL,
+        stems: Tuple[str, ...] = DEFAULT_STEMS
+    ):
         """Background task to process audio."""
         db = next(get_db())
         try:
@@ -36,8 +117,8 @@ class TaskManager:
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_path = Path(temp_dir)
                 
-                # Download audio
-                audio_path = temp_path / "audio.wav"
+                # Download audio (original stream, decoded once below)
+                audio_path = temp_path / "audio.src"
                 if not await self.audio_processor.download_audio(url, audio_path):
                     job.status = "failed"
                     job.progress = 0
@@ -47,9 +128,18 @@ class TaskManager:
                 job.progress = 0.3
                 db.commit()
                 
-                # Split audio
-                stems = await self.audio_processor.split_audio(audio_path, temp_path)
-                if not stems:
+                # Decode once into a shared buffer, then split audio in memory
+                loop = asyncio.get_running_loop()
+                started = time.perf_counter()
+                decoded = await loop.run_in_executor(
+                    None, lambda: DecodedAudio.decode(audio_path, buffer_dir=temp_dir)
+                )
+                self._record_stage(job_id, "decode", time.perf_counter() - started)
+                with decoded:
+                    split = await self._separate_with_preview(
+                        db, job, decoded, output_format, backend, stems
+                    )
+                if not split:
                     job.status = "failed"
                     job.progress = 0
                     db.commit()
@@ -58,24 +148,29 @@ class TaskManager:
                 job.progress = 0.7
                 db.commit()
                 
-                # Convert to desired format if needed
-                output_paths = {}
-                for stem_name, stem_path in stems.items():
-                    if output_format != "wav":
-                        converted_path = await self.audio_processor.convert_format(
-                            stem_path, output_format
-                        )
-                        if converted_path:
-                            output_paths[stem_name] = converted_path
-                    else:
-                        output_paths[stem_name] = stem_path
-                
-                # Move files to final location
-                final_paths = {}
-                for stem_name, stem_path in output_paths.items():
-                    final_path = self.audio_processor.output_dir / f"{job_id}_{stem_name}.{output_format}"
-                    stem_path.rename(final_path)
-                    final_paths[stem_name] = final_path
+                # Encode all stems concurrently, straight to their final location
+                destinations = {
+                    stem_name: self.audio_processor.output_dir / f"{job_id}_{stem_name}.{output_format}"
+                    for stem_name in split
+                }
+                started = time.perf_counter()
+                encoded = await self.audio_processor.encode_stems(
+                    split, output_format, destinations, get_backend(backend).sample_rate
+                )
+                self._record_stage(job_id, "encode", time.perf_counter() - started)
+                if len(encoded) != len(split):
+                    job.status = "failed"
+                    job.progress = 0
+                    db.commit()
+                    return
+                final_paths = {stem_name: str(path) for stem_name, path in encoded.items()}
+
+                # Publish to the artifact store so later requests skip the work
+                self._remember(self.results, job_id, final_paths)
+                cache_stems(
+                    url, final_paths, init_cache(),
+                    model=artifact_model(output_format, backend, stems)
+                )
                 
                 job.progress = 1.0
                 job.status = "completed"
@@ -89,25 +184,155 @@ class TaskManager:
         finally:
             db.close()
     
-    async def create_job(self, url: str, output_format: str = "mp3") -> Optional[str]:
-        """Create a new processing job."""
+    async def _separate_with_preview(
+        self,
+        db,
+        job: ProcessingJob,
+        decoded: DecodedAudio,
+        output_format: str,
+        backend: str,
+        stems: Tuple[str, ...]
+    ) -> Dict[str, Any]:
+        """Publish a preview of the first (or loudest) seconds, then finish the track.
+
+        The preview window is separated at high priority and encoded right
+        away; the rest of the track is then separated around it and the
+        preview's stems are reused, so no audio is separated twice.
+        """
+        job_id = str(job.id)
+        started = time.perf_counter()
+        sample_rate = get_backend(backend).sample_rate
+        length = int(PREVIEW_SECONDS * sample_rate)
+        # Whole-track passes; kept off the event loop like the decode
+        total, start, regions, skipped = await asyncio.get_running_loop().run_in_executor(
+            None, self._analyse, decoded, sample_rate, length
+        )
+
+        preview = await self.audio_processor.separate_audio(
+            decoded, backend, stems, start, length, priority=True, regions=regions
+        )
+        if not preview:
+            job.preview_status = "failed"
+            db.commit()
+            split = await self.audio_processor.separate_audio(
+                decoded, backend, stems, regions=regions
+            )
+            self._record_stage(job_id, "separate", time.perf_counter() - started, skipped)
+            return split
+
+        destinations = {
+            stem_name: self.audio_processor.output_dir / f"{job_id}_preview_{stem_name}.{output_format}"
+            for stem_name in preview
+        }
+        encoded = await self.audio_processor.encode_stems(
+            preview, output_format, destinations, sample_rate
+        )
+        if len(encoded) == len(preview):
+            self._remember(
+                self.previews, job_id,
+                {stem_name: str(path) for stem_name, path in encoded.items()}
+            )
+            job.preview_status = "ready"
+            logger.info(f"Published {PREVIEW_SECONDS:.0f}s preview for job {job_id}")
+        else:
+            job.preview_status = "failed"
+        job.progress = 0.4
+        db.commit()
+
+        if start == 0 and length >= total:
+            split = preview
+        else:
+            split = await self.audio_processor.separate_around(
+                decoded, preview, start, backend, stems,
+                overlap=int(PREVIEW_OVERLAP_SECONDS * sample_rate),
+                regions=regions
+            )
+        self._record_stage(job_id, "separate", time.perf_counter() - started, skipped)
+        return split
+
+    @staticmethod
+    def _analyse(
+        decoded: DecodedAudio, sample_rate: int, length: int
+    ) -> Tuple[int, int, list, float]:
+        """Length, preview start, voiced regions and silent seconds of a track (blocking)."""
+        samples = decoded.at(sample_rate, 2)
+        start = loudest_window(samples, length) if PREVIEW_MODE == "loudest" else 0
+        # One activity pass for the whole track; silent stretches skip the model
+        regions = active_regions(samples, sample_rate)
+        return len(samples), start, regions, inactive_seconds(regions, len(samples), sample_rate)
+
+    def _record_stage(
+        self, job_id: str, stage: str, duration: float, skipped: float = 0.0
+    ) -> None:
+        """Keep a stage timing on the job and report it to metrics."""
+        timings = self.timings.get(job_id)
+        if timings is None:
+            timings = self._remember(self.timings, job_id, {})
+        timings[stage] = round(duration, 3)
+        if skipped:
+            timings["silence_skipped"] = round(skipped, 3)
+            logger.info(f"Job {job_id}: {skipped:.1f}s of silence skipped in {stage}")
+        if self.metrics is not None:
+            self.metrics.track_stage(stage, duration, skipped)
+
+    async def create_job(
+        self,
+        url: str,
+        output_format: str = "mp3",
+        backend: Optional[str] = None,
+        stems: Optional[Iterable[str]] = None
+    ) -> Optional[str]:
+        """Create a new processing job.
+
+        A request for a track, format and backend that is already being
+        processed attaches to the running job, and one whose stems are
+        already in the artifact store gets a completed job without any
+        processing. `backend` selects the separator, e.g. "spleeter" for
+        speed or "demucs:htdemucs" for quality, and `stems` the outputs
+        (vocals and instrumental by default); fewer stems can mean a
+        cheaper model and always mean less to encode and store.
+        """
+        backend, stems = resolve_separation(backend, stems)
+        key = (canonical_url(url), output_format, backend, stems)
+        inflight_id = self.inflight.get(key)
+        if inflight_id is not None:
+            logger.info(f"Attaching request for {url} to in-flight job {inflight_id}")
+            return inflight_id
+
+        cached = get_cached_stems(
+            url, init_cache(), model=artifact_model(output_format, backend, stems)
+        )
+
         db = next(get_db())
         try:
             job = ProcessingJob(
                 url=url,
-                status="queued",
+                status="completed" if cached else "queued",
                 format=output_format,
-                progress=0.0
+                progress=1.0 if cached else 0.0,
+                preview_status="skipped" if cached else "pending",
+                backend=backend,
+                requested_stems="+".join(stems)
             )
             db.add(job)
             db.commit()
             db.refresh(job)
+            job_id = str(job.id)
+
+            if cached:
+                logger.info(f"Serving {url} from the artifact store as job {job_id}")
+                self._remember(self.results, job_id, cached)
+                return job_id
             
             # Start processing task
-            task = asyncio.create_task(self.process_audio_task(str(job.id), url, output_format))
-            self.tasks[str(job.id)] = task
+            task = asyncio.create_task(
+                self.process_audio_task(job_id, url, output_format, backend, stems)
+            )
+            self.tasks[job_id] = task
+            self.inflight[key] = job_id
+            task.add_done_callback(lambda _: self._finish_flight(key, job_id))
             
-            return str(job.id)
+            return job_id
             
         except Exception as e:
             logger.error(f"Error creating job: {str(e)}")
@@ -117,15 +342,30 @@ class TaskManager:
         finally:
             db.close()
     
+    def _finish_flight(self, key: Tuple, job_id: str) -> None:
+        """Release the in-flight slot and task handle of a finished job."""
+        self.tasks.pop(job_id, None)
+        if self.inflight.get(key) == job_id:
+            del self.inflight[key]
+
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get the status of a job."""
+        """Get the status of a job, with its preview and stems once available."""
         db = next(get_db())
         try:
             job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
             if not job:
                 return None
                 
-            return job.to_dict()
+            status = job.to_dict()
+            if job_id in self.previews:
+                status["preview"] = self.previews[job_id]
+            if job_id in self.timings:
+                status["timings"] = self.timings[job_id]
+            if job.status == "completed":
+                status["stems"] = self.results.get(job_id) or get_cached_stems(
+                    job.url, init_cache(), model=job_artifact_model(job)
+                )
+            return status
             
         finally:
             db.close()
@@ -142,3 +382,18 @@ class TaskManager:
 
 # Global task manager instance
 task_manager = TaskManager()
+
+
+def attach_metrics(port: int) -> None:
+    """Report the task manager's stage timings (and silence skipped) to Prometheus.
+
+    Called at application startup rather than import, so importing the app
+    never binds the metrics port.
+    """
+    try:
+        from src.utils.monitoring import get_metrics
+
+        task_manager.metrics = get_metrics(port)
+        logger.info(f"Reporting job stage metrics on port {port}")
+    except (ImportError, OSError) as e:
+        logger.warning(f"Job stage metrics disabled: {str(e)}")
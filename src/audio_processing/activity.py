@@ -0,0 +1,201 @@
+"""
+activity.py ───────────────────────────────────────────────────────────────────
+Summary: Vectorized RMS activity detection to skip silent audio
+ModLog : 2026-10-18 Initial implementation
+         2026-10-18 Pack regions into bounded chunks and map positions back
+"""
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# RMS is measured over frames of this length
+FRAME_SECONDS = 0.05
+# Frames quieter than this (dBFS) count as silent
+SILENCE_DB = -50.0
+# Only silences at least this long are skipped; shorter gaps stay active
+MIN_SILENCE_SECONDS = 2.0
+# Audio kept on each side of an active region so onsets and decays survive
+PAD_SECONDS = 0.25
+
+Region = Tuple[int, int]
+
+
+def frame_rms(samples: np.ndarray, frame: int) -> np.ndarray:
+    """
+    Root-mean-square level of consecutive frames
+
+    Args:
+        samples: (samples, channels) or (samples,) PCM
+        frame: Samples per frame; a short last frame is zero-padded
+
+    Returns:
+        One RMS value per frame
+    """
+    mono = samples if samples.ndim == 1 else samples.mean(axis=1)
+    remainder = len(mono) % frame
+    if remainder:
+        mono = np.concatenate([mono, np.zeros(frame - remainder, dtype=mono.dtype)])
+    frames = mono.reshape(-1, frame).astype(np.float64)
+    return np.sqrt(np.mean(np.square(frames), axis=1))
+
+
+def active_regions(
+    samples: np.ndarray,
+    sample_rate: int,
+    threshold_db: float = SILENCE_DB,
+    min_silence: float = MIN_SILENCE_SECONDS,
+    pad: float = PAD_SECONDS
+) -> List[Region]:
+    """
+    Find the parts of a recording that are not silent
+
+    Args:
+        samples: (samples, channels) or (samples,) PCM in [-1, 1]
+        sample_rate: Sample rate of the PCM
+        threshold_db: Level (dBFS) below which a frame is silent
+        min_silence: Shortest silence, in seconds, that is skipped
+        pad: Seconds of context kept around each active region
+
+    Returns:
+        Sorted, non-overlapping (start, end) sample ranges; [] if the
+        whole recording is silent
+    """
+    total = len(samples)
+    if total == 0:
+        return []
+    frame = max(1, int(FRAME_SECONDS * sample_rate))
+    quiet = 20 * np.log10(frame_rms(samples, frame) + 1e-10) <= threshold_db
+    n_frames = len(quiet)
+
+    edges = np.diff(np.concatenate([[0], quiet.astype(np.int8), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    long = (ends - starts) >= max(1, int(min_silence / FRAME_SECONDS))
+    starts, ends = starts[long], ends[long]
+
+    # Shrink silences by the pad, except where they touch the track edges
+    pad_frames = int(pad / FRAME_SECONDS)
+    starts = np.where(starts == 0, 0, starts + pad_frames)
+    ends = np.where(ends == n_frames, n_frames, ends - pad_frames)
+    keep = ends > starts
+    bounds = np.concatenate([[0], np.column_stack([starts[keep], ends[keep]]).ravel(), [n_frames]])
+
+    return [
+        (int(start) * frame, min(int(end) * frame, total))
+        for start, end in bounds.reshape(-1, 2)
+        if end > start
+    ]
+
+
+def clip_regions(regions: List[Region], start: int, end: int) -> List[Region]:
+    """Restrict regions to [start, end) and make them relative to start"""
+    return [
+        (max(s, start) - start, min(e, end) - start)
+        for s, e in regions
+        if e > start and s < end
+    ]
+
+
+def inactive_seconds(regions: List[Region], total: int, sample_rate: int) -> float:
+    """Seconds of a recording of `total` samples outside the regions"""
+    return (total - sum(end - start for start, end in regions)) / sample_rate
+
+
+def pack_regions(regions: List[Region], max_length: int) -> List[List[Region]]:
+    """
+    Group consecutive regions into chunks holding at most max_length samples
+
+    A region is only split when it is longer than max_length on its own;
+    otherwise it starts a new chunk when it does not fit in the current one.
+
+    Args:
+        regions: Sorted (start, end) sample ranges
+        max_length: Samples of audio allowed per chunk
+
+    Returns:
+        Chunks, each a list of regions whose lengths sum to <= max_length
+    """
+    chunks: List[List[Region]] = []
+    current: List[Region] = []
+    used = 0
+    for start, end in regions:
+        for piece in range(start, end, max_length):
+            piece_end = min(piece + max_length, end)
+            if current and used + piece_end - piece > max_length:
+                chunks.append(current)
+                current, used = [], 0
+            current.append((piece, piece_end))
+            used += piece_end - piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def gather_regions(samples: np.ndarray, regions: List[Region]) -> np.ndarray:
+    """Concatenate the given regions of a recording, dropping everything else"""
+    if not regions:
+        return samples[:0]
+    return np.concatenate([samples[start:end] for start, end in regions])
+
+
+def source_positions(
+    positions: np.ndarray, regions: List[Region], side: str = "right"
+) -> np.ndarray:
+    """
+    Map sample positions in gather_regions() output back to the recording
+
+    Args:
+        positions: Positions in the gathered audio
+        regions: Regions that were gathered
+        side: At a boundary between two regions, "right" maps to the start
+            of the later one (use for onsets), "left" to the end of the
+            earlier one (use for ends)
+
+    Returns:
+        Positions in the original recording
+    """
+    starts = np.array([start for start, _ in regions], dtype=np.float64)
+    lengths = np.array([end - start for start, end in regions], dtype=np.float64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    positions = np.clip(np.asarray(positions, dtype=np.float64), 0, offsets[-1])
+    index = np.clip(np.searchsorted(offsets, positions, side=side) - 1, 0, len(regions) - 1)
+    return starts[index] + positions - offsets[index]
+
+
+def separate_active(
+    separate: Callable[[np.ndarray], Mapping[str, np.ndarray]],
+    waveform: np.ndarray,
+    sample_rate: int,
+    regions: Optional[List[Region]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Separate only the active regions of a waveform, leaving zeros elsewhere
+
+    Args:
+        separate: Separation function (e.g. SeparationBackend.separate)
+        waveform: (samples, channels) PCM
+        sample_rate: Sample rate of the PCM
+        regions: Precomputed active regions (detected when omitted)
+
+    Returns:
+        Mapping of stem name to full-length (samples, channels) audio
+    """
+    total = len(waveform)
+    if regions is None:
+        regions = active_regions(waveform, sample_rate)
+    if total == 0 or regions == [(0, total)]:
+        return dict(separate(waveform))
+    if not regions:
+        # Nothing to separate; one short pass just to learn the stem layout
+        probe = separate(waveform[:min(total, sample_rate)])
+        return {
+            name: np.zeros((total,) + data.shape[1:], dtype=np.float32)
+            for name, data in probe.items()
+        }
+
+    stems: Dict[str, np.ndarray] = {}
+    for start, end in regions:
+        for name, data in separate(waveform[start:end]).items():
+            if name not in stems:
+                stems[name] = np.zeros((total,) + data.shape[1:], dtype=np.float32)
+            stems[name][start:start + min(len(data), end - start)] = data[:end - start]
+    return stems
@@ -0,0 +1,489 @@
+"""
+audio_io.py ───────────────────────────────────────────────────────────────────
+Summary: Decode audio files to NumPy PCM through ffmpeg
+ModLog : 2026-10-18 Initial implementation
+         2026-10-18 Resampling and channel conversion helpers
+         2026-10-18 Streaming decode in fixed-size blocks
+         2026-10-18 Segment decoding and duration probing
+         2026-10-18 DecodedAudio: decode once to a memory-mapped buffer shared by all stages
+         2026-10-18 Anti-aliased polyphase resampling; derived views streamed to disk
+"""
+import functools
+import glob
+import math
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from src.exceptions import ProcessingError
+
+# Resampling filter: taps per side in zero crossings of the lower rate, the
+# Kaiser window shape (about -90 dB stop band) and the cut-off relative to
+# the lower Nyquist rate
+RESAMPLE_ZERO_CROSSINGS = 16
+RESAMPLE_KAISER_BETA = 8.6
+RESAMPLE_ROLLOFF = 0.95
+
+
+def _ffmpeg_decode_cmd(
+    audio_path: Union[str, Path],
+    sample_rate: int,
+    channels: int,
+    offset: Optional[float] = None,
+    duration: Optional[float] = None,
+) -> list:
+    """Build an ffmpeg command writing raw float32 PCM to stdout"""
+    seek = ["-ss", f"{offset:.6f}"] if offset else []
+    limit = ["-t", f"{duration:.6f}"] if duration is not None else []
+    return [
+        "ffmpeg", "-nostdin", "-v", "error",
+        *seek,
+        "-i", str(audio_path),
+        *limit,
+        "-vn",
+        "-f", "f32le",
+        "-acodec", "pcm_f32le",
+        "-ac", str(channels),
+        "-ar", str(sample_rate),
+        "-",
+    ]
+
+
+def load_pcm(
+    audio_path: Union[str, Path],
+    sample_rate: int = 44100,
+    channels: int = 2,
+    offset: Optional[float] = None,
+    duration: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Decode an audio file (or a segment of it) to float32 PCM
+
+    Args:
+        audio_path: Path to any file ffmpeg can read
+        sample_rate: Output sample rate in Hz
+        channels: Output channel count
+        offset: Start of the segment in seconds
+        duration: Length of the segment in seconds
+
+    Returns:
+        Array of shape (samples, channels)
+
+    Raises:
+        ProcessingError: If ffmpeg fails to decode the file
+    """
+    cmd = _ffmpeg_decode_cmd(audio_path, sample_rate, channels, offset, duration)
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", b"") or b""
+        raise ProcessingError(
+            f"Failed to decode audio: {stderr.decode(errors='replace') or str(e)}",
+            status_code=500,
+            audio_path=str(audio_path)
+        ) from e
+    return np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, channels)
+
+
+def probe_duration(audio_path: Union[str, Path]) -> float:
+    """
+    Get the duration of an audio file in seconds with ffprobe
+
+    Raises:
+        ProcessingError: If the file cannot be probed
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(audio_path),
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True, text=True)
+        return float(result.stdout.strip())
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        raise ProcessingError(
+            f"Failed to probe audio duration: {str(e)}",
+            status_code=500,
+            audio_path=str(audio_path)
+        ) from e
+
+
+def iter_pcm(
+    audio_path: Union[str, Path],
+    block_samples: int,
+    sample_rate: int = 44100,
+    channels: int = 2,
+) -> Iterator[np.ndarray]:
+    """
+    Decode an audio file incrementally, one block at a time
+
+    A single ffmpeg process streams the whole file, so memory stays bounded
+    by the block size however long the recording is.
+
+    Args:
+        audio_path: Path to any file ffmpeg can read
+        block_samples: Samples per yielded block (the last one may be shorter)
+        sample_rate: Output sample rate in Hz
+        channels: Output channel count
+
+    Yields:
+        Arrays of shape (block_samples, channels)
+
+    Raises:
+        ProcessingError: If ffmpeg cannot be started or fails to decode
+    """
+    block_bytes = block_samples * channels * 4
+    try:
+        proc = subprocess.Popen(
+            _ffmpeg_decode_cmd(audio_path, sample_rate, channels),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except OSError as e:
+        raise ProcessingError(
+            f"Failed to decode audio: {str(e)}",
+            status_code=500,
+            audio_path=str(audio_path)
+        ) from e
+
+    try:
+        while True:
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                break
+            usable = len(data) - len(data) % (channels * 4)
+            yield np.frombuffer(data[:usable], dtype=np.float32).reshape(-1, channels)
+        if proc.wait() != 0:
+            raise ProcessingError(
+                f"Failed to decode audio: {proc.stderr.read().decode(errors='replace')}",
+                status_code=500,
+                audio_path=str(audio_path)
+            )
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+
+@functools.lru_cache(maxsize=16)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """
+    Kaiser-windowed sinc low-pass for rational resampling, split by phase
+
+    The cut-off sits just below the lower of the two Nyquist rates, so
+    content the output rate cannot represent is removed instead of folding
+    back into the band (what plain interpolation does).
+
+    Returns:
+        (up, taps) array; row p holds the taps of output phase p, oldest
+        input first
+    """
+    cutoff = RESAMPLE_ROLLOFF * 0.5 / max(up, down)
+    half = RESAMPLE_ZERO_CROSSINGS * max(up, down)
+    offsets = np.arange(-half, half + 1, dtype=np.float64)
+    window = np.kaiser(len(offsets), RESAMPLE_KAISER_BETA)
+    taps = 2 * cutoff * np.sinc(2 * cutoff * offsets) * window
+    # Zero-stuffing by `up` divides the level by `up`; the filter restores it
+    taps *= up / taps.sum()
+    taps = np.pad(taps, (0, -len(taps) % up))
+    return np.ascontiguousarray(taps.reshape(-1, up).T[:, ::-1], dtype=np.float32)
+
+
+def resampled_length(length: int, from_rate: int, to_rate: int) -> int:
+    """Number of samples `length` input samples resample to"""
+    return int(round(length * to_rate / from_rate))
+
+
+def iter_resampled(
+    samples: np.ndarray,
+    from_rate: int,
+    to_rate: int,
+    channels: Optional[int] = None,
+    block_samples: int = 1 << 16,
+) -> Iterator[np.ndarray]:
+    """
+    Resample (and convert channels) block by block
+
+    Only the input each output block needs is read, so a memory-mapped
+    source is converted on the fly without loading it.
+
+    Args:
+        samples: Array of shape (samples, channels)
+        from_rate: Sample rate of the input
+        to_rate: Desired sample rate
+        channels: Desired channel count (the input's by default)
+        block_samples: Output samples per block
+
+    Yields:
+        Consecutive (block_samples, channels) float32 blocks
+    """
+    channels = channels or samples.shape[1]
+    if from_rate == to_rate:
+        for start in range(0, len(samples), block_samples):
+            block = to_channels(samples[start:start + block_samples], channels)
+            yield np.asarray(block, dtype=np.float32)
+        return
+
+    divisor = math.gcd(from_rate, to_rate)
+    up, down = to_rate // divisor, from_rate // divisor
+    phases = _polyphase_filter(up, down)
+    taps = phases.shape[1]
+    # Output m sits at input m * down / up; offsetting by the centre tap
+    # cancels the filter's delay
+    centre = RESAMPLE_ZERO_CROSSINGS * max(up, down)
+    total = resampled_length(len(samples), from_rate, to_rate)
+    for first in range(0, total, block_samples):
+        last = min(first + block_samples, total)
+        # Newest input sample each output depends on, and its filter phase
+        lo = (first * down + centre) // up - taps + 1
+        hi = ((last - 1) * down + centre) // up + 1
+        window = np.asarray(
+            to_channels(samples[max(lo, 0):max(min(hi, len(samples)), 0)], channels),
+            dtype=np.float32
+        )
+        before = max(lo, 0) - lo
+        window = np.ascontiguousarray(
+            np.pad(window, ((before, hi - lo - before - len(window)), (0, 0))).T
+        )
+        block = np.empty((last - first, channels), dtype=np.float32)
+        # Outputs up apart share a phase and read inputs down apart: each
+        # phase is one matrix-vector product over a strided, zero-copy view
+        for offset in range(min(up, last - first)):
+            position = (first + offset) * down + centre
+            newest, phase = divmod(position, up)
+            count = len(range(first + offset, last, up))
+            for channel in range(channels):
+                source = window[channel, newest - taps + 1 - lo:]
+                rows = np.lib.stride_tricks.as_strided(
+                    source, shape=(count, taps),
+                    strides=(down * source.strides[0], source.strides[0]),
+                    writeable=False
+                )
+                block[offset::up, channel] = rows @ phases[phase]
+        yield block
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """
+    Resample PCM along its first axis with a polyphase anti-aliasing filter
+
+    Args:
+        samples: Array of shape (samples,) or (samples, channels)
+        from_rate: Sample rate of the input
+        to_rate: Desired sample rate
+
+    Returns:
+        Resampled float32 array (the input itself if rates match)
+    """
+    if from_rate == to_rate or len(samples) == 0:
+        return samples
+    blocks = list(iter_resampled(
+        samples[:, None] if samples.ndim == 1 else samples, from_rate, to_rate
+    ))
+    resampled = np.concatenate(blocks).astype(np.float32, copy=False)
+    return resampled[:, 0] if samples.ndim == 1 else resampled
+
+
+def to_channels(samples: np.ndarray, channels: int) -> np.ndarray:
+    """
+    Convert PCM of shape (samples, n) or (samples,) to `channels` channels
+    """
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if samples.shape[1] == channels:
+        return samples
+    if channels == 1:
+        return samples.mean(axis=1, keepdims=True)
+    if samples.shape[1] == 1:
+        return np.repeat(samples, channels, axis=1)
+    return samples[:, :channels]
+
+
+class DecodedAudio:
+    """Audio decoded once into a memory-mapped float32 file.
+
+    Every pipeline stage (separation, transcription, encoding) reads the
+    same buffer instead of running its own ffmpeg decode. The native view
+    is zero-copy. Other sample rates or channel layouts are converted on
+    the fly by blocks(); at() converts once into a memory-mapped file next
+    to the buffer that every consumer (and process) then shares, so no
+    converted copy lives in memory. Pickling only carries the file path, so
+    worker processes map the same pages.
+    """
+
+    def __init__(self, path: Union[str, Path], sample_rate: int, channels: int, owned: bool = False):
+        """
+        Map an existing raw float32 buffer
+
+        Args:
+            path: File of interleaved little-endian float32 samples
+            sample_rate: Sample rate of the buffer
+            channels: Channel count of the buffer
+            owned: Delete the file on close()
+        """
+        self.path = str(path)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.owned = owned
+        self._views: Dict[Tuple[int, int], np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._samples = self._map(self.path, channels)
+
+    @staticmethod
+    def _map(path: str, channels: int) -> np.ndarray:
+        if os.path.getsize(path) == 0:
+            return np.zeros((0, channels), dtype=np.float32)
+        return np.memmap(path, dtype="<f4", mode="r").reshape(-1, channels)
+
+    def _derived_path(self, key: Tuple[int, int]) -> str:
+        return f"{self.path}.{key[0]}hz{key[1]}ch.f32"
+
+    @classmethod
+    def decode(
+        cls,
+        audio_path: Union[str, Path],
+        sample_rate: int = 44100,
+        channels: int = 2,
+        buffer_dir: Optional[str] = None,
+        block_samples: int = 1 << 18,
+    ) -> "DecodedAudio":
+        """
+        Decode a file once with ffmpeg into a memory-mapped buffer
+
+        The decoded PCM is streamed to disk block by block, so decoding
+        never holds the whole track in memory either.
+
+        Args:
+            audio_path: Path to any file ffmpeg can read
+            sample_rate: Sample rate to decode to
+            channels: Channel count to decode to
+            buffer_dir: Directory for the buffer file (system temp by default)
+            block_samples: Samples per ffmpeg read
+
+        Returns:
+            DecodedAudio owning its buffer file
+
+        Raises:
+            ProcessingError: If ffmpeg fails to decode the file
+        """
+        fd, path = tempfile.mkstemp(suffix=".f32", dir=buffer_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for block in iter_pcm(audio_path, block_samples, sample_rate, channels):
+                    out.write(block.tobytes())
+        except BaseException:
+            os.remove(path)
+            raise
+        return cls(path, sample_rate, channels, owned=True)
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Native (samples, channels) read-only view of the buffer"""
+        return self._samples
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds"""
+        return len(self._samples) / self.sample_rate
+
+    def at(self, sample_rate: Optional[int] = None, channels: Optional[int] = None) -> np.ndarray:
+        """
+        Get the audio at a sample rate and channel count
+
+        Args:
+            sample_rate: Desired rate (native by default)
+            channels: Desired channel count (native by default)
+
+        Returns:
+            (samples, channels) read-only float32 array: the memory-mapped
+            buffer itself when nothing needs converting, else a mapped
+            file converted block by block on first request
+        """
+        key = (sample_rate or self.sample_rate, channels or self.channels)
+        if key == (self.sample_rate, self.channels):
+            return self._samples
+        with self._lock:
+            if key not in self._views:
+                path = self._derived_path(key)
+                if not os.path.exists(path):
+                    # Written privately, then renamed: another process may
+                    # be deriving the same view
+                    fd, partial = tempfile.mkstemp(
+                        suffix=".part", dir=os.path.dirname(path) or None
+                    )
+                    try:
+                        with os.fdopen(fd, "wb") as out:
+                            for block in iter_resampled(
+                                self._samples, self.sample_rate, key[0], key[1]
+                            ):
+                                out.write(block.astype("<f4", copy=False).tobytes())
+                        os.replace(partial, path)
+                    except BaseException:
+                        os.remove(partial)
+                        raise
+                self._views[key] = self._map(path, key[1])
+            return self._views[key]
+
+    def blocks(
+        self,
+        block_samples: int,
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        Yield consecutive blocks of block_samples samples (like iter_pcm)
+
+        Views of the buffer when nothing needs converting (or at() already
+        converted it), otherwise converted on the fly.
+        """
+        key = (sample_rate or self.sample_rate, channels or self.channels)
+        with self._lock:
+            native = key == (self.sample_rate, self.channels)
+            samples = self._samples if native else self._views.get(key)
+        if samples is None:
+            yield from iter_resampled(
+                self._samples, self.sample_rate, key[0], key[1], block_samples
+            )
+            return
+        for start in range(0, len(samples), block_samples):
+            yield samples[start:start + block_samples]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def __repr__(self) -> str:
+        return f"DecodedAudio({self.path!r}, {self.sample_rate}Hz, {self.channels}ch)"
+
+    def close(self) -> None:
+        """Drop derived views; remove the buffer and derived files if owned"""
+        self._views.clear()
+        self._samples = np.zeros((0, self.channels), dtype=np.float32)
+        if self.owned:
+            for path in [self.path] + glob.glob(f"{glob.escape(self.path)}.*hz*ch.f32"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def __enter__(self) -> "DecodedAudio":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        # Receivers map the same file; they never own (delete) it
+        return {"path": self.path, "sample_rate": self.sample_rate, "channels": self.channels}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"], state["sample_rate"], state["channels"])
+
+
+# Anything the pipeline stages accept as input audio
+AudioSource = Union[str, Path, DecodedAudio]
@@ -0,0 +1,301 @@
+"""
+backends.py ───────────────────────────────────────────────────────────────────
+Summary: Pluggable in-process separation backends (Spleeter, Demucs)
+ModLog : 2026-10-18 Initial implementation
+         2026-10-18 Cheapest model for a set of requested stems
+         2026-10-18 Spleeter separations hold an exclusive lease
+"""
+import json
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Type
+
+import numpy as np
+
+from src.audio_processing.audio_io import to_channels
+from src.audio_processing.model_pool import (
+    get_demucs_model, get_separator, spleeter_separator
+)
+from src.config import get_config
+from src.exceptions import ProcessingError
+
+DEFAULT_BACKEND = "spleeter:4stems"
+
+# Other names clients use for everything but the vocals
+STEM_ALIASES = {"accompaniment": "instrumental", "no_vocals": "instrumental"}
+
+# Models of each family with the stems they can produce, cheapest first.
+# "instrumental" is available from all of them (it is the sum of the
+# non-vocal stems when the model does not output it directly).
+STEM_MODELS: Dict[str, Tuple[Tuple[str, frozenset], ...]] = {
+    "spleeter": (
+        ("spleeter:2stems", frozenset({"vocals", "instrumental"})),
+        ("spleeter:4stems", frozenset({"vocals", "drums", "bass", "other", "instrumental"})),
+        ("spleeter:5stems", frozenset(
+            {"vocals", "drums", "bass", "piano", "other", "instrumental"}
+        )),
+    ),
+    "demucs": (
+        ("demucs:htdemucs", frozenset({"vocals", "drums", "bass", "other", "instrumental"})),
+        ("demucs:htdemucs_6s", frozenset(
+            {"vocals", "drums", "bass", "guitar", "piano", "other", "instrumental"}
+        )),
+    ),
+}
+
+
+class SeparationBackend:
+    """Common interface of the separation models.
+
+    A backend is a light handle on a model that lives in a shared pool, so
+    building one per request costs nothing; the weights are loaded once per
+    process on first use.
+    """
+
+    #: Sample rate expected by separate() and used for its output
+    sample_rate: int = 44100
+
+    def __init__(self, model: Any):
+        """
+        Initialize a backend
+
+        Args:
+            model: Model descriptor understood by the backend
+        """
+        self.model = model
+
+    @property
+    def spec(self) -> str:
+        """Descriptor that get_backend() turns back into this backend"""
+        raise NotImplementedError
+
+    def load(self) -> None:
+        """Load (or fetch from the pool) the model before first use"""
+        raise NotImplementedError
+
+    def separate(self, waveform: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Separate a waveform
+
+        Args:
+            waveform: (samples, 2) float32 array at sample_rate
+
+        Returns:
+            Mapping of stem name to (samples, 2) float32 array
+        """
+        raise NotImplementedError
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and vars(other) == vars(self)
+
+    def __hash__(self) -> int:
+        # Equal settings share pool entries (e.g. separator worker pools)
+        return hash((type(self).__name__, json.dumps(vars(self), sort_keys=True, default=str)))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.spec!r})"
+
+
+class SpleeterBackend(SeparationBackend):
+    """Spleeter separator from the shared pool (fast, lower quality)"""
+
+    def __init__(self, model: Any = DEFAULT_BACKEND):
+        super().__init__(model)
+
+    @property
+    def spec(self) -> str:
+        return self.model if isinstance(self.model, str) else "spleeter"
+
+    def load(self) -> None:
+        get_separator(self.model)
+
+    def separate(self, waveform: np.ndarray) -> Dict[str, np.ndarray]:
+        with spleeter_separator(self.model) as separator:
+            return separator.separate(waveform)
+
+
+class DemucsBackend(SeparationBackend):
+    """Demucs run in process on cached weights (slower, higher quality)"""
+
+    def __init__(
+        self,
+        model: str = "htdemucs",
+        device: Optional[str] = None,
+        shifts: int = 0,
+        overlap: float = 0.25
+    ):
+        """
+        Initialize a Demucs backend
+
+        Args:
+            model: Pretrained model name
+            device: Torch device (CUDA when available by default)
+            shifts: Random shifts averaged per pass (higher is better and slower)
+            overlap: Overlap between the model's internal chunks
+        """
+        super().__init__(model)
+        self.device = device or get_config().get("demucs_device")
+        self.shifts = shifts
+        self.overlap = overlap
+
+    @property
+    def spec(self) -> str:
+        return f"demucs:{self.model}"
+
+    def load(self) -> None:
+        get_demucs_model(self.model)
+
+    def separate(self, waveform: np.ndarray) -> Dict[str, np.ndarray]:
+        import torch
+        from demucs.apply import apply_model
+
+        model = get_demucs_model(self.model)
+        device = self.device or ("cuda" if torch.cuda.is_available() else "cpu")
+        mix = torch.from_numpy(
+            np.ascontiguousarray(to_channels(waveform, model.audio_channels).T)
+        )
+        # Same normalisation as the demucs CLI
+        ref = mix.mean(0)
+        mean, std = ref.mean(), ref.std() + 1e-8
+        with torch.no_grad():
+            sources = apply_model(
+                model,
+                ((mix - mean) / std)[None],
+                device=device,
+                shifts=self.shifts,
+                split=True,
+                overlap=self.overlap,
+                progress=False
+            )[0]
+        sources = sources * std + mean
+        return {
+            name: sources[index].cpu().numpy().T.astype(np.float32)
+            for index, name in enumerate(model.sources)
+        }
+
+
+BACKENDS: Dict[str, Type[SeparationBackend]] = {
+    "spleeter": SpleeterBackend,
+    "demucs": DemucsBackend,
+}
+
+
+def get_backend(spec: Any = None) -> SeparationBackend:
+    """
+    Resolve a backend descriptor
+
+    Args:
+        spec: "spleeter:2stems", "spleeter:4stems", "demucs", "demucs:htdemucs_ft",
+            a Spleeter config mapping or a backend instance. Defaults to the
+            "separation_backend" config value.
+
+    Returns:
+        Backend handle
+
+    Raises:
+        ProcessingError: If the backend family is unknown
+    """
+    spec = spec or get_config().get("separation_backend", DEFAULT_BACKEND)
+    if isinstance(spec, SeparationBackend):
+        return spec
+    if not isinstance(spec, str):
+        return SpleeterBackend(spec)
+
+    family, _, model = spec.partition(":")
+    if family == "spleeter":
+        return SpleeterBackend(spec if model else DEFAULT_BACKEND)
+    if family in BACKENDS:
+        return BACKENDS[family](model) if model else BACKENDS[family]()
+    raise ProcessingError(
+        f"Unknown separation backend: {spec}",
+        status_code=400,
+        backend=spec
+    )
+
+
+def normalize_stems(stems: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    """
+    Canonical, sorted form of a stem request (None means every stem)
+
+    Args:
+        stems: Requested stem names, aliases allowed
+
+    Returns:
+        Sorted unique canonical names, or None
+    """
+    if stems is None:
+        return None
+    names = {STEM_ALIASES.get(stem.strip().lower(), stem.strip().lower()) for stem in stems}
+    names.discard("")
+    return tuple(sorted(names)) or None
+
+
+def backend_for_stems(stems: Optional[Iterable[str]], family: str = "spleeter") -> str:
+    """
+    Pick the cheapest model of a family that produces the requested stems
+
+    Args:
+        stems: Requested stem names (None for the family's standard 4 stems)
+        family: "spleeter" or "demucs"
+
+    Returns:
+        Backend descriptor for get_backend()
+
+    Raises:
+        ProcessingError: If the family cannot produce the stems
+    """
+    requested = set(normalize_stems(stems) or ("vocals", "drums", "bass", "other"))
+    for spec, produced in STEM_MODELS.get(family, ()):
+        if requested <= produced:
+            return spec
+    raise ProcessingError(
+        f"No {family} model produces stems: {sorted(requested)}",
+        status_code=400,
+        stems=sorted(requested),
+        family=family
+    )
+
+
+def select_stems(
+    separated: Mapping[str, np.ndarray], stems: Optional[Iterable[str]]
+) -> Dict[str, np.ndarray]:
+    """
+    Keep only the requested stems of a separation result
+
+    "instrumental" is taken from the model's own accompaniment output when
+    it has one and mixed from the non-vocal stems otherwise.
+
+    Args:
+        separated: Mapping of stem name to waveform
+        stems: Requested stem names (None keeps everything)
+
+    Returns:
+        Mapping of requested stem name to waveform
+
+    Raises:
+        ProcessingError: If a requested stem is not in the result
+    """
+    wanted = normalize_stems(stems)
+    if wanted is None:
+        return dict(separated)
+
+    selected = {}
+    for name in wanted:
+        if name in separated:
+            selected[name] = separated[name]
+            continue
+        if name == "instrumental":
+            direct = [alias for alias in STEM_ALIASES if alias in separated]
+            if direct:
+                selected[name] = separated[direct[0]]
+                continue
+            if "vocals" in separated and len(separated) > 1:
+                selected[name] = sum(
+                    data for stem, data in separated.items() if stem != "vocals"
+                )
+                continue
+        raise ProcessingError(
+            f"Separation did not produce stem: {name}",
+            status_code=400,
+            stem=name,
+            available=sorted(separated)
+        )
+    return selected
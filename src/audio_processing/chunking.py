@@ -0,0 +1,209 @@
+"""
+chunking.py ───────────────────────────────────────────────────────────────────
+Summary: Overlapping-window helpers for bounded-memory stem separation
+ModLog : 2026-10-18 Initial implementation
+         2026-10-18 Segment planning for random-access (parallel) separation
+         2026-10-18 Preview window selection and planning around a preview
+"""
+import wave
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+def iter_windows(blocks: Iterable[np.ndarray], overlap: int) -> Iterator[np.ndarray]:
+    """
+    Turn consecutive PCM blocks into overlapping windows
+
+    Every window after the first starts with the last `overlap` samples of
+    the previous one, so each block of length hop yields a window of
+    length hop + overlap.
+
+    Args:
+        blocks: Consecutive (samples, channels) blocks, each >= overlap long
+            except possibly the last
+        overlap: Samples shared by neighbouring windows
+
+    Yields:
+        Overlapping (samples, channels) windows
+    """
+    carry: Optional[np.ndarray] = None
+    for block in blocks:
+        if len(block) == 0:
+            continue
+        window = block if carry is None else np.concatenate([carry, block])
+        yield window
+        carry = window[len(window) - overlap:]
+
+
+def plan_segments(total: int, hop: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    Plan the same overlapping windows as iter_windows by sample index
+
+    Args:
+        total: Length of the recording in samples
+        hop: New samples per window
+        overlap: Samples shared by neighbouring windows
+
+    Returns:
+        List of (start, length) pairs
+    """
+    segments = []
+    for block_start in range(0, total, hop):
+        start = max(0, block_start - overlap)
+        end = min(total, block_start + hop)
+        segments.append((start, end - start))
+    return segments
+
+
+def loudest_window(samples: np.ndarray, window: int, hop: int = 4410) -> int:
+    """
+    Find the start of the highest-energy window (a cheap chorus guess)
+
+    Args:
+        samples: (samples, channels) or (samples,) PCM
+        window: Window length in samples
+        hop: Granularity of candidate starts
+
+    Returns:
+        Start sample of the loudest window (0 if the track is shorter)
+    """
+    if len(samples) <= window:
+        return 0
+    energy = np.square(samples, dtype=np.float64)
+    if energy.ndim > 1:
+        energy = energy.sum(axis=1)
+    cumulative = np.concatenate([[0.0], np.cumsum(energy)])
+    starts = np.arange(0, len(samples) - window + 1, hop)
+    return int(starts[np.argmax(cumulative[starts + window] - cumulative[starts])])
+
+
+def plan_around(total: int, start: int, length: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    Plan windows covering a track around an already separated window
+
+    The result is the head before the window, the window itself and the
+    tail after it, neighbours overlapping by `overlap` as CrossfadeStitcher
+    expects, so the window's separation is reused rather than recomputed.
+
+    Args:
+        total: Length of the recording in samples
+        start: First sample of the separated window
+        length: Samples in the separated window
+        overlap: Samples shared by neighbouring windows
+
+    Returns:
+        List of (start, length) pairs in track order
+    """
+    end = min(total, start + length)
+    segments = []
+    if start > 0:
+        segments.append((0, min(total, start + overlap)))
+    segments.append((start, end - start))
+    if end < total:
+        tail = max(start, end - overlap)
+        segments.append((tail, total - tail))
+    return segments
+
+
+def crossfade(tail: np.ndarray, head: np.ndarray) -> np.ndarray:
+    """
+    Linearly crossfade two renderings of the same samples
+
+    Args:
+        tail: End of the previous window's output
+        head: Start of the next window's output, same length as tail
+
+    Returns:
+        Blended samples fading from tail into head
+    """
+    n = len(tail)
+    if n == 0:
+        return tail
+    ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)
+    if tail.ndim > 1:
+        ramp = ramp[:, None]
+    return tail * (1.0 - ramp) + head * ramp
+
+
+class CrossfadeStitcher:
+    """Reassemble per-window stems into continuous streams.
+
+    Windows must overlap as produced by iter_windows. The overlapping part
+    of neighbouring windows is crossfaded and each finished stretch of
+    audio is handed to `sink` immediately, so only one overlap per stem is
+    ever held back.
+    """
+
+    def __init__(self, overlap: int, sink: Callable[[str, np.ndarray], None]):
+        """
+        Initialize a stitcher
+
+        Args:
+            overlap: Samples shared by neighbouring windows
+            sink: Called with (stem name, samples) for every finished stretch
+        """
+        self.overlap = overlap
+        self.sink = sink
+        self._tails: Dict[str, np.ndarray] = {}
+
+    def push(self, stems: Mapping[str, np.ndarray]) -> None:
+        """
+        Add the separated stems of the next window
+
+        Args:
+            stems: Mapping of stem name to (samples, channels) output
+        """
+        for name, data in stems.items():
+            tail = self._tails.get(name)
+            if tail is None:
+                head, body = data[:0], data
+            else:
+                n = min(len(tail), len(data))
+                head, body = crossfade(tail[:n], data[:n]), data[n:]
+            keep = min(self.overlap, len(body))
+            ready = np.concatenate([head, body[:len(body) - keep]])
+            if len(ready):
+                self.sink(name, ready)
+            self._tails[name] = body[len(body) - keep:]
+
+    def finish(self) -> None:
+        """Flush the held-back end of every stem"""
+        for name, tail in self._tails.items():
+            if len(tail):
+                self.sink(name, tail)
+        self._tails.clear()
+
+
+class WavStreamWriter:
+    """Append float PCM to a 16-bit WAV file without keeping it in memory"""
+
+    def __init__(self, path: str, sample_rate: int, channels: int = 2):
+        """
+        Open a WAV file for incremental writing
+
+        Args:
+            path: Output file path
+            sample_rate: Sample rate in Hz
+            channels: Channel count
+        """
+        self.path = path
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append (samples, channels) float PCM in [-1, 1]"""
+        pcm = np.clip(samples, -1.0, 1.0) * 32767
+        self._wav.writeframes(pcm.astype("<i2").tobytes())
+
+    def close(self) -> None:
+        """Finalize the WAV header and close the file"""
+        self._wav.close()
+
+    def __enter__(self) -> "WavStreamWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
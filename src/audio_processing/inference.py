@@ -0,0 +1,140 @@
+"""
+inference.py ──────────────────────────────────────────────────────────────────
+Summary: Bounded worker pool that keeps model inference off the event loop
+ModLog : 2026-10-18 Initial implementation
+         2026-10-18 Measure job durations to estimate queueing delay
+         2026-10-18 One worker per Whisper batch slot by default
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.config import get_config
+from src.exceptions import ProcessingError
+from src.utils.logging import Logger
+
+logger = Logger.get_logger("InferenceExecutor")
+
+
+class InferenceExecutor:
+    """Run blocking inference in dedicated threads with admission control.
+
+    At most `workers` calls run at once and at most `queue_depth` more wait
+    for a worker; beyond that callers are rejected immediately (HTTP 503)
+    instead of piling up. PyTorch releases the GIL inside its kernels, so
+    the event loop stays responsive while models run.
+    """
+
+    def __init__(self, workers: int = 1, queue_depth: int = 8, name: str = "inference"):
+        """
+        Initialize an executor
+
+        Args:
+            workers: Concurrent inference calls
+            queue_depth: Calls allowed to wait for a worker
+            name: Thread name prefix (and label in errors)
+        """
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._admitted = 0
+        self._lock = threading.Lock()
+        # Moving average of how long a job holds a worker (seconds)
+        self.mean_job_seconds = 0.0
+
+    @property
+    def pending(self) -> int:
+        """Calls running or waiting"""
+        with self._lock:
+            return self._admitted
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._admitted >= self.workers + self.queue_depth:
+                raise ProcessingError(
+                    f"{self.name} queue is full, try again later",
+                    status_code=503,
+                    workers=self.workers,
+                    queue_depth=self.queue_depth
+                )
+            self._admitted += 1
+
+    def _release(self, _: Any = None) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def _timed(self, fn: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.mean_job_seconds = (
+                    elapsed if not self.mean_job_seconds
+                    else 0.3 * elapsed + 0.7 * self.mean_job_seconds
+                )
+
+    def expected_wait(self) -> float:
+        """Rough seconds a job submitted now waits before a worker picks it up"""
+        with self._lock:
+            ahead = self._admitted - self.workers + 1
+            return max(0, ahead) * self.mean_job_seconds / self.workers
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Await a blocking call executed on a worker thread
+
+        Args:
+            fn: Blocking function
+            args: Positional arguments for fn
+            kwargs: Keyword arguments for fn
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            ProcessingError: With status 503 if the queue is full
+        """
+        self._admit()
+        try:
+            future = self._executor.submit(self._timed, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the work finishes, even if the caller is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_inference_executor: Optional[InferenceExecutor] = None
+_inference_executor_lock = threading.Lock()
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get the process-wide executor for transcription models"""
+    global _inference_executor
+    with _inference_executor_lock:
+        if _inference_executor is None:
+            config = get_config()
+            # With batching, workers mostly wait on the batcher; one per batch
+            # slot lets that many tracks share each forward pass
+            batch_size = int(config.get("whisper_batch_size", 1))
+            _inference_executor = InferenceExecutor(
+                workers=int(config.get("inference_workers", max(1, batch_size))),
+                queue_depth=int(config.get("inference_queue_depth", 8)),
+                name="whisper"
+            )
+            logger.info(
+                "Started %d inference workers (queue depth %d)",
+                _inference_executor.workers, _inference_executor.queue_depth
+            )
+        return _inference_executor
@@ -0,0 +1,179 @@
+"""
+lyrics_benchmark.py ───────────────────────────────────────────────────────────
+Summary: Real-time factor and word error rate of Whisper precisions on a corpus
+ModLog : 2026-10-18 Initial implementation
+         2026-10-18 Results keyed by the requested precision; int8 skipped off CPU
+
+Usage:
+    python -m src.audio_processing.lyrics_benchmark CORPUS_DIR --model small
+
+A corpus is a directory of audio files, each with a reference transcript
+next to it (song.mp3 + song.txt).
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.audio_processing.audio_io import probe_duration
+from src.audio_processing.model_pool import WHISPER_PRECISIONS
+from src.utils.logging import Logger
+
+logger = Logger.get_logger("LyricsBenchmark")
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".m4a", ".ogg", ".opus", ".webm")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase words of a transcript with punctuation removed"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """
+    Word-level edit distance between two transcripts
+
+    Args:
+        reference: Ground truth text
+        hypothesis: Transcribed text
+
+    Returns:
+        (substitutions + deletions + insertions, words in the reference)
+    """
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    # One row of the Levenshtein table at a time
+    row = np.arange(len(hyp) + 1)
+    for i, word in enumerate(ref, 1):
+        previous, row = row, np.empty_like(row)
+        row[0] = i
+        cost = np.array([word != other for other in hyp], dtype=row.dtype)
+        # Substitutions and deletions come from the previous row ...
+        row[1:] = np.minimum(previous[:-1] + cost, previous[1:] + 1)
+        # ... insertions chain along the current one
+        for j in range(1, len(row)):
+            row[j] = min(row[j], row[j - 1] + 1)
+    return int(row[-1]), len(ref)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word errors per reference word (0.0 is a perfect transcript)"""
+    errors, words = word_errors(reference, hypothesis)
+    return errors / words if words else float(errors > 0)
+
+
+def load_corpus(corpus_dir: Union[str, Path]) -> List[Tuple[Path, str]]:
+    """
+    Find audio files that have a reference transcript
+
+    Args:
+        corpus_dir: Directory holding song.<audio ext> + song.txt pairs
+
+    Returns:
+        Sorted (audio path, reference text) pairs
+    """
+    corpus = []
+    for audio in sorted(Path(corpus_dir).iterdir()):
+        reference = audio.with_suffix(".txt")
+        if audio.suffix.lower() in AUDIO_EXTENSIONS and reference.is_file():
+            corpus.append((audio, reference.read_text(encoding="utf-8")))
+    return corpus
+
+
+def benchmark(
+    corpus_dir: Union[str, Path],
+    model_name: str = "small",
+    precisions: Iterable[str] = WHISPER_PRECISIONS,
+    language: str = "en",
+) -> Dict[str, Dict[str, float]]:
+    """
+    Transcribe a corpus with each precision and measure speed and accuracy
+
+    Models are loaded before timing starts and the lyrics cache is bypassed,
+    so the figures are pure inference.
+
+    Args:
+        corpus_dir: Directory of audio files with reference transcripts
+        model_name: Whisper model to benchmark
+        precisions: Precisions to compare ("fp32", "int8")
+        language: ISO 639-1 language of the corpus
+
+    Returns:
+        Per precision: files, audio_seconds, seconds, rtf (processing time
+        over audio time, lower is faster) and wer (corpus word error rate).
+        Precisions the device does not run (int8 off CPU) are left out.
+
+    Raises:
+        ValueError: If the corpus has no transcribed audio
+    """
+    from src.audio_processing.lyrics_generator import LyricsGenerator
+
+    corpus = load_corpus(corpus_dir)
+    if not corpus:
+        raise ValueError(f"No audio with a reference .txt found in {corpus_dir}")
+    audio_seconds = sum(probe_duration(audio) for audio, _ in corpus)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for precision in precisions:
+        generator = LyricsGenerator(model_name, cache=False, precision=precision)
+        if generator.precision != precision:
+            # GPUs run fp16 whatever was asked; this row would repeat another
+            logger.warning(
+                "Skipping %s: not supported on %s", precision, generator.device
+            )
+            continue
+        generator.model  # load (and quantize) outside the timed loop
+        errors = words = 0
+        elapsed = 0.0
+        for audio, reference in corpus:
+            started = time.perf_counter()
+            segments = generator.transcribe(audio, language)
+            elapsed += time.perf_counter() - started
+            file_errors, file_words = word_errors(
+                reference, " ".join(segment.text for segment in segments)
+            )
+            errors += file_errors
+            words += file_words
+        results[precision] = {
+            "files": len(corpus),
+            "audio_seconds": audio_seconds,
+            "seconds": elapsed,
+            "rtf": elapsed / audio_seconds if audio_seconds else 0.0,
+            "wer": errors / words if words else 0.0,
+        }
+        logger.info(
+            "%s %s: RTF %.3f, WER %.3f",
+            model_name, precision, results[precision]["rtf"], results[precision]["wer"]
+        )
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Command line entry point printing one row per precision"""
+    parser = argparse.ArgumentParser(
+        description="Compare Whisper precisions on a local corpus"
+    )
+    parser.add_argument("corpus_dir", help="Audio files with .txt reference transcripts")
+    parser.add_argument("--model", default="small", help="Whisper model name")
+    parser.add_argument("--language", default="en")
+    parser.add_argument(
+        "--precision", action="append", choices=WHISPER_PRECISIONS,
+        help="Precision to test (repeatable; all by default)"
+    )
+    args = parser.parse_args(argv)
+
+    results = benchmark(
+        args.corpus_dir, args.model, args.precision or WHISPER_PRECISIONS, args.language
+    )
+    print(f"{'precision':<10}{'files':>6}{'audio s':>10}{'time s':>10}{'RTF':>8}{'WER':>8}")
+    for precision, row in results.items():
+        print(
+            f"{precision:<10}{row['files']:>6}{row['audio_seconds']:>10.1f}"
+            f"{row['seconds']:>10.1f}{row['rtf']:>8.3f}{row['wer']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
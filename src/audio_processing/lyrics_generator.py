@@ -6,13 +6,53 @@ synchronized lyrics with timestamps using OpenAI's Whisper model.
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from dataclasses import dataclass
+import sqlite3
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TypeVar, cast
+from typing import (
+    Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union,
+    cast
+)
 
+import numpy as np
 import torch
 
+from src.audio_processing.activity import (
+    Region,
+    active_regions,
+    gather_regions,
+    inactive_seconds,
+    pack_regions,
+    source_positions,
+)
+from src.audio_processing.audio_io import DecodedAudio
+from src.audio_processing.inference import get_inference_executor
+from src.audio_processing.model_pool import (
+    WHISPER_PRECISIONS,
+    get_whisper_pool,
+    whisper_model,
+)
+from src.audio_processing.model_selection import (
+    WHISPER_MODELS,
+    candidate_models,
+    choose_model,
+    get_throughput_tracker,
+)
+from src.audio_processing.whisper_batcher import WhisperBatcher, get_whisper_batcher
+from src.config import get_config
+from utils.cache import (
+    cache_lyrics,
+    get_cached_lyrics,
+    get_file_fingerprint,
+    init_cache,
+    remember_file_fingerprint,
+)
+from utils.fingerprint import fingerprint_pcm
+
 # Type variable for generic typing
 T = TypeVar('T')
 
@@ -28,6 +68,22 @@ try:
 except ImportError:
     pass
 
+# Whisper models take 16 kHz mono input
+WHISPER_SAMPLE_RATE = 16000
+# Length of one Whisper decoding window; chunks never exceed it
+WHISPER_CHUNK_SECONDS = 30
+# Voice activity on an isolated vocal stem: bleed and reverb tails sit
+# well below this level, and breaths between lines are this short
+VOCAL_SILENCE_DB = -40.0
+VOCAL_MIN_SILENCE_SECONDS = 0.6
+VOCAL_PAD_SECONDS = 0.2
+# Forced alignment: words ending this close to a window's edge are retried
+# in the next window, and no window is offered more words than this rate
+ALIGN_EDGE_SECONDS = 0.5
+ALIGN_MAX_WORDS_PER_SECOND = 6
+# Room left in Whisper's 448-token text context after the start sequence
+ALIGN_MAX_TOKENS = 400
+
 def is_whisper_available() -> bool:
     """Check if Whisper is available for use.
     
@@ -39,6 +95,39 @@ def is_whisper_available() -> bool:
 logger = logging.getLogger(__name__)
 
 
+def _report_skipped(stage: str, seconds: float) -> None:
+    """Count audio left out by voice activity detection, when metrics are served."""
+    try:
+        from src.utils.monitoring import active_metrics
+    except ImportError:
+        return
+    metrics = active_metrics()
+    if metrics is not None:
+        metrics.track_skipped(stage, seconds)
+
+
+@dataclass(frozen=True)
+class LyricWord:
+    """A single word with timestamps.
+    
+    Attributes:
+        text: The word as written in the lyrics
+        start: Start time in seconds
+        end: End time in seconds
+    """
+    text: str
+    start: float
+    end: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the word to a dictionary."""
+        return {
+            'text': self.text,
+            'start': round(self.start, 2),
+            'end': round(self.end, 2)
+        }
+
+
 @dataclass(frozen=True)
 class LyricSegment:
     """A single lyric segment with timestamps.
@@ -47,22 +136,49 @@ class LyricSegment:
         text: The text content of the lyric segment
         start: Start time in seconds
         end: End time in seconds
+        model: Whisper model that transcribed the segment
+        words: Word timestamps, when known (forced alignment)
     """
     text: str
     start: float
     end: float
+    model: Optional[str] = None
+    words: Tuple[LyricWord, ...] = ()
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LyricSegment":
+        """Rebuild a segment from its asdict() form (e.g. the lyrics cache)."""
+        words = tuple(LyricWord(**word) for word in data.get('words') or ())
+        return cls(**{**data, 'words': words})
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the segment to a dictionary.
         
         Returns:
-            Dict containing text, start, and end time of the segment
+            Dict containing text, start, and end time of the segment (and
+            the model, when known)
         """
-        return {
+        data = {
             'text': self.text,
             'start': round(self.start, 2),
             'end': round(self.end, 2)
         }
+        if self.model:
+            data['model'] = self.model
+        if self.words:
+            data['words'] = [word.to_dict() for word in self.words]
+        return data
+
+
+@dataclass
+class _Plan:
+    """Everything decided about a track before its windows are transcribed."""
+    audio: np.ndarray
+    chunks: List[List[Region]]
+    fingerprint: str
+    model_name: str
+    isolated: bool
+    cached: Optional[List[LyricSegment]] = None
 
 class LyricsGenerator:
     """Handles lyrics generation from audio using Whisper.
@@ -71,12 +187,29 @@ class LyricsGenerator:
     synchronized lyrics with timestamps using OpenAI's Whisper model.
     """
     
-    def __init__(self, model_name: str = "large-v2") -> None:
+    def __init__(
+        self,
+        model_name: str = "large-v2",
+        cache: bool = True,
+        precision: Optional[str] = None,
+        latency_budget: Optional[float] = None,
+    ) -> None:
         """Initialize the Whisper model.
         
         Args:
             model_name: Name of the Whisper model to use.
-                Options: 'tiny', 'base', 'small', 'medium', 'large', 'large-v2'
+                Options: 'tiny', 'base', 'small', 'medium', 'large', 'large-v2',
+                or 'auto' to pick one per track to meet the latency budget
+            cache: Reuse transcriptions of the same audio from the lyrics cache
+            precision: 'fp32', or 'int8' for a dynamically quantized model on
+                CPU (much faster there, slightly less accurate). Defaults to
+                the "whisper_precision" setting; ignored on GPU.
+            latency_budget: Seconds within which each track's lyrics should be
+                ready. When set (or with model 'auto', which then defaults to
+                the "whisper_latency_budget" setting) every track gets the
+                largest model up to model_name expected to finish in time,
+                given its voiced duration, the inference queue and measured
+                throughput.
             
         Raises:
             ImportError: If Whisper is not installed
@@ -90,11 +223,26 @@ class LyricsGenerator:
             
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model_name = model_name
-        self._model: Optional[Whisper] = None  # type: ignore[valid-type]  # Conditional import
+        self.cache = cache
+        if model_name == "auto":
+            latency_budget = latency_budget or float(
+                get_config().get("whisper_latency_budget", 300)
+            )
+        self.latency_budget = latency_budget
+        # Largest model adaptive selection may use
+        self.max_model = WHISPER_MODELS[-1] if model_name == "auto" else model_name
+        precision = precision or get_config().get("whisper_precision", "fp32")
+        if precision not in WHISPER_PRECISIONS:
+            raise ValueError(f"Unknown Whisper precision: {precision}")
+        # GPUs already run Whisper in fp16
+        self.precision = precision if self.device == "cpu" else "fp32"
         
     @property
     def model(self) -> Whisper:  # type: ignore[valid-type, no-any-return]
-        """Lazy load and return the Whisper model.
+        """Return the shared Whisper model, loading it on first use.
+        
+        Models live in a process-wide registry keyed by name and device, so
+        every generator (and tool) using the same model shares one copy.
         
         Returns:
             The loaded Whisper model instance
@@ -102,21 +250,12 @@ class LyricsGenerator:
         Raises:
             RuntimeError: If model loading fails
         """
-        if self._model is None:
-            if not _WHISPER_AVAILABLE:
-                raise ImportError("Whisper is not available. Please install it first.")
-                
-            try:
-                self._model = whisper.load_model(  # type: ignore[attr-defined]
-                    self.model_name, 
-                    device=self.device
-                )
-                logger.info("Successfully loaded Whisper model: %s", self.model_name)
-            except Exception as e:
-                error_msg = f"Failed to load Whisper model: {str(e)}"
-                logger.exception(error_msg)
-                raise RuntimeError(error_msg) from e
-        return self._model
+        try:
+            return get_whisper_pool().get((self.max_model, self.device, self.precision))
+        except Exception as e:
+            error_msg = f"Failed to load Whisper model: {str(e)}"
+            logger.exception(error_msg)
+            raise RuntimeError(error_msg) from e
 
     def _safe_get(self, data: Dict[str, Any], key: str, default: T = None) -> T:  # type: ignore[assignment]
         """Safely get a value from a dictionary with type checking.
@@ -134,90 +273,783 @@ class LyricsGenerator:
             return default
         return cast(T, value)
 
+    def _chunk_segments(
+        self, result: Dict[str, Any], chunk: List[Region], model_name: str
+    ) -> List[LyricSegment]:
+        """Turn one chunk's transcription into segments on the track timeline.
+        
+        Args:
+            result: Whisper transcription of gather_regions(audio, chunk)
+            chunk: Regions of the track that were transcribed
+            model_name: Model that produced the transcription
+            
+        Returns:
+            Valid segments with timestamps in seconds from the track start
+        """
+        segments = self._safe_get(result, "segments", [])
+        if not isinstance(segments, list):
+            logger.warning("Unexpected segments format: %s", type(segments).__name__)
+            return []
+
+        lyrics: List[LyricSegment] = []
+        
+        for segment in segments:
+            if not isinstance(segment, dict):
+                logger.debug("Skipping invalid segment: %s", segment)
+                continue
+            
+            text = str(self._safe_get(segment, "text", "")).strip()
+            if not text:
+                continue
+            
+            try:
+                start = float(self._safe_get(segment, "start", 0.0))
+                end = float(self._safe_get(segment, "end", 0.0))
+                
+                # Validate timestamps
+                if start < 0 or end <= 0 or end < start:
+                    logger.warning("Invalid timestamps: start=%s, end=%s", start, end)
+                    continue
+                
+                # Chunk time -> track time
+                start = source_positions(
+                    np.array([start * WHISPER_SAMPLE_RATE]), chunk, side="right"
+                )[0] / WHISPER_SAMPLE_RATE
+                end = source_positions(
+                    np.array([end * WHISPER_SAMPLE_RATE]), chunk, side="left"
+                )[0] / WHISPER_SAMPLE_RATE
+                    
+                lyric_seg = LyricSegment(
+                    text=text,
+                    start=float(start),
+                    end=float(max(end, start)),
+                    model=model_name
+                )
+                lyrics.append(lyric_seg)
+                
+            except (TypeError, ValueError) as e:
+                logger.warning("Invalid segment format: %s - %s", segment, e)
+                continue
+
+        return lyrics
+
     async def generate_lyrics(
         self,
-        audio_path: Path,
+        audio_path: Union[Path, DecodedAudio],
         language: str = "en",
+        vocals: Optional[Union[Path, DecodedAudio]] = None,
     ) -> List[LyricSegment]:
         """Generate synchronized lyrics from audio file.
         
+        Decoding and transcription run on the shared inference executor, so
+        awaiting this never blocks the event loop.
+        
         Args:
-            audio_path: Path to the audio file to transcribe
+            audio_path: Path to the audio file to transcribe, or audio the
+                pipeline has already decoded (no second ffmpeg decode)
             language: ISO 639-1 language code (e.g., 'en' for English, 'es' for Spanish)
+            vocals: Separated vocals stem of the same track; transcribed
+                instead of the mix when given
             
         Returns:
             List of LyricSegment objects containing the transcribed text with timestamps
             
         Raises:
             FileNotFoundError: If the specified audio file doesn't exist
-            ValueError: If the audio file is empty or invalid
+            ProcessingError: If the inference queue is full (status 503)
             RuntimeError: If transcription fails for any reason
         """
-        if not audio_path.exists():
-            error_msg = f"Audio file not found: {audio_path}"
+        # The budget starts now, so time spent queueing counts against it
+        return await get_inference_executor().run(
+            self.transcribe, audio_path, language, vocals, self._deadline()
+        )
+
+    def _load_audio(self, audio_path: Union[Path, DecodedAudio]) -> np.ndarray:
+        """Load audio as 16 kHz mono float32."""
+        if isinstance(audio_path, DecodedAudio):
+            # Reuse the shared decode, converted to 16 kHz mono once
+            return np.ascontiguousarray(
+                audio_path.at(WHISPER_SAMPLE_RATE, 1)[:, 0], dtype=np.float32
+            )
+        # Load audio using Whisper's utility function
+        return whisper.load_audio(str(audio_path))  # type: ignore[attr-defined]
+
+    def _load_source(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        vocals: Optional[Union[Path, DecodedAudio]],
+    ) -> np.ndarray:
+        """Load the vocals stem if given, else the mix, as 16 kHz mono.
+        
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ValueError: If the audio file is empty or invalid
+        """
+        source = vocals if vocals is not None else audio_path
+        if not isinstance(source, DecodedAudio) and not Path(source).exists():
+            error_msg = f"Audio file not found: {source}"
             logger.error(error_msg)
             raise FileNotFoundError(error_msg)
+
+        logger.info("Loading audio file: %s", source)
+        audio = self._load_audio(source)
+        audio_size = len(audio) if hasattr(audio, '__len__') else 0
+        if audio_size == 0:
+            raise ValueError("Empty or invalid audio file")
+        return audio
+
+    def _voiced_regions(self, audio: np.ndarray, isolated: bool) -> List[Region]:
+        """Find the parts of the audio worth sending to the model.
+        
+        On an isolated vocal stem anything above the noise floor is voice,
+        so a higher threshold and much shorter gaps can be cut than on the
+        full mix, where only real silence is safe to skip.
+        """
+        if isolated:
+            return active_regions(
+                audio,
+                WHISPER_SAMPLE_RATE,
+                threshold_db=VOCAL_SILENCE_DB,
+                min_silence=VOCAL_MIN_SILENCE_SECONDS,
+                pad=VOCAL_PAD_SECONDS
+            )
+        return active_regions(audio, WHISPER_SAMPLE_RATE)
+
+    def _prepare(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        vocals: Optional[Union[Path, DecodedAudio]],
+        language: str,
+        deadline: Optional[float] = None,
+        streaming: bool = False,
+    ) -> _Plan:
+        """Load the audio, choose the model and split the voiced parts into windows.
+        
+        Args:
+            audio_path: Path to the audio file, or already decoded audio
+            vocals: Separated vocals stem, preferred over the mix when given
+            language: ISO 639-1 language code
+            deadline: time.monotonic() by which the lyrics are due (adaptive
+                model selection only)
+            streaming: Every window will queue for a worker on its own
             
-        try:
-            logger.info("Loading audio file: %s", audio_path)
+        Returns:
+            Plan with the audio, its windows (none if nothing is voiced or the
+            result is cached), the audio fingerprint, the model to use and
+            the cached transcription if there is one
             
-            # Load audio using Whisper's utility function
-            audio = whisper.load_audio(str(audio_path))  # type: ignore[attr-defined]
-            audio_size = len(audio) if hasattr(audio, '__len__') else 0
-            if audio_size == 0:
-                raise ValueError("Empty or invalid audio file")
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ValueError: If the audio file is empty or invalid
+        """
+        source = vocals if vocals is not None else audio_path
+        isolated = vocals is not None
+        # A file seen before is looked up without decoding it again
+        known = self._known_fingerprint(source)
+        found = self._lookup(known, language, isolated) if known is not None else None
+        if found is not None:
+            name, cached = found
+            logger.info("Using cached %s lyrics (%d segments)", name, len(cached))
+            return _Plan(np.zeros(0, dtype=np.float32), [], known, name, isolated, cached)
+
+        audio = self._load_source(audio_path, vocals)
+        audio_size = len(audio)
+        fingerprint = self._fingerprint(source, audio)
+        candidates = self._candidates()
+        found = self._lookup(fingerprint, language, isolated) if fingerprint != known else None
+        if found is not None:
+            name, cached = found
+            logger.info("Using cached %s lyrics (%d segments)", name, len(cached))
+            return _Plan(audio, [], fingerprint, name, isolated, cached)
+
+        # Only voiced regions are decoded; silence has no lyrics
+        regions = self._voiced_regions(audio, isolated)
+        if not regions:
+            logger.info("No audible content, skipping transcription")
+            return _Plan(audio, [], fingerprint, candidates[-1], isolated)
+        skipped = inactive_seconds(regions, audio_size, WHISPER_SAMPLE_RATE)
+        if skipped:
+            logger.info("Skipping %.1fs without voice", skipped)
+            _report_skipped("transcribe", skipped)
+        chunks = pack_regions(regions, WHISPER_CHUNK_SECONDS * WHISPER_SAMPLE_RATE)
 
-            logger.info("Starting transcription with %s model...", self.model_name)
+        voiced = (audio_size - skipped * WHISPER_SAMPLE_RATE) / WHISPER_SAMPLE_RATE
+        # Windows of a stream queue behind other work one by one
+        model_name = self._pick_model(voiced, deadline, len(chunks) if streaming else 0)
+        return _Plan(audio, chunks, fingerprint, model_name, isolated)
+
+    def _pick_model(
+        self, voiced: float, deadline: Optional[float] = None, queued_windows: int = 0
+    ) -> str:
+        """Largest candidate model expected to get through the voiced audio in time.
+        
+        Args:
+            voiced: Seconds of audio that will be sent to the model
+            deadline: time.monotonic() by which the work is due; defaults to
+                now plus the latency budget
+            queued_windows: Windows that will each queue for a worker
+        """
+        candidates = self._candidates()
+        if self.latency_budget is None:
+            return candidates[-1]
+        if deadline is None:
+            deadline = time.monotonic() + self.latency_budget
+        model_name = choose_model(
+            voiced,
+            deadline - time.monotonic(),
+            get_throughput_tracker(),
+            self.device,
+            self.precision,
+            candidates,
+            queued_windows * get_inference_executor().expected_wait() if queued_windows else 0.0
+        )
+        logger.info(
+            "Chose %s for %.0fs of voiced audio (%.0fs left of the budget)",
+            model_name, voiced, deadline - time.monotonic()
+        )
+        return model_name
+
+    def _candidates(self) -> Tuple[str, ...]:
+        """Models this generator may use, fastest first."""
+        if self.latency_budget is None:
+            return (self.model_name,)
+        return candidate_models(self.max_model)
+
+    def _cache_options(self, isolated: bool) -> Dict[str, Any]:
+        """Settings that change the transcription of the same audio."""
+        return {
+            "precision": self.precision,
+            "source": "vocals" if isolated else "mix",
+            "chunk_seconds": WHISPER_CHUNK_SECONDS,
+            "vad": [VOCAL_SILENCE_DB, VOCAL_MIN_SILENCE_SECONDS, VOCAL_PAD_SECONDS]
+            if isolated else "default",
+            # Batched windows decode without the previous window's prompt
+            "decode": "batched" if get_whisper_batcher() is not None else "prompted",
+        }
+
+    def _known_fingerprint(self, source: Union[Path, DecodedAudio]) -> Optional[str]:
+        """Fingerprint of a file fingerprinted before and unchanged since."""
+        if not self.cache or isinstance(source, DecodedAudio):
+            return None
+        try:
+            return get_file_fingerprint(str(source), init_cache(), "whisper")
+        except sqlite3.Error as e:
+            logger.warning("File fingerprint lookup failed: %s", e)
+            return None
+
+    def _fingerprint(self, source: Union[Path, DecodedAudio], audio: np.ndarray) -> str:
+        """Fingerprint decoded audio, remembering it for the file it came from."""
+        fingerprint = fingerprint_pcm(audio, "whisper")
+        if self.cache and not isinstance(source, DecodedAudio):
+            try:
+                remember_file_fingerprint(str(source), fingerprint, init_cache(), "whisper")
+            except sqlite3.Error as e:
+                logger.warning("Could not remember file fingerprint: %s", e)
+        return fingerprint
+
+    def _lookup(
+        self, fingerprint: str, language: str, isolated: bool
+    ) -> Optional[Tuple[str, List[LyricSegment]]]:
+        """Model name and cached lyrics of the audio (None if never transcribed)."""
+        # Any model we could pick is fine if it has already been run, best first
+        for name in reversed(self._candidates()):
+            cached = self._cached_lyrics(fingerprint, name, language, isolated)
+            if cached is not None:
+                return name, cached
+        return None
+
+    def _cached_lyrics(
+        self, fingerprint: str, model_name: str, language: str, isolated: bool
+    ) -> Optional[List[LyricSegment]]:
+        """Look a transcription up in the lyrics cache (None on a miss)."""
+        if not self.cache:
+            return None
+        try:
+            cached = get_cached_lyrics(
+                fingerprint, init_cache(), model_name, language,
+                self._cache_options(isolated)
+            )
+        except sqlite3.Error as e:
+            logger.warning("Lyrics cache lookup failed: %s", e)
+            return None
+        if cached is None:
+            return None
+        return [LyricSegment.from_dict(segment) for segment in cached]
+
+    def _store_lyrics(self, plan: _Plan, language: str, lyrics: List[LyricSegment]) -> None:
+        """Save a finished transcription to the lyrics cache."""
+        if not self.cache:
+            return
+        try:
+            cache_lyrics(
+                plan.fingerprint, [asdict(segment) for segment in lyrics], init_cache(),
+                plan.model_name, language, self._cache_options(plan.isolated)
+            )
+        except sqlite3.Error as e:
+            logger.warning("Could not cache lyrics: %s", e)
+
+    def _transcribe_chunk(
+        self,
+        audio: np.ndarray,
+        chunk: List[Region],
+        language: str,
+        model_name: str,
+        prompt: Optional[str] = None,
+    ) -> List[LyricSegment]:
+        """Transcribe one window of voiced audio (blocking).
+        
+        Args:
+            audio: 16 kHz mono audio of the whole track
+            chunk: Regions of the track forming this window
+            language: ISO 639-1 language code
+            model_name: Whisper model to use
+            prompt: Text of the preceding lines, for context across windows
             
-            # Run transcription
-            result = self.model.transcribe(  # type: ignore[attr-defined]
-                audio,
+        Returns:
+            Segments of this window on the track timeline
+        """
+        window = gather_regions(audio, chunk)
+        # The lease keeps the model resident while it decodes
+        with whisper_model(model_name, self.device, self.precision) as model:
+            started = time.perf_counter()
+            result = model.transcribe(  # type: ignore[attr-defined]
+                window,
                 verbose=logger.isEnabledFor(logging.DEBUG),
                 language=language,
-                fp16=torch.cuda.is_available()
+                fp16=torch.cuda.is_available(),
+                initial_prompt=prompt
+            )
+            get_throughput_tracker().record(
+                (model_name, self.device, self.precision),
+                len(window) / WHISPER_SAMPLE_RATE,
+                time.perf_counter() - started
             )
+        return self._chunk_segments(result, chunk, model_name)
 
-            logger.info("Formatting lyrics with timestamps")
-            segments = self._safe_get(result, "segments", [])
-            if not isinstance(segments, list):
-                logger.warning("Unexpected segments format: %s", type(segments).__name__)
-                return []
+    def _submit_windows(
+        self, batcher: WhisperBatcher, plan: _Plan, language: str
+    ) -> List[Future]:
+        """Queue every window of a track on the batcher."""
+        key = (plan.model_name, self.device, self.precision, language)
+        return [batcher.submit(key, gather_regions(plan.audio, chunk)) for chunk in plan.chunks]
+
+    @staticmethod
+    def _prompt(lyrics: List[LyricSegment]) -> Optional[str]:
+        """Context passed to the next window: the last few lines."""
+        return " ".join(segment.text for segment in lyrics[-3:]) or None
+
+    def iter_transcribe(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        language: str = "en",
+        vocals: Optional[Union[Path, DecodedAudio]] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[LyricSegment]:
+        """Yield lyric segments window by window as they are decoded (blocking).
+        
+        Args:
+            audio_path: Path to the audio file to transcribe, or audio the
+                pipeline has already decoded (no second ffmpeg decode)
+            language: ISO 639-1 language code (e.g., 'en' for English, 'es' for Spanish)
+            vocals: Separated vocals stem of the same track; transcribed
+                instead of the mix when given
+            deadline: time.monotonic() by which the lyrics are due; defaults
+                to now plus the latency budget
+            
+        Yields:
+            LyricSegment objects in timeline order
+            
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ValueError: If the audio file is empty or invalid
+        """
+        plan = self._prepare(audio_path, vocals, language, deadline)
+        if plan.cached is not None:
+            yield from plan.cached
+            return
+        logger.info(
+            "Starting transcription of %d chunks with %s model...",
+            len(plan.chunks), plan.model_name
+        )
+        lyrics: List[LyricSegment] = []
+        batcher = get_whisper_batcher()
+        if batcher is not None:
+            # All windows go out at once and share batches with other jobs
+            futures = self._submit_windows(batcher, plan, language)
+            try:
+                for chunk, future in zip(plan.chunks, futures):
+                    segments = self._chunk_segments(future.result(), chunk, plan.model_name)
+                    lyrics.extend(segments)
+                    yield from segments
+            finally:
+                # Windows nobody will read any more (closed early or failed)
+                for future in futures:
+                    future.cancel()
+        else:
+            for chunk in plan.chunks:
+                segments = self._transcribe_chunk(
+                    plan.audio, chunk, language, plan.model_name, self._prompt(lyrics)
+                )
+                lyrics.extend(segments)
+                yield from segments
+        logger.info("Generated %d lyric segments", len(lyrics))
+        self._store_lyrics(plan, language, lyrics)
 
-            lyrics: List[LyricSegment] = []
+    async def stream_lyrics(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        language: str = "en",
+        vocals: Optional[Union[Path, DecodedAudio]] = None,
+    ) -> AsyncIterator[LyricSegment]:
+        """Yield lyric segments as soon as each window is transcribed.
+        
+        Loading and every window run as separate jobs on the shared
+        inference executor, so concurrent streams take turns on the model
+        instead of one track holding it until the end.
+        
+        Args:
+            audio_path: Path to the audio file to transcribe, or audio the
+                pipeline has already decoded (no second ffmpeg decode)
+            language: ISO 639-1 language code (e.g., 'en' for English, 'es' for Spanish)
+            vocals: Separated vocals stem of the same track; transcribed
+                instead of the mix when given
             
-            for segment in segments:
-                if not isinstance(segment, dict):
-                    logger.debug("Skipping invalid segment: %s", segment)
-                    continue
-                
-                text = str(self._safe_get(segment, "text", "")).strip()
-                if not text:
-                    continue
-                
-                try:
-                    start = float(self._safe_get(segment, "start", 0.0))
-                    end = float(self._safe_get(segment, "end", 0.0))
-                    
-                    # Validate timestamps
-                    if start < 0 or end <= 0 or end < start:
-                        logger.warning("Invalid timestamps: start=%s, end=%s", start, end)
-                        continue
-                        
-                    lyric_seg = LyricSegment(
-                        text=text,
-                        start=start,
-                        end=end
+        Yields:
+            LyricSegment objects in timeline order
+            
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ProcessingError: If the inference queue is full (status 503)
+            ValueError: If the audio file is empty or invalid
+        """
+        executor = get_inference_executor()
+        plan = await executor.run(
+            self._prepare, audio_path, vocals, language, self._deadline(), True
+        )
+        if plan.cached is not None:
+            for segment in plan.cached:
+                yield segment
+            return
+        lyrics: List[LyricSegment] = []
+        batcher = get_whisper_batcher()
+        if batcher is not None:
+            futures = self._submit_windows(batcher, plan, language)
+            try:
+                for chunk, future in zip(plan.chunks, futures):
+                    segments = self._chunk_segments(
+                        await asyncio.wrap_future(future), chunk, plan.model_name
                     )
-                    lyrics.append(lyric_seg)
-                    
-                except (TypeError, ValueError) as e:
-                    logger.warning("Invalid segment format: %s - %s", segment, e)
-                    continue
+                    lyrics.extend(segments)
+                    for segment in segments:
+                        yield segment
+            finally:
+                # A disconnected client leaves its queued windows undecoded
+                for future in futures:
+                    future.cancel()
+        else:
+            for chunk in plan.chunks:
+                segments = await executor.run(
+                    self._transcribe_chunk,
+                    plan.audio, chunk, language, plan.model_name, self._prompt(lyrics)
+                )
+                lyrics.extend(segments)
+                for segment in segments:
+                    yield segment
+        self._store_lyrics(plan, language, lyrics)
 
-            logger.info("Generated %d lyric segments", len(lyrics))
-            return lyrics
+    async def lookup_lyrics(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        language: str = "en",
+        vocals: Optional[Union[Path, DecodedAudio]] = None,
+    ) -> Optional[List[LyricSegment]]:
+        """Find earlier lyrics of the audio without ever transcribing it.
+        
+        Runs lookup() on the shared inference executor.
+        
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ProcessingError: If the inference queue is full (status 503)
+        """
+        return await get_inference_executor().run(self.lookup, audio_path, language, vocals)
 
+    def lookup(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        language: str = "en",
+        vocals: Optional[Union[Path, DecodedAudio]] = None,
+    ) -> Optional[List[LyricSegment]]:
+        """Cached lyrics of the audio from any model this generator may use (blocking).
+        
+        The audio is never sent to a model. A file whose fingerprint is
+        already known (same path, size and modification time) is not even
+        decoded; others are decoded and fingerprinted once.
+        
+        Returns:
+            The cached segments, or None if the audio has not been transcribed
+            
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ValueError: If the audio file is empty or invalid
+        """
+        if not self.cache:
+            return None
+        source = vocals if vocals is not None else audio_path
+        fingerprint = self._known_fingerprint(source)
+        if fingerprint is None:
+            fingerprint = self._fingerprint(source, self._load_source(audio_path, vocals))
+        found = self._lookup(fingerprint, language, vocals is not None)
+        return found[1] if found is not None else None
+
+    def _deadline(self) -> Optional[float]:
+        """Due time of a track requested now (None without a budget)."""
+        if self.latency_budget is None:
+            return None
+        return time.monotonic() + self.latency_budget
+
+    def transcribe(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        language: str = "en",
+        vocals: Optional[Union[Path, DecodedAudio]] = None,
+        deadline: Optional[float] = None,
+    ) -> List[LyricSegment]:
+        """Generate synchronized lyrics from audio file (blocking).
+        
+        The voiced parts of the audio are packed into chunks of at most one
+        Whisper window, each chunk is transcribed on its own (prompted with
+        the previous chunk's text) and timestamps are mapped back to the
+        original timeline.
+        
+        Args:
+            audio_path: Path to the audio file to transcribe, or audio the
+                pipeline has already decoded (no second ffmpeg decode)
+            language: ISO 639-1 language code (e.g., 'en' for English, 'es' for Spanish)
+            vocals: Separated vocals stem of the same track; transcribed
+                instead of the mix when given
+            deadline: time.monotonic() by which the lyrics are due; defaults
+                to now plus the latency budget
+            
+        Returns:
+            List of LyricSegment objects containing the transcribed text with
+            timestamps, each recording the model that produced it
+            
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ValueError: If the audio file is empty or invalid
+            RuntimeError: If transcription fails for any reason
+        """
+        try:
+            return list(self.iter_transcribe(audio_path, language, vocals, deadline))
+        except FileNotFoundError:
+            raise
         except Exception as e:
             error_msg = f"Failed to generate lyrics: {str(e)}"
             logger.exception(error_msg)
             raise RuntimeError(error_msg) from e
+
+    async def align_lyrics(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        lyrics: Union[str, Sequence[str]],
+        language: str = "en",
+        vocals: Optional[Union[Path, DecodedAudio]] = None,
+    ) -> List[LyricSegment]:
+        """Time known lyrics against the audio without transcribing it.
+        
+        Runs align() on the shared inference executor.
+        
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ProcessingError: If the inference queue is full (status 503)
+            RuntimeError: If alignment fails for any reason
+        """
+        return await get_inference_executor().run(
+            self.align, audio_path, lyrics, language, vocals, self._deadline()
+        )
+
+    def align(
+        self,
+        audio_path: Union[Path, DecodedAudio],
+        lyrics: Union[str, Sequence[str]],
+        language: str = "en",
+        vocals: Optional[Union[Path, DecodedAudio]] = None,
+        deadline: Optional[float] = None,
+    ) -> List[LyricSegment]:
+        """Time known lyrics against the audio (blocking).
+        
+        Instead of decoding token by token, each voiced window gets one
+        forced pass of the known text through the decoder, and word times
+        come from its cross-attention (Whisper's own word-timestamp DTW).
+        Windows take the words that fit them; words squeezed against a
+        window's end are carried over to the next one.
+        
+        Args:
+            audio_path: Path to the audio file, or already decoded audio
+            lyrics: Known lyrics, as text with one line per row or a list
+                of lines (e.g. the texts of a previous transcription)
+            language: ISO 639-1 language code
+            vocals: Separated vocals stem; aligned instead of the mix when given
+            deadline: time.monotonic() by which the alignment is due; the
+                model is chosen as for transcription (latency budget only)
+            
+        Returns:
+            One LyricSegment per non-empty line, with word timestamps
+            
+        Raises:
+            FileNotFoundError: If the specified audio file doesn't exist
+            ValueError: If the audio file is empty or invalid
+            RuntimeError: If alignment fails for any reason
+        """
+        rows = lyrics.splitlines() if isinstance(lyrics, str) else list(lyrics)
+        lines = [line.strip() for line in rows if line.strip()]
+        words = [word for line in lines for word in line.split()]
+        if not words:
+            return []
+        audio = self._load_source(audio_path, vocals)
+        regions = self._voiced_regions(audio, isolated=vocals is not None)
+        if not regions:
+            logger.info("No audible content, nothing to align")
+            return []
+        chunks = pack_regions(regions, WHISPER_CHUNK_SECONDS * WHISPER_SAMPLE_RATE)
+        skipped = inactive_seconds(regions, len(audio), WHISPER_SAMPLE_RATE)
+        _report_skipped("align", skipped)
+        model_name = self._pick_model(len(audio) / WHISPER_SAMPLE_RATE - skipped, deadline)
+
+        try:
+            starts, ends = self._align_words(audio, chunks, words, language, model_name)
+        except Exception as e:
+            error_msg = f"Failed to align lyrics: {str(e)}"
+            logger.exception(error_msg)
+            raise RuntimeError(error_msg) from e
+
+        segments: List[LyricSegment] = []
+        first = 0
+        for line in lines:
+            count = len(line.split())
+            timed = tuple(
+                LyricWord(word, float(start), float(end))
+                for word, start, end in zip(
+                    words[first:first + count],
+                    starts[first:first + count],
+                    ends[first:first + count]
+                )
+            )
+            first += count
+            segments.append(LyricSegment(
+                text=line,
+                start=timed[0].start,
+                end=max(timed[-1].end, timed[0].start),
+                model=model_name,
+                words=timed
+            ))
+        logger.info("Aligned %d lines (%d words)", len(segments), len(words))
+        return segments
+
+    def _align_words(
+        self,
+        audio: np.ndarray,
+        chunks: List[List[Region]],
+        words: List[str],
+        language: str,
+        model_name: str,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and end time (track seconds) of every word.
+        
+        Args:
+            audio: 16 kHz mono audio of the whole track
+            chunks: Voiced windows of at most 30 s
+            words: Lyrics split on whitespace
+            language: ISO 639-1 language code
+            model_name: Whisper model to align with
+            
+        Returns:
+            Arrays of word start and end times
+        """
+        from whisper.audio import HOP_LENGTH, log_mel_spectrogram, pad_or_trim
+        from whisper.timing import find_alignment
+        from whisper.tokenizer import get_tokenizer
+
+        starts = np.zeros(len(words))
+        ends = np.zeros(len(words))
+        cursor = 0
+        word_tokens: List[List[int]] = []
+        for index, chunk in enumerate(chunks):
+            if cursor == len(words):
+                break
+            last = index == len(chunks) - 1
+            window = gather_regions(audio, chunk)
+            duration = len(window) / WHISPER_SAMPLE_RATE
+            # Leased per window, like transcription, so other jobs get turns
+            with whisper_model(model_name, self.device, self.precision) as model:
+                tokenizer = get_tokenizer(
+                    model.is_multilingual,
+                    num_languages=getattr(model, "num_languages", 99),
+                    language=language,
+                    task="transcribe",
+                )
+                if not word_tokens:
+                    word_tokens = [tokenizer.encode(" " + word) for word in words]
+                # No window holds more words than can be sung in it
+                budget = len(words) - cursor if last else max(
+                    1, int(duration * ALIGN_MAX_WORDS_PER_SECOND)
+                )
+                count, tokens = 0, []
+                for ids in word_tokens[cursor:cursor + budget]:
+                    if count and len(tokens) + len(ids) > ALIGN_MAX_TOKENS:
+                        break
+                    tokens.extend(ids)
+                    count += 1
+
+                mel = log_mel_spectrogram(
+                    pad_or_trim(torch.from_numpy(np.ascontiguousarray(window))),
+                    model.dims.n_mels
+                ).to(model.device)
+                timings = find_alignment(model, tokenizer, tokens, mel, len(window) // HOP_LENGTH)
+            window_starts, window_ends = self._word_times(
+                timings, [len(ids) for ids in word_tokens[cursor:cursor + count]]
+            )
+
+            # Keep words that ended clear of the window's edge; the rest
+            # were likely squeezed in and belong to the next window
+            accepted = count if last else int(np.argmax(
+                np.append(window_ends > duration - ALIGN_EDGE_SECONDS, True)
+            ))
+            if not accepted:
+                continue
+            span = slice(cursor, cursor + accepted)
+            starts[span] = source_positions(
+                window_starts[:accepted] * WHISPER_SAMPLE_RATE, chunk, side="right"
+            ) / WHISPER_SAMPLE_RATE
+            ends[span] = source_positions(
+                window_ends[:accepted] * WHISPER_SAMPLE_RATE, chunk, side="left"
+            ) / WHISPER_SAMPLE_RATE
+            cursor += accepted
+
+        if cursor < len(words):
+            # Out of audio (or tokens): pin the remaining words to the end
+            tail = ends[cursor - 1] if cursor else 0.0
+            starts[cursor:] = ends[cursor:] = tail
+        return starts, np.maximum(ends, starts)
+
+    @staticmethod
+    def _word_times(timings: List[Any], lengths: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Map Whisper's word timings onto our words by token position.
+        
+        Whisper splits punctuation into words of its own, so its words do
+        not line up with whitespace words; tokens do.
+        """
+        token_starts = np.repeat([t.start for t in timings], [len(t.tokens) for t in timings])
+        token_ends = np.repeat([t.end for t in timings], [len(t.tokens) for t in timings])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(int)
+        total = int(sum(lengths))
+        if len(token_starts) < total:
+            # Defensive: pad with the last time if tokens were dropped
+            pad = total - len(token_starts)
+            fill = token_ends[-1] if len(token_ends) else 0.0
+            token_starts = np.append(token_starts, [fill] * pad)
+            token_ends = np.append(token_ends, [fill] * pad)
+        return (
+            np.minimum.reduceat(token_starts[:total], offsets),
+            np.maximum.reduceat(token_ends[:total], offsets),
+        )
@@ -0,0 +1,123 @@
+"""
+model_selection.py ────────────────────────────────────────────────────────────
+Summary: Pick the largest Whisper model that meets a latency budget
+ModLog : 2026-10-18 Initial implementation
+"""
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+# Whisper models from fastest to most accurate
+WHISPER_MODELS = ("tiny", "base", "small", "medium", "large-v2")
+
+# Real-time factor (processing seconds per audio second) assumed for fp32 on
+# CPU until a model has been measured on this machine
+PRIOR_RTF = {"tiny": 0.1, "base": 0.2, "small": 0.6, "medium": 1.5, "large-v2": 3.0}
+# Speed-up of the other configurations over CPU fp32, also only a prior
+INT8_SPEEDUP = 2.0
+GPU_SPEEDUP = 10.0
+# Weight of the newest measurement in the moving average
+SMOOTHING = 0.3
+
+ThroughputKey = Tuple[str, str, str]
+
+
+class ThroughputTracker:
+    """Thread-safe moving average of measured real-time factors.
+
+    Keyed by (model name, device, precision); unmeasured models fall back
+    to PRIOR_RTF scaled for the device and precision.
+    """
+
+    def __init__(self, smoothing: float = SMOOTHING):
+        """
+        Initialize a tracker
+
+        Args:
+            smoothing: Weight of each new measurement (0..1]
+        """
+        self.smoothing = smoothing
+        self._rtf: Dict[ThroughputKey, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: ThroughputKey, audio_seconds: float, seconds: float) -> None:
+        """
+        Add a measurement
+
+        Args:
+            key: (model name, device, precision)
+            audio_seconds: Audio processed
+            seconds: Wall time it took
+        """
+        if audio_seconds <= 0:
+            return
+        rtf = seconds / audio_seconds
+        with self._lock:
+            previous = self._rtf.get(key)
+            self._rtf[key] = rtf if previous is None else (
+                self.smoothing * rtf + (1 - self.smoothing) * previous
+            )
+
+    def rtf(self, key: ThroughputKey) -> float:
+        """Measured (or prior) processing seconds per audio second"""
+        with self._lock:
+            measured = self._rtf.get(key)
+        if measured is not None:
+            return measured
+        name, device, precision = key
+        prior = PRIOR_RTF.get(name, PRIOR_RTF["large-v2"])
+        if device != "cpu":
+            return prior / GPU_SPEEDUP
+        return prior / INT8_SPEEDUP if precision == "int8" else prior
+
+
+def candidate_models(ceiling: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Models up to and including `ceiling`, fastest first
+
+    Without a ceiling every model qualifies; a name outside WHISPER_MODELS
+    (e.g. "large-v3") takes the place of the largest one.
+    """
+    if ceiling is None:
+        return WHISPER_MODELS
+    if ceiling not in WHISPER_MODELS:
+        return WHISPER_MODELS[:-1] + (ceiling,)
+    return WHISPER_MODELS[:WHISPER_MODELS.index(ceiling) + 1]
+
+
+def choose_model(
+    audio_seconds: float,
+    budget: float,
+    tracker: ThroughputTracker,
+    device: str,
+    precision: str,
+    candidates: Sequence[str] = WHISPER_MODELS,
+    queue_seconds: float = 0.0,
+) -> str:
+    """
+    Largest model expected to transcribe a track within the budget
+
+    Args:
+        audio_seconds: Audio to transcribe
+        budget: Seconds left to deliver the lyrics
+        tracker: Measured throughput
+        device: Torch device the model runs on
+        precision: "fp32" or "int8"
+        candidates: Models to choose from, fastest first
+        queue_seconds: Expected time spent waiting for inference workers
+
+    Returns:
+        The chosen model; the fastest candidate if none fits
+    """
+    available = budget - queue_seconds
+    for name in reversed(candidates):
+        if audio_seconds * tracker.rtf((name, device, precision)) <= available:
+            return name
+    return candidates[0]
+
+
+_tracker = ThroughputTracker()
+
+
+def get_throughput_tracker() -> ThroughputTracker:
+    """Get the process-wide Whisper throughput measurements"""
+    return _tracker
@@ -0,0 +1,223 @@
+"""
+parallel.py ───────────────────────────────────────────────────────────────────
+Summary: Process pool of warm separator workers for sharded separation
+ModLog : 2026-10-18 Initial implementation
+         2026-10-18 Workers load any separation backend
+         2026-10-18 Segments sliced from a shared decoded buffer when available
+         2026-10-18 Silent parts of a segment skip inference
+         2026-10-18 Worker count bounded by memory; broken pools discarded
+         2026-10-18 Workers honour the skip_silence setting
+         2026-10-18 Segments submitted through a bounded window
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.audio_processing.model_pool import model_key
+from src.config import get_config
+from src.utils.logging import Logger
+
+logger = Logger.get_logger("ParallelSeparator")
+
+# Separator owned by this worker process, loaded once by the initializer
+_worker_separator: Any = None
+
+# Resident memory of one worker with a loaded TensorFlow or Demucs model, and
+# what the parent process keeps for itself (its own models, decoded audio)
+WORKER_MEMORY_BYTES = 1536 * 1024 ** 2
+PARENT_MEMORY_BYTES = 512 * 1024 ** 2
+# cgroup v2 and v1 memory limits of the container, if any
+CGROUP_MEMORY_LIMITS = (
+    "/sys/fs/cgroup/memory.max",
+    "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+)
+
+# Segments submitted per worker ahead of the one being stitched: enough to
+# keep every worker busy, few enough that the parent holds little audio
+SEGMENTS_IN_FLIGHT_PER_WORKER = 2
+
+_pools: Dict[Tuple[Hashable, int], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _init_worker(model_config: Any, threads: int) -> None:
+    """
+    Load and warm the worker's separator before it accepts segments
+
+    Intra-op threads are capped so that workers x threads matches the cores
+    instead of every worker trying to use all of them.
+    """
+    global _worker_separator
+    for var in ("OMP_NUM_THREADS", "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"):
+        os.environ[var] = str(threads)
+    from src.audio_processing.backends import get_backend
+
+    _worker_separator = get_backend(model_config)
+    _worker_separator.load()
+
+
+def _separate_segment(
+    audio_path: Any, start: int, length: int, sample_rate: int, skip_silence: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Decode (or slice) and separate one segment inside a worker
+
+    Args:
+        audio_path: Path to the audio file, or a DecodedAudio whose buffer
+            the worker maps without decoding
+        start: First sample of the segment
+        length: Samples in the segment
+        sample_rate: Separator sample rate
+        skip_silence: Leave silent parts of the segment out of inference
+
+    Returns:
+        Mapping of stem name to (length, channels) waveform
+    """
+    from src.audio_processing.activity import separate_active
+    from src.audio_processing.audio_io import DecodedAudio, load_pcm
+
+    if isinstance(audio_path, DecodedAudio):
+        waveform = audio_path.at(sample_rate, 2)[start:start + length]
+    else:
+        waveform = load_pcm(
+            audio_path,
+            sample_rate=sample_rate,
+            offset=start / sample_rate,
+            duration=length / sample_rate,
+        )
+    # Seek/duration are in seconds; pin the segment to its exact sample count
+    if len(waveform) < length:
+        pad = np.zeros((length - len(waveform), waveform.shape[1]), dtype=np.float32)
+        waveform = np.concatenate([waveform, pad])
+    waveform = waveform[:length]
+    if not skip_silence:
+        return _worker_separator.separate(waveform)
+    return separate_active(_worker_separator.separate, waveform, sample_rate)
+
+
+def available_memory() -> Optional[int]:
+    """Memory this process may use: the container limit, else physical RAM"""
+    for path in CGROUP_MEMORY_LIMITS:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a huge number
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_workers() -> int:
+    """
+    Number of separator workers to use when none is requested
+
+    One per core, but no more than fit in memory next to the parent: every
+    worker holds a full copy of the model, so a 1 GiB pod gets one worker.
+    The "separator_workers" config value overrides this.
+    """
+    configured = get_config().get("separator_workers")
+    if configured:
+        return max(1, int(configured))
+    workers = os.cpu_count() or 1
+    memory = available_memory()
+    if memory is not None:
+        per_worker = int(get_config().get("separator_worker_memory", WORKER_MEMORY_BYTES))
+        workers = min(workers, (memory - PARENT_MEMORY_BYTES) // per_worker)
+    return max(1, workers)
+
+
+def get_worker_pool(model_config: Any, workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Get the persistent worker pool for a model configuration
+
+    Pools are created on first use and kept, so later requests find their
+    workers with the model already loaded.
+
+    Args:
+        model_config: Separation backend descriptor
+        workers: Number of worker processes
+
+    Returns:
+        Process pool whose workers hold a warm separator
+    """
+    workers = workers or default_workers()
+    key = (model_key(model_config), workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            logger.info("Starting %d separator workers for %s", workers, key[0])
+            # TensorFlow does not survive fork; always start clean interpreters
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_config, threads),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def map_bounded(
+    pool: Executor, fn: Callable[..., Any], calls: Iterable[Tuple], in_flight: int
+) -> Iterator[Any]:
+    """
+    Run fn(*args) for every call on a pool, yielding results in order
+
+    Unlike pool.map, which submits everything at once and keeps each result
+    until it is consumed, at most `in_flight` calls are pending or waiting
+    to be consumed, so the parent never holds the stems of a whole track.
+
+    Args:
+        pool: Executor to run the calls on
+        fn: Function to call
+        calls: Argument tuples, one per call
+        in_flight: Maximum calls submitted and not yet consumed
+
+    Yields:
+        Results in the order of `calls`
+    """
+    calls = iter(calls)
+    pending: Deque = deque(pool.submit(fn, *args) for args in itertools.islice(calls, in_flight))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            # Refill before handing the result over, so workers stay busy
+            for args in itertools.islice(calls, 1):
+                pending.append(pool.submit(fn, *args))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def discard_worker_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Forget a pool, e.g. after a worker died and it raised BrokenProcessPool
+
+    A broken pool rejects every new task, so the next get_worker_pool call
+    must start fresh workers instead of finding it cached.
+    """
+    with _pools_lock:
+        for key in [key for key, cached in _pools.items() if cached is pool]:
+            del _pools[key]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_worker_pools() -> None:
+    """Stop every worker pool"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(cancel_futures=True)
+        _pools.clear()
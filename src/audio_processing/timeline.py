@@ -0,0 +1,173 @@
+"""
+timeline.py ───────────────────────────────────────────────────────────────────
+Summary: Columnar lyric timeline with binary-search lookup for playback sync
+ModLog : 2026-10-18 Initial implementation
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+# Gap (seconds) above which consecutive segments start a new karaoke line
+KARAOKE_GAP = 0.5
+
+
+class LyricTimeline:
+    """Timed lyric units (lines or words) stored as parallel arrays.
+
+    Start and end times are float64 arrays sorted by start; each unit's text
+    is an index into a table of unique strings, so repeated choruses are
+    stored once. Lookups are a binary search over the start times.
+    """
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        text_ids: np.ndarray,
+        texts: Sequence[str],
+    ):
+        """
+        Initialize a timeline from its columns
+
+        Args:
+            starts: Start times in seconds, ascending
+            ends: End times in seconds
+            text_ids: Index into texts of each unit
+            texts: Interned text table
+        """
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self.text_ids = np.asarray(text_ids, dtype=np.int32)
+        self.texts = list(texts)
+
+    @classmethod
+    def from_segments(
+        cls, segments: Iterable[Union[Mapping[str, Any], Any]]
+    ) -> "LyricTimeline":
+        """
+        Build a timeline from LyricSegment objects or {text, start, end} dicts
+
+        Args:
+            segments: Timed lyric units in any order
+
+        Returns:
+            Timeline sorted by start time
+        """
+        interned: Dict[str, int] = {}
+        starts, ends, ids = [], [], []
+        for segment in segments:
+            if isinstance(segment, Mapping):
+                text, start, end = segment["text"], segment["start"], segment["end"]
+            else:
+                text, start, end = segment.text, segment.start, segment.end
+            starts.append(start)
+            ends.append(end)
+            ids.append(interned.setdefault(text, len(interned)))
+        order = np.argsort(np.asarray(starts, dtype=np.float64), kind="stable")
+        return cls(
+            np.asarray(starts, dtype=np.float64)[order],
+            np.asarray(ends, dtype=np.float64)[order],
+            np.asarray(ids, dtype=np.int32)[order],
+            list(interned),
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, index: int) -> str:
+        """Text of one unit"""
+        return self.texts[self.text_ids[index]]
+
+    def unit(self, index: int) -> Dict[str, Any]:
+        """One unit as {index, text, start, end}"""
+        return {
+            "index": int(index),
+            "text": self.text(index),
+            "start": round(float(self.starts[index]), 2),
+            "end": round(float(self.ends[index]), 2),
+        }
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Every unit as {text, start, end}"""
+        return [
+            {"text": self.texts[text_id], "start": round(start, 2), "end": round(end, 2)}
+            for text_id, start, end in zip(
+                self.text_ids.tolist(), self.starts.tolist(), self.ends.tolist()
+            )
+        ]
+
+    def active_many(self, times: np.ndarray) -> np.ndarray:
+        """
+        Units active at each of many times
+
+        Args:
+            times: Playback positions in seconds
+
+        Returns:
+            Index of the unit covering each time, -1 where none does
+        """
+        times = np.asarray(times, dtype=np.float64)
+        index = np.searchsorted(self.starts, times, side="right") - 1
+        covered = (index >= 0) & (times < self.ends[np.maximum(index, 0)])
+        return np.where(covered, index, -1)
+
+    def active(self, time: float) -> Optional[int]:
+        """Index of the unit playing at `time`, None between units"""
+        if not len(self):
+            return None
+        index = int(self.active_many(np.array([time]))[0])
+        return index if index >= 0 else None
+
+    def next_after(self, time: float) -> Optional[int]:
+        """Index of the first unit starting after `time`, None at the end"""
+        index = int(np.searchsorted(self.starts, time, side="right"))
+        return index if index < len(self) else None
+
+    def karaoke_lines(self, max_gap: float = KARAOKE_GAP) -> "LyricTimeline":
+        """
+        Merge units separated by at most max_gap seconds into lines
+
+        Args:
+            max_gap: Largest pause kept inside a line
+
+        Returns:
+            Timeline of lines, each spanning its first start to its last end
+        """
+        if not len(self):
+            return LyricTimeline(self.starts, self.ends, self.text_ids, [])
+        breaks = np.flatnonzero(self.starts[1:] - self.ends[:-1] > max_gap) + 1
+        firsts = np.concatenate([[0], breaks])
+        starts = self.starts[firsts]
+        ends = np.maximum.reduceat(self.ends, firsts)
+        texts = [
+            " ".join(self.texts[text_id] for text_id in line.tolist())
+            for line in np.split(self.text_ids, breaks)
+        ]
+        interned: Dict[str, int] = {}
+        ids = np.array([interned.setdefault(text, len(interned)) for text in texts], np.int32)
+        return LyricTimeline(starts, ends, ids, list(interned))
+
+    def estimate_words(self) -> "LyricTimeline":
+        """
+        Split units into words with times spread by character count
+
+        An approximation for transcripts without word timings: each word
+        gets a share of its unit's duration proportional to its length.
+        """
+        interned: Dict[str, int] = {}
+        starts, ends, ids = [], [], []
+        for index in range(len(self)):
+            words = self.text(index).split()
+            if not words:
+                continue
+            weights = np.cumsum([0] + [len(word) + 1 for word in words], dtype=np.float64)
+            bounds = self.starts[index] + (
+                (self.ends[index] - self.starts[index]) * weights / weights[-1]
+            )
+            starts.extend(bounds[:-1].tolist())
+            ends.extend(bounds[1:].tolist())
+            ids.extend(interned.setdefault(word, len(interned)) for word in words)
+        return LyricTimeline(
+            np.array(starts, np.float64), np.array(ends, np.float64),
+            np.array(ids, np.int32), list(interned)
+        )
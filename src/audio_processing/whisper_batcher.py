@@ -0,0 +1,284 @@
+"""
+whisper_batcher.py ────────────────────────────────────────────────────────────
+Summary: Decode 30 s Whisper windows from concurrent jobs in shared batches
+ModLog : 2026-10-18 Initial implementation
+         2026-10-18 Temperature fallback for failed windows, as transcribe() does
+         2026-10-18 Segment splitting follows Whisper's consecutive-timestamp rule
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.audio_processing.model_pool import whisper_model
+from src.audio_processing.model_selection import get_throughput_tracker
+from src.config import get_config
+from src.utils.logging import Logger
+
+logger = Logger.get_logger("WhisperBatcher")
+
+# Seconds per Whisper timestamp token
+TIME_PRECISION = 0.02
+# Whisper's own rule for dropping a window as silence
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+# Whisper's rule for re-decoding a window: repetitive (compresses too
+# well) or unlikely text is sampled again at each of these temperatures
+COMPRESSION_RATIO_THRESHOLD = 2.4
+FALLBACK_TEMPERATURES = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+# (model name, device, precision, language)
+BatchKey = Tuple[str, str, str, str]
+
+
+def tokens_to_segments(
+    tokens: List[int],
+    timestamp_begin: int,
+    decode: Callable[[List[int]], str],
+    duration: float,
+) -> List[Dict[str, Any]]:
+    """
+    Split a decoded window into timed segments, as whisper.transcribe does
+
+    Whisper emits "<|t0|> text <|t1|><|t1|> text <|t2|>": a pair of
+    consecutive timestamp tokens ends one segment and starts the next, and
+    a window may end on a single timestamp, which closes its last segment.
+    Without any pair the whole window is one segment ending at its last
+    timestamp (or at the window's end). Text after the last pair that no
+    timestamp closes is decoded again from a new window by transcribe();
+    a batch has no next window, so it runs to the end of this one.
+
+    Args:
+        tokens: Sampled tokens of one window (no special start tokens)
+        timestamp_begin: Id of the <|0.00|> token
+        decode: Token ids to text
+        duration: Seconds of audio in the window
+
+    Returns:
+        Segment dicts with text, start and end (seconds from window start)
+    """
+    is_timestamp = [token >= timestamp_begin for token in tokens]
+    segments: List[Dict[str, Any]] = []
+
+    def seconds(token: int) -> float:
+        return (token - timestamp_begin) * TIME_PRECISION
+
+    def add(part: List[int], start: float, end: float) -> None:
+        text = [token for token in part if token < timestamp_begin]
+        if text:
+            segments.append({"text": decode(text), "start": start, "end": max(end, start)})
+
+    # Positions just after each pair of consecutive timestamps
+    slices = [
+        index + 1 for index in range(len(tokens) - 1)
+        if is_timestamp[index] and is_timestamp[index + 1]
+    ]
+    if not slices:
+        timestamps = [token for token in tokens if token >= timestamp_begin]
+        end = duration
+        if timestamps and timestamps[-1] != timestamp_begin:
+            end = seconds(timestamps[-1])
+        add(tokens, 0.0, end)
+        return segments
+
+    if is_timestamp[-2:] == [False, True]:
+        slices.append(len(tokens))
+    last = 0
+    for current in slices:
+        part = tokens[last:current]
+        # Text before the first timestamp starts with the window
+        start = seconds(part[0]) if is_timestamp[last] else 0.0
+        add(part, start, seconds(part[-1]))
+        last = current
+    # Slices end between the two timestamps of a pair, so a tail opens with one
+    tail = tokens[last:]
+    if tail:
+        add(tail, seconds(tail[0]), duration)
+    return segments
+
+
+def is_silent(result: Any) -> bool:
+    """Whether Whisper would drop a decoded window as silence"""
+    return (
+        result.no_speech_prob > NO_SPEECH_THRESHOLD
+        and result.avg_logprob < LOGPROB_THRESHOLD
+    )
+
+
+def needs_fallback(result: Any) -> bool:
+    """Whether Whisper would decode a window again at a higher temperature"""
+    if is_silent(result):
+        return False
+    return (
+        result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+        or result.avg_logprob < LOGPROB_THRESHOLD
+    )
+
+
+class _Request:
+    __slots__ = ("audio", "future", "queued")
+
+    def __init__(self, audio: np.ndarray):
+        self.audio = audio
+        self.future: Future = Future()
+        self.queued = time.monotonic()
+
+
+class WhisperBatcher:
+    """Collect windows from all pending jobs and decode them together.
+
+    A batch is sent as soon as `max_batch` windows for the same model and
+    language are waiting, or when the oldest one has waited `max_wait`
+    seconds. One batched forward pass keeps every core busy where a single
+    window leaves most of the matrix units idle. Windows decode without a
+    prompt from the previous window, since batch members are unrelated.
+    Windows whose greedy decode fails Whisper's quality checks are decoded
+    again, together, at rising temperatures, as transcribe() would.
+    """
+
+    def __init__(self, max_batch: int = 8, max_wait: float = 0.05):
+        """
+        Initialize a batcher
+
+        Args:
+            max_batch: Windows per forward pass
+            max_wait: Longest time (seconds) a window waits for company
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: "OrderedDict[BatchKey, List[_Request]]" = OrderedDict()
+        self._ready = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: BatchKey, audio: np.ndarray) -> Future:
+        """
+        Queue a window for decoding
+
+        Args:
+            key: (model name, device, precision, language)
+            audio: Up to 30 s of 16 kHz mono float32 audio
+
+        Returns:
+            Future resolving to a Whisper-style result ({"text", "segments"})
+        """
+        request = _Request(audio)
+        with self._ready:
+            self._pending.setdefault(key, []).append(request)
+            self._ready.notify()
+        return request.future
+
+    def _next_batch(self) -> Tuple[BatchKey, List[_Request]]:
+        """Block until a batch is full or its oldest window has waited enough"""
+        with self._ready:
+            while True:
+                timeout = None
+                for key, requests in self._pending.items():
+                    waited = time.monotonic() - requests[0].queued
+                    if len(requests) >= self.max_batch or waited >= self.max_wait:
+                        batch = requests[:self.max_batch]
+                        del requests[:self.max_batch]
+                        if not requests:
+                            del self._pending[key]
+                        return key, batch
+                    remaining = self.max_wait - waited
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                self._ready.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            key, batch = self._next_batch()
+            # Skip windows whose caller gave up (e.g. a closed stream)
+            batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self._decode(key, [request.audio for request in batch])
+            except Exception as e:
+                logger.exception("Batched decode of %d windows failed", len(batch))
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+    def _decode(self, key: BatchKey, windows: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """Run one forward pass over a batch of windows"""
+        import torch
+        import whisper
+        from whisper.tokenizer import get_tokenizer
+
+        name, device, precision, language = key
+        with whisper_model(name, device, precision) as model:
+            started = time.perf_counter()
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(torch.from_numpy(window)), model.dims.n_mels
+                )
+                for window in windows
+            ]).to(model.device)
+            options = {
+                "language": language,
+                "without_timestamps": False,
+                "fp16": device != "cpu",
+            }
+            decoded = list(whisper.decode(
+                model, mel, whisper.DecodingOptions(temperature=0.0, **options)
+            ))
+            for temperature in FALLBACK_TEMPERATURES:
+                retry = [index for index, result in enumerate(decoded) if needs_fallback(result)]
+                if not retry:
+                    break
+                logger.debug("Re-decoding %d windows at temperature %.1f", len(retry), temperature)
+                redecoded = whisper.decode(
+                    model, mel[retry], whisper.DecodingOptions(temperature=temperature, **options)
+                )
+                for index, result in zip(retry, redecoded):
+                    decoded[index] = result
+            tokenizer = get_tokenizer(
+                model.is_multilingual,
+                num_languages=getattr(model, "num_languages", 99),
+                language=language,
+                task="transcribe",
+            )
+            audio_seconds = sum(len(window) for window in windows) / whisper.audio.SAMPLE_RATE
+            get_throughput_tracker().record(
+                (name, device, precision), audio_seconds, time.perf_counter() - started
+            )
+
+        results = []
+        for window, result in zip(windows, decoded):
+            silent = is_silent(result)
+            segments = [] if silent else tokens_to_segments(
+                result.tokens,
+                tokenizer.timestamp_begin,
+                tokenizer.decode,
+                len(window) / whisper.audio.SAMPLE_RATE,
+            )
+            results.append({"text": "" if silent else result.text, "segments": segments})
+        logger.debug("Decoded a batch of %d %s windows", len(windows), name)
+        return results
+
+
+_batcher: Optional[WhisperBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_whisper_batcher() -> Optional[WhisperBatcher]:
+    """Get the process-wide batcher, or None when batching is disabled"""
+    global _batcher
+    config = get_config()
+    batch_size = int(config.get("whisper_batch_size", 1))
+    if batch_size <= 1:
+        return None
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = WhisperBatcher(
+                max_batch=batch_size,
+                max_wait=float(config.get("whisper_batch_wait", 0.05)),
+            )
+            logger.info("Batching up to %d Whisper windows", batch_size)
+        return _batcher
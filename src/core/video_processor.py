@@ -40,8 +40,11 @@ class VideoProcessor:
             # Separate stems
             stem_paths = await self.stem_separator.separate_stems(video_path)
 
-            # Generate lyrics
-            lyrics = await self.lyrics_generator.generate_lyrics(video_path)
+            # Generate lyrics from the isolated vocals when separation produced them
+            vocals = stem_paths.get('vocals') if isinstance(stem_paths, dict) else None
+            lyrics = await self.lyrics_generator.generate_lyrics(
+                video_path, vocals=Path(vocals) if vocals else None
+            )
 
             # Update database
             self.db.update_video_stems(video_path, stem_paths)
@@ -3,9 +3,13 @@ monitoring.py ──────────────────────
 Author : ChatGPT for CBW  ✦ 2025-05-24
 Summary: Prometheus metrics utility for JamSplitter
 ModLog : 2025-05-24 Initial implementation
+         2026-10-18 Stage timings and audio skipped as silent
+         2026-10-18 Process-wide collector shared by the app and its task manager
+         2026-10-18 Silence skipped outside job stages (Whisper VAD)
 """
 from prometheus_client import Counter, Histogram, Gauge, start_http_server
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import threading
 import time
 
 class Metrics:
@@ -45,6 +49,18 @@ class Metrics:
             'Processing duration in seconds'
         )
 
+        self.stage_duration = Histogram(
+            'jamsplitter_stage_duration_seconds',
+            'Duration of a job pipeline stage in seconds',
+            ['stage']
+        )
+
+        self.skipped_audio = Counter(
+            'jamsplitter_skipped_audio_seconds_total',
+            'Seconds of silent audio not sent through a model',
+            ['stage']
+        )
+
         # Queue metrics
         self.queue_size = Gauge(
             'jamsplitter_queue_size',
@@ -78,6 +94,30 @@ class Metrics:
         self.processing_total.labels(status=status).inc()
         self.processing_duration.observe(duration)
 
+    def track_stage(self, stage: str, duration: float, skipped: float = 0.0) -> None:
+        """
+        Track one pipeline stage of a job
+
+        Args:
+            stage: Stage name (decode, separate, encode, transcribe)
+            duration: Stage duration in seconds
+            skipped: Seconds of audio the stage skipped as silent
+        """
+        self.stage_duration.labels(stage=stage).observe(duration)
+        if skipped:
+            self.skipped_audio.labels(stage=stage).inc(skipped)
+
+    def track_skipped(self, stage: str, skipped: float) -> None:
+        """
+        Count audio a stage skipped as silent, without timing the stage
+
+        Args:
+            stage: Stage name (e.g. transcribe, align)
+            skipped: Seconds of audio skipped
+        """
+        if skipped:
+            self.skipped_audio.labels(stage=stage).inc(skipped)
+
     def update_queue_size(self, size: int) -> None:
         """
         Update queue size metric
@@ -105,3 +145,37 @@ class Metrics:
             context: Operation context
         """
         self.processing_total.labels(status="success").inc()
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics(port: int = 8001) -> Metrics:
+    """
+    Get the process-wide metrics collector, starting its server on first use
+
+    Prometheus collectors can only be registered once per process, so every
+    component reports through this instance.
+
+    Args:
+        port: Port for the Prometheus metrics server (first call only)
+
+    Returns:
+        Shared Metrics instance
+    """
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(port)
+        return _metrics
+
+
+def active_metrics() -> Optional[Metrics]:
+    """
+    Get the metrics collector if one has been started, without starting it
+
+    Returns:
+        Shared Metrics instance, or None when metrics are not being served
+    """
+    return _metrics
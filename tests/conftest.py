@@ -11,7 +11,7 @@ import sqlite3
 import tempfile
 import pytest
 
-from utils.cache import DB_PATH
+from utils.cache import DB_PATH, close_cache
 
 @pytest.fixture(autouse=True)
 def temp_cache_db(monkeypatch):
@@ -21,11 +21,13 @@ def temp_cache_db(monkeypatch):
     tmp = tempfile.NamedTemporaryFile(delete=False)
     monkeypatch.setattr('utils.cache.DB_PATH', tmp.name)
     yield
+    close_cache()
     tmp.close()
-    try:
-        os.remove(tmp.name)
-    except FileNotFoundError:
-        pass
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(tmp.name + suffix)
+        except FileNotFoundError:
+            pass
 
 @pytest.fixture
 def tmp_output_dir(tmp_path, monkeypatch):
@@ -0,0 +1,68 @@
+"""
+test_activity.py ─────────────────────────────────────────────────────────────
+Summary: Unit tests for silence detection and silence-aware separation
+ModLog : 2026-10-18  Initial version
+"""
+
+import numpy as np
+from src.audio_processing.activity import (
+    active_regions, clip_regions, frame_rms, gather_regions, inactive_seconds,
+    pack_regions, separate_active, source_positions
+)
+
+SR = 1000
+
+def track(*parts):
+    """Concatenate (seconds, amplitude) parts into a stereo test signal"""
+    rng = np.random.default_rng(3)
+    return np.concatenate([
+        rng.uniform(-amp, amp, (int(sec * SR), 2)).astype(np.float32) for sec, amp in parts
+    ])
+
+def test_frame_rms():
+    rms = frame_rms(np.ones((120, 2), np.float32), 50)
+    np.testing.assert_allclose(rms, [1.0, 1.0, np.sqrt(20 / 50)])
+
+def test_long_silences_are_skipped_with_padding():
+    signal = track((3, 0), (4, 0.5), (3, 0), (2, 0.5))
+    regions = active_regions(signal, SR)
+    assert regions == [(2750, 7250), (9750, 12000)]
+    assert inactive_seconds(regions, len(signal), SR) == 5.25
+
+def test_short_gaps_stay_active():
+    signal = track((2, 0.5), (1, 0), (2, 0.5))
+    assert active_regions(signal, SR) == [(0, 5000)]
+
+def test_silent_track_has_no_regions():
+    assert active_regions(np.zeros((5000, 2), np.float32), SR) == []
+
+def test_clip_regions():
+    assert clip_regions([(0, 100), (200, 300)], 50, 250) == [(0, 50), (150, 200)]
+
+def test_separate_active_zero_fills_silence():
+    signal = track((3, 0), (4, 0.5), (3, 0))
+    calls = []
+    def separate(waveform):
+        calls.append(len(waveform))
+        return {"vocals": waveform, "other": waveform * 0 + 1}
+    stems = separate_active(separate, signal, SR)
+    assert calls == [4500]
+    assert stems["other"].shape == signal.shape
+    assert stems["other"][:2750].sum() == 0 and stems["other"][7250:].sum() == 0
+    np.testing.assert_array_equal(stems["vocals"][2750:7250], signal[2750:7250])
+
+def test_pack_regions_keeps_regions_whole_unless_too_long():
+    regions = [(0, 10), (20, 35), (40, 48), (50, 90)]
+    assert pack_regions(regions, 30) == [
+        [(0, 10), (20, 35)], [(40, 48)], [(50, 80)], [(80, 90)]
+    ]
+
+def test_source_positions_round_trip():
+    samples = np.arange(100, dtype=np.float32)
+    regions = [(10, 20), (50, 60)]
+    gathered = gather_regions(samples, regions)
+    positions = np.arange(len(gathered))
+    np.testing.assert_array_equal(source_positions(positions, regions), gathered)
+    # A boundary is the end of one region or the start of the next
+    assert source_positions(np.array([10]), regions, side="left")[0] == 20
+    assert source_positions(np.array([10]), regions, side="right")[0] == 50
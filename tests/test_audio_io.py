@@ -0,0 +1,70 @@
+"""
+test_audio_io.py ─────────────────────────────────────────────────────────────
+Summary: Unit tests for the shared decoded-audio buffer
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Anti-aliased resampling and disk-backed converted views
+"""
+
+import os
+import pickle
+import numpy as np
+from src.audio_processing.audio_io import DecodedAudio, resample
+
+def make_buffer(tmp_path, samples, owned=False):
+    path = tmp_path / "audio.f32"
+    samples.astype("<f4").tofile(path)
+    return DecodedAudio(path, 44100, samples.shape[1], owned=owned)
+
+def test_native_view_is_zero_copy(tmp_path):
+    samples = np.random.default_rng(0).uniform(-1, 1, (4410, 2)).astype(np.float32)
+    audio = make_buffer(tmp_path, samples)
+    assert isinstance(audio.samples, np.memmap)
+    assert audio.at(44100, 2) is audio.samples
+    np.testing.assert_array_equal(audio.samples, samples)
+    assert audio.duration == 0.1
+
+def test_converted_views_are_computed_once(tmp_path):
+    audio = make_buffer(tmp_path, np.ones((44100, 2), np.float32))
+    mono = audio.at(16000, 1)
+    assert mono.shape == (16000, 1)
+    assert audio.at(16000, 1) is mono
+
+def test_blocks_cover_the_buffer(tmp_path):
+    samples = np.arange(20, dtype=np.float32).reshape(10, 2)
+    audio = make_buffer(tmp_path, samples)
+    blocks = list(audio.blocks(4))
+    assert [len(b) for b in blocks] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate(blocks), samples)
+
+def test_pickle_shares_file_and_owner_deletes_it(tmp_path):
+    audio = make_buffer(tmp_path, np.ones((10, 2), np.float32), owned=True)
+    clone = pickle.loads(pickle.dumps(audio))
+    np.testing.assert_array_equal(clone.samples, audio.samples)
+    clone.close()
+    assert os.path.exists(audio.path)
+    audio.close()
+    assert not os.path.exists(audio.path)
+
+def tone(frequency, rate, seconds=1.0):
+    return np.sin(2 * np.pi * frequency * np.arange(int(rate * seconds)) / rate).astype(np.float32)
+
+def test_resample_keeps_band_and_rejects_aliases():
+    kept = resample(tone(1000, 44100), 44100, 16000)
+    np.testing.assert_allclose(kept[100:-100], tone(1000, 16000)[100:-100], atol=1e-3)
+    # 12 kHz cannot exist at 16 kHz; interpolation would fold it to 4 kHz
+    folded = resample(tone(12000, 44100), 44100, 16000)
+    assert np.sqrt(np.mean(folded[100:-100] ** 2)) < 1e-3
+
+def test_converted_views_live_on_disk(tmp_path):
+    samples = np.random.default_rng(0).uniform(-1, 1, (44100, 2)).astype(np.float32)
+    audio = make_buffer(tmp_path, samples, owned=True)
+    # blocks() converts on the fly, at() once into a mapped file
+    streamed = np.concatenate(list(audio.blocks(1000, 16000, 1)))
+    assert os.listdir(tmp_path) == ["audio.f32"]
+    mono = audio.at(16000, 1)
+    assert isinstance(mono, np.memmap)
+    np.testing.assert_allclose(streamed, mono, atol=1e-6)
+    clone = pickle.loads(pickle.dumps(audio))
+    assert clone.at(16000, 1).filename == mono.filename
+    audio.close()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,91 @@
+"""
+test_audio_processor.py ──────────────────────────────────────────────────────
+Summary: Unit tests for concurrent stem encoding against a fake ffmpeg
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Piped stems declare the backend's sample rate
+"""
+
+import asyncio
+import json
+import os
+import sys
+import numpy as np
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from app.utils import audio_processor
+from app.utils.audio_processor import CODECS, AudioProcessor
+
+FAKE_FFMPEG = """#!{python}
+import json, os, sys
+data = sys.stdin.buffer.read() if "pipe:0" in sys.argv else b""
+with open(os.environ["FAKE_FFMPEG_LOG"], "a") as log:
+    log.write(json.dumps({{"args": sys.argv[1:], "stdin": len(data)}}) + "\\n")
+if os.environ.get("FAKE_FFMPEG_FAIL"):
+    sys.stderr.write("Unknown encoder")
+    sys.exit(1)
+open(sys.argv[-1], "wb").close()
+"""
+
+@pytest.fixture
+def ffmpeg(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "ffmpeg"
+    script.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    script.chmod(0o755)
+    log = tmp_path / "ffmpeg.jsonl"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_FFMPEG_LOG", str(log))
+
+    def calls():
+        with open(log) as f:
+            return [json.loads(line) for line in f]
+    return calls
+
+def test_encode_stems_codec_arguments(ffmpeg, tmp_path, monkeypatch):
+    # Several writes per stem
+    monkeypatch.setattr(audio_processor, "ENCODE_BLOCK_SAMPLES", 100)
+    source = tmp_path / "drums.wav"
+    source.write_bytes(b"RIFF")
+    vocals = np.zeros((1050, 2), dtype=np.float32)
+    destinations = {name: tmp_path / f"{name}.opus" for name in ("vocals", "drums")}
+
+    encoded = asyncio.run(AudioProcessor().encode_stems(
+        {"vocals": vocals, "drums": source}, "opus", destinations
+    ))
+
+    assert encoded == destinations
+    calls = {call["args"][-1]: call for call in ffmpeg()}
+    piped = calls[str(destinations["vocals"])]
+    assert piped["stdin"] == vocals.nbytes
+    args = piped["args"]
+    assert args[args.index("-f") + 1] == "f32le"
+    assert args[args.index("-i") + 1] == "pipe:0"
+    # The codec's own rate replaces the default 44.1 kHz
+    assert args[-len(CODECS["opus"]) - 2:-2] == CODECS["opus"]
+    assert args.count("-ar") == 2
+    copied = calls[str(destinations["drums"])]["args"]
+    assert copied[copied.index("-i") + 1] == str(source)
+
+def test_encode_failure_is_reported(ffmpeg, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_FFMPEG_FAIL", "1")
+    processor = AudioProcessor()
+    audio = np.zeros((10, 2), dtype=np.float32)
+    assert asyncio.run(processor.encode(audio, tmp_path / "out.mp3", "mp3")) is False
+    assert asyncio.run(processor.encode_stems(
+        {"vocals": audio}, "mp3", {"vocals": tmp_path / "vocals.mp3"}
+    )) == {}
+    assert asyncio.run(processor.encode(audio, tmp_path / "out.xyz", "xyz")) is False
+
+def test_piped_stems_declare_their_sample_rate(ffmpeg, tmp_path):
+    audio = np.zeros((10, 2), dtype=np.float32)
+    destination = tmp_path / "vocals.wav"
+    asyncio.run(AudioProcessor().encode_stems(
+        {"vocals": audio}, "wav", {"vocals": destination}, 48000
+    ))
+    args = ffmpeg()[0]["args"]
+    # The input rate, not the output default
+    assert args[args.index("-ar") + 1] == "48000"
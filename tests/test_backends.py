@@ -0,0 +1,50 @@
+"""
+test_backends.py ─────────────────────────────────────────────────────────────
+Summary: Unit tests for separation backend resolution
+ModLog : 2026-10-18  Initial version
+"""
+
+import numpy as np
+import pytest
+from src.audio_processing.backends import (
+    DemucsBackend, SpleeterBackend, backend_for_stems, get_backend, select_stems
+)
+from src.exceptions import ProcessingError
+
+def test_spleeter_descriptors():
+    assert get_backend("spleeter:2stems") == SpleeterBackend("spleeter:2stems")
+    assert get_backend("spleeter").spec == "spleeter:4stems"
+
+def test_demucs_descriptors():
+    assert get_backend("demucs") == DemucsBackend("htdemucs")
+    assert get_backend("demucs:htdemucs_ft").spec == "demucs:htdemucs_ft"
+
+def test_equal_settings_share_a_key():
+    assert hash(DemucsBackend("htdemucs")) == hash(get_backend("demucs:htdemucs"))
+    assert DemucsBackend("htdemucs", shifts=2) != DemucsBackend("htdemucs")
+
+def test_backend_instance_passes_through():
+    backend = DemucsBackend()
+    assert get_backend(backend) is backend
+
+def test_unknown_backend():
+    with pytest.raises(ProcessingError):
+        get_backend("openunmix")
+
+def test_cheapest_model_for_stems():
+    assert backend_for_stems(["instrumental"]) == "spleeter:2stems"
+    assert backend_for_stems(["vocals", "accompaniment"]) == "spleeter:2stems"
+    assert backend_for_stems(["drums"]) == "spleeter:4stems"
+    assert backend_for_stems(["piano"]) == "spleeter:5stems"
+    assert backend_for_stems(["guitar"], family="demucs") == "demucs:htdemucs_6s"
+    with pytest.raises(ProcessingError):
+        backend_for_stems(["guitar"])
+
+def test_select_stems_derives_instrumental():
+    ones = np.ones((4, 2), np.float32)
+    separated = {"vocals": ones, "drums": ones, "bass": ones, "other": ones}
+    selected = select_stems(separated, ["no_vocals"])
+    assert list(selected) == ["instrumental"]
+    np.testing.assert_array_equal(selected["instrumental"], 3 * ones)
+    assert select_stems({"vocals": ones, "accompaniment": -ones}, ["instrumental"])["instrumental"][0, 0] == -1
+    assert select_stems(separated, None) == separated
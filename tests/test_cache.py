@@ -3,10 +3,28 @@ test_cache.py ──────────────────────
 Author : ChatGPT for CBW  ✦ 2025-05-23
 Summary: Unit tests for caching module
 ModLog : 2025-05-23  Initial version
+         2026-10-18  Fingerprint + URL alias lookups
+         2026-10-18  Eviction and integrity sweep
+         2026-10-18  Connection reuse, WAL and batched lookups
+         2026-10-18  Lyrics cache
+         2026-10-18  Shared files and fresh entries survive eviction
+         2026-10-18  File fingerprints follow size and mtime
 """
 
+import os
 import sqlite3
-from utils.cache import init_cache, get_cached_stems, cache_stems
+import time
+from utils.cache import (
+    init_cache, get_cached_stems, cache_stems, alias_url, get_stems_by_fingerprint,
+    evict_stems, sweep_missing, get_cached_stems_many, cache_stems_many,
+    cache_lyrics, get_cached_lyrics, evict_lyrics, get_file_fingerprint,
+    remember_file_fingerprint
+)
+
+def make_stem(tmp_path, name, size=16):
+    path = tmp_path / f"{name}.wav"
+    path.write_bytes(b"\0" * size)
+    return str(path)
 
 def test_init_and_empty(tmp_path, monkeypatch):
     # Ensure the DB file is created and table exists
@@ -18,10 +36,10 @@ def test_init_and_empty(tmp_path, monkeypatch):
     assert cur.fetchone()[0] == 'stems'
     conn.close()
 
-def test_cache_and_retrieve(monkeypatch):
+def test_cache_and_retrieve(tmp_path):
     conn = init_cache()
     url = "https://youtu.be/fake"
-    data = {"vocals": "/path/vocals.wav"}
+    data = {"vocals": make_stem(tmp_path, "vocals")}
     # Cache it
     cache_stems(url, data, conn)
     # Retrieve it
@@ -31,3 +49,124 @@ def test_cache_and_retrieve(monkeypatch):
 def test_get_missing(monkeypatch):
     conn = init_cache()
     assert get_cached_stems("nope", conn) is None
+
+def test_alias_shares_fingerprint(tmp_path):
+    conn = init_cache()
+    data = {"vocals": make_stem(tmp_path, "vocals")}
+    cache_stems("https://youtu.be/abc", data, conn, fingerprint="fp1")
+    alias_url("https://example.com/reupload", "fp1", conn)
+    assert get_cached_stems("https://example.com/reupload", conn) == data
+    assert get_stems_by_fingerprint("fp1", conn) == data
+    # Timestamps and playlist context do not change the key
+    assert get_cached_stems("https://www.youtube.com/watch?v=abc&t=42s&list=PL1", conn) == data
+
+def test_model_is_part_of_key(tmp_path):
+    conn = init_cache()
+    data = {"vocals": make_stem(tmp_path, "vocals")}
+    cache_stems("https://youtu.be/xyz", data, conn, model="spleeter:2stems")
+    assert get_cached_stems("https://youtu.be/xyz", conn, model="spleeter:4stems") is None
+
+def test_dead_paths_are_dropped(tmp_path):
+    conn = init_cache()
+    data = {"vocals": make_stem(tmp_path, "vocals")}
+    cache_stems("https://youtu.be/gone", data, conn, fingerprint="gone")
+    os.remove(data["vocals"])
+    assert get_cached_stems("https://youtu.be/gone", conn) is None
+    assert get_stems_by_fingerprint("gone", conn) is None
+
+def test_sweep_missing(tmp_path):
+    conn = init_cache()
+    alive = {"vocals": make_stem(tmp_path, "alive")}
+    dead = {"vocals": make_stem(tmp_path, "dead")}
+    cache_stems("https://youtu.be/alive", alive, conn, fingerprint="alive")
+    cache_stems("https://youtu.be/dead", dead, conn, fingerprint="dead")
+    os.remove(dead["vocals"])
+    assert sweep_missing(conn) == 1
+    assert get_stems_by_fingerprint("alive", conn) == alive
+
+def test_evict_lru_to_budget(tmp_path):
+    conn = init_cache()
+    for name in ("old", "mid", "new"):
+        stems = {"vocals": make_stem(tmp_path, name, size=100)}
+        cache_stems(f"https://youtu.be/{name}", stems, conn, fingerprint=name)
+        time.sleep(0.01)
+    get_stems_by_fingerprint("old", conn)  # refresh: "mid" is now LRU
+    assert evict_stems(conn, max_bytes=200) == 1
+    assert get_stems_by_fingerprint("mid", conn) is None
+    assert not os.path.exists(tmp_path / "mid.wav")
+    assert get_stems_by_fingerprint("old", conn) is not None
+
+def test_evict_ttl(tmp_path):
+    conn = init_cache()
+    stems = {"vocals": make_stem(tmp_path, "stale")}
+    cache_stems("https://youtu.be/stale", stems, conn, fingerprint="stale")
+    conn.execute("UPDATE stems SET last_access = ?", (time.time() - 3600,))
+    assert evict_stems(conn, max_bytes=10 ** 9, ttl=60) == 1
+    assert get_cached_stems("https://youtu.be/stale", conn) is None
+
+def test_evict_keeps_shared_files(tmp_path):
+    conn = init_cache()
+    shared = {"vocals": make_stem(tmp_path, "shared", size=100)}
+    cache_stems("https://youtu.be/old", shared, conn, fingerprint="old")
+    time.sleep(0.01)
+    cache_stems("https://youtu.be/new", shared, conn, fingerprint="new")
+    assert evict_stems(conn, max_bytes=100) == 1
+    assert get_stems_by_fingerprint("new", conn) == shared
+    assert os.path.exists(shared["vocals"])
+
+def test_evict_never_drops_kept_entry(tmp_path):
+    conn = init_cache()
+    stems = {"vocals": make_stem(tmp_path, "huge", size=500)}
+    cache_stems("https://youtu.be/huge", stems, conn, fingerprint="huge")
+    assert evict_stems(conn, max_bytes=100, keep=("huge",)) == 0
+    assert get_stems_by_fingerprint("huge", conn) == stems
+
+def test_connection_reused_per_thread():
+    conn = init_cache()
+    assert init_cache() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_batched_lookups(tmp_path):
+    conn = init_cache()
+    entries = {
+        f"https://youtu.be/track{i}": {"vocals": make_stem(tmp_path, f"track{i}")}
+        for i in range(1200)
+    }
+    cache_stems_many(entries, conn)
+    urls = list(entries) + ["https://youtu.be/missing", "https://youtu.be/track7?t=3"]
+    found = get_cached_stems_many(urls, conn)
+    assert len(found) == 1201
+    assert found["https://youtu.be/track7?t=3"] == entries["https://youtu.be/track7"]
+    assert "https://youtu.be/missing" not in found
+
+def test_lyrics_cache_key_and_eviction():
+    conn = init_cache()
+    lines = [{"text": "hello", "start": 1.0, "end": 2.0}]
+    cache_lyrics("fpl", lines, conn, model="small", language="en", options={"source": "vocals"})
+    assert get_cached_lyrics("fpl", conn, "small", "en", {"source": "vocals"}) == lines
+    # Every part of the key matters
+    assert get_cached_lyrics("fpl", conn, "small", "fr", {"source": "vocals"}) is None
+    assert get_cached_lyrics("fpl", conn, "medium", "en", {"source": "vocals"}) is None
+    assert get_cached_lyrics("fpl", conn, "small", "en", {"source": "mix"}) is None
+
+    cache_lyrics("fpl2", lines, conn, model="small", language="en")
+    get_cached_lyrics("fpl", conn, "small", "en", {"source": "vocals"})
+    assert evict_lyrics(conn, max_bytes=60) == 1
+    assert get_cached_lyrics("fpl2", conn, "small", "en") is None
+    assert get_cached_lyrics("fpl", conn, "small", "en", {"source": "vocals"}) == lines
+
+def test_file_fingerprint_follows_identity(tmp_path):
+    conn = init_cache()
+    path = make_stem(tmp_path, "vocals")
+    assert get_file_fingerprint(path, conn, "whisper") is None
+    remember_file_fingerprint(path, "fp1", conn, "whisper")
+    assert get_file_fingerprint(path, conn, "whisper") == "fp1"
+    assert get_file_fingerprint(path, conn, "spleeter:4stems") is None
+    # Rewritten file: the old fingerprint no longer applies
+    with open(path, "ab") as f:
+        f.write(b"\1")
+    assert get_file_fingerprint(path, conn, "whisper") is None
+    remember_file_fingerprint(path, "fp2", conn, "whisper")
+    os.remove(path)
+    sweep_missing(conn)
+    assert conn.execute("SELECT COUNT(*) FROM file_fingerprints").fetchone()[0] == 0
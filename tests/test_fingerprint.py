@@ -0,0 +1,48 @@
+"""
+test_fingerprint.py ──────────────────────────────────────────────────────────
+Summary: Unit tests for audio fingerprints and canonical URLs
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Playlists and non-YouTube params kept apart
+"""
+
+import numpy as np
+from utils.fingerprint import canonical_url, fingerprint_pcm
+
+def test_youtube_variants_collapse():
+    expected = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    for url in (
+        "https://youtu.be/dQw4w9WgXcQ?t=30",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123&index=4",
+        "https://music.youtube.com/watch?v=dQw4w9WgXcQ&si=abc",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    ):
+        assert canonical_url(url) == expected
+
+def test_other_hosts_drop_tracking_params():
+    assert (
+        canonical_url("https://Example.com/track/?utm_source=x&id=7&fbclid=1#frag")
+        == "https://example.com/track?id=7"
+    )
+
+def test_other_hosts_keep_content_params():
+    assert (
+        canonical_url("https://example.com/play?t=5&list=a&index=2")
+        == "https://example.com/play?index=2&list=a&t=5"
+    )
+
+def test_playlists_stay_distinct():
+    first = canonical_url("https://www.youtube.com/playlist?list=PLaaa&si=x")
+    second = canonical_url("https://www.youtube.com/playlist?list=PLbbb")
+    assert first == "https://www.youtube.com/playlist?list=PLaaa"
+    assert first != second
+
+def test_fingerprint_ignores_gain_and_padding():
+    rng = np.random.default_rng(0)
+    tone = rng.uniform(-0.5, 0.5, 22050).astype(np.float32)
+    padded = np.concatenate([np.zeros(1000, np.float32), tone * 0.5, np.zeros(500, np.float32)])
+    assert fingerprint_pcm(tone, "spleeter:4stems") == fingerprint_pcm(padded, "spleeter:4stems")
+
+def test_fingerprint_depends_on_model():
+    tone = np.linspace(-1, 1, 1000, dtype=np.float32)
+    assert fingerprint_pcm(tone, "spleeter:2stems") != fingerprint_pcm(tone, "spleeter:4stems")
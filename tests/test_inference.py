@@ -0,0 +1,69 @@
+"""
+test_inference.py ────────────────────────────────────────────────────────────
+Summary: Unit tests for the bounded inference executor
+ModLog : 2026-10-18  Initial version
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from src.audio_processing.inference import InferenceExecutor
+from src.exceptions import ProcessingError
+
+def test_work_runs_off_the_event_loop():
+    executor = InferenceExecutor(workers=1, queue_depth=0)
+
+    async def main():
+        ticks = 0
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+        beat = asyncio.create_task(heartbeat())
+        result = await executor.run(lambda: (time.sleep(0.1), threading.current_thread().name)[1])
+        beat.cancel()
+        return result, ticks
+
+    name, ticks = asyncio.run(main())
+    executor.shutdown()
+    assert name.startswith("inference")
+    assert ticks > 5
+    assert executor.pending == 0
+
+def test_full_queue_is_rejected():
+    executor = InferenceExecutor(workers=1, queue_depth=1)
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(executor.run(release.wait))
+        second = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(ProcessingError) as info:
+            await executor.run(release.wait)
+        assert info.value.status_code == 503
+        release.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(main())
+    executor.shutdown()
+    assert executor.pending == 0
+
+def test_expected_wait_grows_with_queue():
+    executor = InferenceExecutor(workers=1, queue_depth=4)
+    release = threading.Event()
+
+    async def main():
+        await executor.run(time.sleep, 0.02)
+        assert executor.expected_wait() == 0
+        jobs = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        waiting = executor.expected_wait()
+        release.set()
+        await asyncio.gather(*jobs)
+        return waiting
+
+    # Three jobs ahead of the next one on a single worker
+    assert asyncio.run(main()) >= 3 * 0.02
+    executor.shutdown()
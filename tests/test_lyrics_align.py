@@ -0,0 +1,100 @@
+"""
+test_lyrics_align.py ─────────────────────────────────────────────────────────
+Summary: Unit tests for forced alignment of known lyrics
+ModLog : 2026-10-18  Initial version
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("whisper")
+
+from src.audio_processing import lyrics_generator
+from src.audio_processing.lyrics_generator import WHISPER_SAMPLE_RATE, LyricsGenerator
+
+SECOND = WHISPER_SAMPLE_RATE
+
+def timing(start, end, *tokens):
+    return SimpleNamespace(start=start, end=end, tokens=list(tokens))
+
+def test_word_times_follow_tokens():
+    # Whisper splits "hello," into "hello" and ","; our words stay whole
+    timings = [timing(0.0, 0.5, 1), timing(0.5, 0.6, 2), timing(1.0, 1.5, 3, 4)]
+    starts, ends = LyricsGenerator._word_times(timings, [2, 2])
+    np.testing.assert_allclose(starts, [0.0, 1.0])
+    np.testing.assert_allclose(ends, [0.6, 1.5])
+
+def test_word_times_pad_dropped_tokens():
+    starts, ends = LyricsGenerator._word_times([timing(0.0, 0.4, 1)], [1, 1])
+    np.testing.assert_allclose(starts, [0.0, 0.4])
+    np.testing.assert_allclose(ends, [0.4, 0.4])
+
+class Mel:
+    def to(self, device):
+        return self
+
+@pytest.fixture
+def whisper_stub(monkeypatch):
+    """One token per word; find_alignment sings a word per second"""
+    leases = []
+
+    @contextmanager
+    def whisper_model(name, device, precision):
+        leases.append(name)
+        yield SimpleNamespace(
+            is_multilingual=True, dims=SimpleNamespace(n_mels=80), device=device
+        )
+
+    tokenizer = SimpleNamespace(encode=lambda text: [len(text)])
+    def find_alignment(model, tokenizer, tokens, mel, frames):
+        return [timing(second, second + 0.8, token) for second, token in enumerate(tokens)]
+
+    monkeypatch.setattr(lyrics_generator, "whisper_model", whisper_model)
+    monkeypatch.setattr("whisper.tokenizer.get_tokenizer", lambda *args, **kwargs: tokenizer)
+    monkeypatch.setattr("whisper.audio.log_mel_spectrogram", lambda audio, n_mels: Mel())
+    monkeypatch.setattr("whisper.timing.find_alignment", find_alignment)
+    return leases
+
+def test_words_at_a_window_edge_carry_over(whisper_stub):
+    generator = LyricsGenerator("tiny", cache=False)
+    audio = np.zeros(14 * SECOND, dtype=np.float32)
+    chunks = [[(0, 3 * SECOND)], [(10 * SECOND, 14 * SECOND)]]
+    words = ["one", "two", "three", "four", "five"]
+
+    starts, ends = generator._align_words(audio, chunks, words, "en", "tiny")
+
+    # "three" ends 0.2 s before the first window does, so it starts the second
+    np.testing.assert_allclose(starts, [0.0, 1.0, 10.0, 11.0, 12.0])
+    np.testing.assert_allclose(ends, [0.8, 1.8, 10.8, 11.8, 12.8])
+    # The model is leased once per window
+    assert whisper_stub == ["tiny", "tiny"]
+
+def test_last_window_takes_the_remaining_words(whisper_stub):
+    generator = LyricsGenerator("tiny", cache=False)
+    audio = np.zeros(3 * SECOND, dtype=np.float32)
+    words = ["la"] * 4
+    starts, ends = generator._align_words(audio, [[(0, 3 * SECOND)]], words, "en", "tiny")
+    # Nothing follows, so even the word sung past the end stays here
+    np.testing.assert_allclose(starts, [0.0, 1.0, 2.0, 3.0])
+    assert ends[-1] == pytest.approx(3.0)
+
+def test_align_uses_the_budgeted_model(whisper_stub, monkeypatch):
+    generator = LyricsGenerator("auto", cache=False, latency_budget=60)
+    audio = np.zeros(3 * SECOND, dtype=np.float32)
+    chosen = []
+    def choose_model(voiced, budget, tracker, device, precision, candidates, queued):
+        chosen.append((voiced, candidates))
+        return "base"
+    monkeypatch.setattr(generator, "_load_source", lambda audio_path, vocals: audio)
+    monkeypatch.setattr(generator, "_voiced_regions", lambda audio, isolated: [(0, 3 * SECOND)])
+    monkeypatch.setattr(lyrics_generator, "choose_model", choose_model)
+
+    segments = generator.align("song.wav", "one two\nthree")
+
+    assert [segment.model for segment in segments] == ["base", "base"]
+    assert whisper_stub == ["base"]
+    assert chosen[0][0] == pytest.approx(3.0)
+    assert "base" in chosen[0][1]
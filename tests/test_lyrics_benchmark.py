@@ -0,0 +1,47 @@
+"""
+test_lyrics_benchmark.py ──────────────────────────────────────────────────────
+Summary: Unit tests for the lyrics benchmark scoring helpers
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Precisions the device cannot run are skipped
+"""
+
+import sys
+import types
+import pytest
+from src.audio_processing import lyrics_benchmark
+from src.audio_processing.lyrics_benchmark import load_corpus, word_error_rate, word_errors
+
+def test_word_errors_counts_edits():
+    assert word_errors("the cat sat on the mat", "the cat sat on the mat") == (0, 6)
+    # One substitution, one deletion, one insertion
+    assert word_errors("the cat sat on the mat", "a cat sat the mat today") == (3, 6)
+
+def test_wer_ignores_case_and_punctuation():
+    assert word_error_rate("Hello, world!", "hello world") == 0.0
+    assert word_error_rate("", "") == 0.0
+    assert word_error_rate("", "noise") == 1.0
+
+def test_load_corpus_pairs_audio_with_transcripts(tmp_path):
+    (tmp_path / "a.wav").write_bytes(b"")
+    (tmp_path / "a.txt").write_text("la la", encoding="utf-8")
+    (tmp_path / "b.mp3").write_bytes(b"")  # no reference: skipped
+    assert load_corpus(tmp_path) == [(tmp_path / "a.wav", "la la")]
+
+def test_benchmark_keys_rows_by_requested_precision(tmp_path, monkeypatch):
+    class GpuGenerator:
+        """Like LyricsGenerator on a GPU: every precision runs as fp32"""
+        def __init__(self, model_name, cache=True, precision=None):
+            self.device, self.precision, self.model = "cuda", "fp32", object()
+        def transcribe(self, audio, language):
+            return [types.SimpleNamespace(text="la la")]
+    module = types.ModuleType("src.audio_processing.lyrics_generator")
+    module.LyricsGenerator = GpuGenerator
+    monkeypatch.setitem(sys.modules, "src.audio_processing.lyrics_generator", module)
+    monkeypatch.setattr(lyrics_benchmark, "probe_duration", lambda audio: 10.0)
+    (tmp_path / "a.wav").write_bytes(b"")
+    (tmp_path / "a.txt").write_text("la la", encoding="utf-8")
+
+    results = lyrics_benchmark.benchmark(tmp_path, "tiny", ["int8", "fp32"])
+
+    assert list(results) == ["fp32"]
+    assert results["fp32"]["wer"] == 0.0
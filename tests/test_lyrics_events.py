@@ -0,0 +1,139 @@
+"""
+test_lyrics_events.py ────────────────────────────────────────────────────────
+Summary: Unit tests for the server-sent lyrics stream and job lookups
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Disconnects close the segment source
+         2026-10-18  Lyric lookups never transcribe
+"""
+
+import asyncio
+import json
+import sys
+import types
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from fastapi import HTTPException
+from app.routes import api
+from src.exceptions import ProcessingError
+
+class Segment:
+    def __init__(self, text):
+        self.text = text
+    def to_dict(self):
+        return {"text": self.text, "start": 0.0, "end": 1.0}
+
+async def segments(texts, error=None):
+    for text in texts:
+        yield Segment(text)
+    if error:
+        raise error
+
+def frames(source):
+    async def collect():
+        return [frame async for frame in api._lyric_events(source, "job")]
+    return asyncio.run(collect())
+
+def parse(frame):
+    assert frame.endswith("\n\n")
+    event, data = frame[:-2].split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+def test_segments_then_done():
+    events = [parse(frame) for frame in frames(segments(["one", "two"]))]
+    assert events == [
+        ("segment", {"text": "one", "start": 0.0, "end": 1.0}),
+        ("segment", {"text": "two", "start": 0.0, "end": 1.0}),
+        ("done", {}),
+    ]
+
+def test_failure_midway_ends_with_error():
+    events = [parse(frame) for frame in frames(
+        segments(["one"], RuntimeError("model crashed"))
+    )]
+    assert events == [
+        ("segment", {"text": "one", "start": 0.0, "end": 1.0}),
+        ("error", {"detail": "model crashed"}),
+    ]
+
+def test_job_vocals_status_codes(monkeypatch):
+    jobs = {
+        "running": {"status": "processing", "stems": {}},
+        "done": {"status": "completed", "stems": {"vocals": "/stems/vocals.wav"}},
+    }
+    monkeypatch.setattr(api.task_manager, "get_job_status", jobs.get)
+    assert asyncio.run(api._job_vocals("done")) == "/stems/vocals.wav"
+    for job_id, code in (("missing", 404), ("running", 409)):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(api._job_vocals(job_id))
+        assert error.value.status_code == code
+
+def test_disconnect_closes_the_segment_source():
+    closed = []
+    async def source():
+        try:
+            yield Segment("one")
+            yield Segment("two")
+        finally:
+            closed.append(True)
+
+    async def disconnect():
+        events = api._lyric_events(source(), "job")
+        await events.__anext__()
+        await events.aclose()
+    asyncio.run(disconnect())
+    assert closed == [True]
+
+class CacheOnlyGenerator:
+    """Lyrics generator that only knows what has been 'transcribed'"""
+    cached = {}
+    lookups = []
+    async def lookup_lyrics(self, audio_path, language="en", vocals=None):
+        self.lookups.append(language)
+        result = self.cached.get(language)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    async def generate_lyrics(self, *args, **kwargs):
+        raise AssertionError("lyrics_at must not transcribe")
+
+class Line:
+    def __init__(self, text, start, end):
+        self.text, self.start, self.end = text, start, end
+
+@pytest.fixture
+def lookups(monkeypatch):
+    module = types.ModuleType("src.audio_processing.lyrics_generator")
+    module.LyricsGenerator = CacheOnlyGenerator
+    monkeypatch.setitem(sys.modules, "src.audio_processing.lyrics_generator", module)
+    monkeypatch.setattr(api, "timelines", type(api.timelines)())
+    monkeypatch.setattr(CacheOnlyGenerator, "cached", {})
+    monkeypatch.setattr(CacheOnlyGenerator, "lookups", [])
+    job = {"status": "completed", "stems": {"vocals": "/stems/vocals.wav"}}
+    monkeypatch.setattr(api.task_manager, "get_job_status", lambda job_id: job)
+    return CacheOnlyGenerator
+
+def status_of(coroutine):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(coroutine)
+    return error.value.status_code
+
+def test_lyrics_at_waits_for_transcription(lookups):
+    assert status_of(api.lyrics_at("job", 1.0)) == 409
+    lookups.cached["en"] = [Line("hello there", 0.5, 2.0)]
+    result = asyncio.run(api.lyrics_at("job", 1.0))
+    assert result["line"]["text"] == "hello there"
+    # Found lyrics are kept; misses are not
+    asyncio.run(api.lyrics_at("job", 1.5))
+    assert lookups.lookups == ["en", "en"]
+
+def test_lyrics_at_is_per_language(lookups):
+    lookups.cached["en"] = [Line("hello", 0.0, 2.0)]
+    asyncio.run(api.lyrics_at("job", 1.0))
+    assert status_of(api.lyrics_at("job", 1.0, language="fr")) == 409
+
+def test_lyrics_at_passes_on_busy_queue(lookups):
+    lookups.cached["en"] = ProcessingError("Inference queue is full", status_code=503)
+    assert status_of(api.lyrics_at("job", 1.0)) == 503
@@ -0,0 +1,154 @@
+"""
+test_lyrics_stream.py ────────────────────────────────────────────────────────
+Summary: Unit tests for streaming lyrics window by window
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Closing a stream cancels its queued windows
+         2026-10-18  Cache-only lookups
+         2026-10-18  Known files are looked up without decoding
+"""
+
+import asyncio
+from concurrent.futures import Future
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("whisper")
+
+from src.audio_processing import lyrics_generator
+from src.audio_processing.lyrics_generator import (
+    WHISPER_SAMPLE_RATE, LyricSegment, LyricsGenerator, _Plan
+)
+
+SECOND = WHISPER_SAMPLE_RATE
+
+def plan(cached=None):
+    """Two one-second windows, the second starting at 10 s"""
+    audio = np.zeros(12 * SECOND, dtype=np.float32)
+    chunks = [[(0, SECOND)], [(10 * SECOND, 11 * SECOND)]]
+    return _Plan(audio, [] if cached else chunks, "fp", "tiny", True, cached)
+
+class StubBatcher:
+    """Answers every window at once with one segment naming its order"""
+    def __init__(self):
+        self.keys = []
+    def submit(self, key, window):
+        self.keys.append(key)
+        future = Future()
+        future.set_result({"segments": [
+            {"text": f"window {len(self.keys)}", "start": 0.0, "end": 0.5}
+        ]})
+        return future
+
+@pytest.fixture
+def generator(monkeypatch):
+    generator = LyricsGenerator("tiny", cache=False)
+    generator.stored = []
+    monkeypatch.setattr(
+        generator, "_store_lyrics",
+        lambda plan, language, lyrics: generator.stored.append(list(lyrics))
+    )
+    return generator
+
+def stream(generator):
+    async def collect():
+        return [segment async for segment in generator.stream_lyrics("song.wav")]
+    return asyncio.run(collect())
+
+def test_cached_lyrics_are_replayed(generator, monkeypatch):
+    cached = [LyricSegment("la la", 1.0, 2.0, "tiny")]
+    monkeypatch.setattr(generator, "_prepare", lambda *args: plan(cached))
+    monkeypatch.setattr(lyrics_generator, "get_whisper_batcher", lambda: None)
+    assert stream(generator) == cached
+    assert generator.stored == []
+
+def test_batched_windows_map_to_track_time(generator, monkeypatch):
+    batcher = StubBatcher()
+    monkeypatch.setattr(generator, "_prepare", lambda *args: plan())
+    monkeypatch.setattr(lyrics_generator, "get_whisper_batcher", lambda: batcher)
+    segments = stream(generator)
+    assert [segment.text for segment in segments] == ["window 1", "window 2"]
+    assert segments[1].start == pytest.approx(10.0)
+    assert batcher.keys[0] == ("tiny", generator.device, generator.precision, "en")
+    assert generator.stored == [segments]
+
+def test_windows_are_prompted_with_previous_lines(generator, monkeypatch):
+    prompts = []
+    def transcribe_chunk(audio, chunk, language, model_name, prompt=None):
+        prompts.append(prompt)
+        return [LyricSegment(f"line {len(prompts)}", chunk[0][0] / SECOND, chunk[0][1] / SECOND)]
+    monkeypatch.setattr(generator, "_prepare", lambda *args: plan())
+    monkeypatch.setattr(generator, "_transcribe_chunk", transcribe_chunk)
+    monkeypatch.setattr(lyrics_generator, "get_whisper_batcher", lambda: None)
+    segments = stream(generator)
+    assert [segment.text for segment in segments] == ["line 1", "line 2"]
+    assert prompts == [None, "line 1"]
+    assert generator.stored == [segments]
+
+def test_closing_a_stream_cancels_queued_windows(generator, monkeypatch):
+    futures = []
+    class SlowBatcher:
+        def submit(self, key, window):
+            # Only the first window of each track finishes
+            futures.append(Future())
+            if len(futures) % 2:
+                futures[-1].set_result({"segments": [{"text": "first", "start": 0.0, "end": 0.5}]})
+            return futures[-1]
+    monkeypatch.setattr(generator, "_prepare", lambda *args: plan())
+    monkeypatch.setattr(lyrics_generator, "get_whisper_batcher", lambda: SlowBatcher())
+
+    async def first_line():
+        segments = generator.stream_lyrics("song.wav")
+        segment = await segments.__anext__()
+        await segments.aclose()
+        return segment
+    assert asyncio.run(first_line()).text == "first"
+    assert futures[1].cancelled()
+
+    blocking = generator.iter_transcribe("song.wav")
+    assert next(blocking).text == "first"
+    blocking.close()
+    assert futures[3].cancelled()
+
+def test_decode_mode_is_part_of_the_cache_key(generator, monkeypatch):
+    monkeypatch.setattr(lyrics_generator, "get_whisper_batcher", lambda: None)
+    prompted = generator._cache_options(True)
+    monkeypatch.setattr(lyrics_generator, "get_whisper_batcher", lambda: StubBatcher())
+    assert generator._cache_options(True) != prompted
+
+def test_lookup_never_transcribes(monkeypatch):
+    generator = LyricsGenerator("tiny")
+    track = plan()
+    monkeypatch.setattr(generator, "_load_source", lambda audio_path, vocals: track.audio)
+    monkeypatch.setattr(generator, "_transcribe_chunk", None)
+    monkeypatch.setattr(lyrics_generator, "get_whisper_batcher", lambda: None)
+    assert generator.lookup("vocals.wav", vocals="vocals.wav") is None
+
+    track.fingerprint = lyrics_generator.fingerprint_pcm(track.audio, "whisper")
+    lyrics = [LyricSegment("hello", 0.5, 2.0, "tiny")]
+    generator._store_lyrics(track, "en", lyrics)
+    assert generator.lookup("vocals.wav", vocals="vocals.wav") == lyrics
+    assert generator.lookup("vocals.wav", "fr", vocals="vocals.wav") is None
+
+def test_known_files_are_not_decoded_again(tmp_path, monkeypatch):
+    generator = LyricsGenerator("tiny")
+    vocals = tmp_path / "vocals.wav"
+    vocals.write_bytes(b"RIFF")
+    track = plan()
+    decodes = []
+    def load_source(audio_path, vocals):
+        decodes.append(audio_path)
+        return track.audio
+    monkeypatch.setattr(generator, "_load_source", load_source)
+    monkeypatch.setattr(lyrics_generator, "get_whisper_batcher", lambda: None)
+
+    # First sight decodes; later misses and hits do not
+    assert generator.lookup(vocals, vocals=vocals) is None
+    assert generator.lookup(vocals, vocals=vocals) is None
+    assert len(decodes) == 1
+    track.fingerprint = lyrics_generator.fingerprint_pcm(track.audio, "whisper")
+    lyrics = [LyricSegment("hello", 0.5, 2.0, "tiny")]
+    generator._store_lyrics(track, "en", lyrics)
+    assert generator.lookup(vocals, vocals=vocals) == lyrics
+    assert generator._prepare(vocals, vocals, "en").cached == lyrics
+    assert len(decodes) == 1
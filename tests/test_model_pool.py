@@ -0,0 +1,134 @@
+"""
+test_model_pool.py ───────────────────────────────────────────────────────────
+Summary: Unit tests for the shared separation model pool
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Leases taken together with the lookup
+"""
+
+import threading
+import pytest
+import time
+from src.audio_processing.model_pool import ModelPool
+
+class CountingLoader:
+    def __init__(self):
+        self.loaded = []
+        self.lock = threading.Lock()
+    def __call__(self, config):
+        with self.lock:
+            self.loaded.append(config)
+        return {"config": config}
+
+def test_loads_each_config_once():
+    loader = CountingLoader()
+    warmed = []
+    pool = ModelPool(loader, max_resident=2, warmup=warmed.append)
+    first = pool.get("spleeter:2stems")
+    assert pool.get("spleeter:2stems") is first
+    assert loader.loaded == ["spleeter:2stems"]
+    assert warmed == [first]
+
+def test_lru_eviction():
+    loader = CountingLoader()
+    pool = ModelPool(loader, max_resident=2)
+    pool.get("spleeter:2stems")
+    pool.get("spleeter:4stems")
+    pool.get("spleeter:2stems")  # 4stems is now least recently used
+    pool.get("spleeter:5stems")
+    assert pool.keys() == ["spleeter:2stems", "spleeter:5stems"]
+    assert "spleeter:4stems" not in pool
+
+def test_concurrent_get_loads_once():
+    loader = CountingLoader()
+    pool = ModelPool(loader, max_resident=1)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pool.get("spleeter:4stems")))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loader.loaded == ["spleeter:4stems"]
+    assert all(r is results[0] for r in results)
+
+def test_failed_warmup_keeps_model():
+    def boom(model):
+        raise RuntimeError("no graph")
+    pool = ModelPool(CountingLoader(), warmup=boom)
+    assert pool.get({"stems": 2}) == {"config": {"stems": 2}}
+    assert {"stems": 2} in pool
+
+def test_memory_budget_evicts_least_recently_used():
+    loader = CountingLoader()
+    pool = ModelPool(loader, max_resident=10, max_bytes=100, sizer=lambda model: 40)
+    pool.get("a")
+    pool.get("b")
+    pool.get("a")
+    pool.get("c")
+    assert set(pool.keys()) == {"a", "c"}
+    assert pool.resident_bytes == 80
+
+def test_leased_model_is_not_evicted():
+    loader = CountingLoader()
+    pool = ModelPool(loader, max_resident=1)
+    with pool.lease("a") as model:
+        pool.get("b")
+        assert "a" in pool
+        assert model == {"config": "a"}
+    # Back under the cap once the lease ends
+    assert pool.keys() == ["b"]
+
+def test_get_can_lease_atomically():
+    loader = CountingLoader()
+    pool = ModelPool(loader, max_resident=1)
+    # Loaded and leased under one lock: a load of another model right
+    # after it returns cannot evict it
+    model = pool.get("a", lease=True)
+    pool.get("b")
+    assert "a" in pool and model == {"config": "a"}
+    pool._release("a")
+    assert pool.keys() == ["b"]
+    assert loader.loaded == ["a", "b"]
+
+def test_idle_models_are_evicted():
+    loader = CountingLoader()
+    pool = ModelPool(loader, max_resident=4, idle_seconds=0.01)
+    pool.get("a")
+    time.sleep(0.05)
+    pool.get("b")
+    assert pool.keys() == ["b"]
+
+def test_exclusive_lease_serializes_users():
+    pool = ModelPool(CountingLoader())
+    active = []
+    overlap = []
+
+    def use():
+        with pool.lease("a", exclusive=True):
+            active.append(1)
+            overlap.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+
+    threads = [threading.Thread(target=use) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlap == [1, 1, 1, 1]
+
+def test_failed_load_is_retried():
+    calls = []
+    def flaky(config):
+        calls.append(config)
+        if len(calls) == 1:
+            raise RuntimeError("download interrupted")
+        return {"config": config}
+    pool = ModelPool(flaky)
+    with pytest.raises(RuntimeError):
+        pool.get("a")
+    assert pool._loading == {}
+    assert pool.get("a") == {"config": "a"}
+    assert calls == ["a", "a"]
@@ -0,0 +1,34 @@
+"""
+test_model_selection.py ───────────────────────────────────────────────────────
+Summary: Unit tests for latency-budget Whisper model selection
+ModLog : 2026-10-18  Initial version
+"""
+
+import pytest
+from src.audio_processing.model_selection import (
+    PRIOR_RTF, ThroughputTracker, candidate_models, choose_model
+)
+
+def test_priors_until_measured():
+    tracker = ThroughputTracker(smoothing=0.5)
+    assert tracker.rtf(("small", "cpu", "fp32")) == PRIOR_RTF["small"]
+    assert tracker.rtf(("small", "cpu", "int8")) < PRIOR_RTF["small"]
+    tracker.record(("small", "cpu", "fp32"), audio_seconds=10, seconds=2)
+    tracker.record(("small", "cpu", "fp32"), audio_seconds=10, seconds=4)
+    assert tracker.rtf(("small", "cpu", "fp32")) == pytest.approx(0.3)
+
+def test_largest_model_within_budget():
+    tracker = ThroughputTracker()
+    for name, rtf in {"tiny": 0.1, "base": 0.2, "small": 0.5, "medium": 1.0, "large-v2": 2.0}.items():
+        tracker.record((name, "cpu", "fp32"), 100, 100 * rtf)
+    assert choose_model(100, 150, tracker, "cpu", "fp32") == "medium"
+    assert choose_model(100, 1000, tracker, "cpu", "fp32") == "large-v2"
+    # Under load the queue eats into the budget
+    assert choose_model(100, 150, tracker, "cpu", "fp32", queue_seconds=120) == "base"
+    # Nothing fits: fastest model
+    assert choose_model(100, 1, tracker, "cpu", "fp32") == "tiny"
+
+def test_candidates_respect_ceiling():
+    assert candidate_models("small") == ("tiny", "base", "small")
+    assert candidate_models("large-v3")[-1] == "large-v3"
+    assert candidate_models()[-1] == "large-v2"
@@ -0,0 +1,89 @@
+"""
+test_parallel.py ─────────────────────────────────────────────────────────────
+Summary: Unit tests for the separator worker pool sizing and lifecycle
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Workers honour skip_silence
+         2026-10-18  Bounded submission window
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from src.audio_processing import parallel
+from src.audio_processing.audio_io import DecodedAudio
+
+GIB = 1024 ** 3
+
+def test_workers_fit_in_memory(monkeypatch):
+    monkeypatch.setattr(parallel.os, "cpu_count", lambda: 16)
+    monkeypatch.setattr(parallel, "available_memory", lambda: 1 * GIB)
+    assert parallel.default_workers() == 1
+    monkeypatch.setattr(parallel, "available_memory", lambda: 8 * GIB)
+    assert parallel.default_workers() == 5
+
+def test_workers_capped_by_cores(monkeypatch):
+    monkeypatch.setattr(parallel.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(parallel, "available_memory", lambda: 64 * GIB)
+    assert parallel.default_workers() == 2
+
+def test_discarded_pool_is_not_reused(monkeypatch):
+    class FakePool:
+        shut = False
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut = True
+    broken = FakePool()
+    monkeypatch.setattr(parallel, "_pools", {("spleeter:4stems", 2): broken})
+    parallel.discard_worker_pool(broken)
+    assert parallel._pools == {}
+    assert broken.shut
+
+def test_segments_honour_skip_silence(tmp_path, monkeypatch):
+    rate = 44100
+    # One loud second followed by three silent ones
+    samples = np.zeros((4 * rate, 2), dtype=np.float32)
+    samples[:rate] = np.random.default_rng(0).uniform(-0.5, 0.5, (rate, 2))
+    path = tmp_path / "track.f32"
+    samples.tofile(path)
+    calls = []
+    class Recorder:
+        def separate(self, waveform):
+            calls.append(len(waveform))
+            return {"vocals": waveform}
+    monkeypatch.setattr(parallel, "_worker_separator", Recorder())
+    audio = DecodedAudio(path, rate, 2)
+
+    parallel._separate_segment(audio, 0, len(samples), rate)
+    assert sum(calls) < len(samples)
+    calls.clear()
+    parallel._separate_segment(audio, 0, len(samples), rate, skip_silence=False)
+    assert calls == [len(samples)]
+
+def test_map_bounded_keeps_order_and_window():
+    submitted = []
+    class CountingPool(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            submitted.append(args[0])
+            return super().submit(fn, *args)
+    with CountingPool(max_workers=2) as pool:
+        results = parallel.map_bounded(pool, lambda x: x * x, ((i,) for i in range(10)), 3)
+        assert next(results) == 0
+        # The first result was replaced by the next call, nothing more
+        assert submitted == [0, 1, 2, 3]
+        assert list(results) == [i * i for i in range(1, 10)]
+
+def test_map_bounded_cancels_pending_calls_when_closed():
+    class ManualPool:
+        """Only the first call ever finishes"""
+        def __init__(self):
+            self.futures = []
+        def submit(self, fn, *args):
+            future = Future()
+            if not self.futures:
+                future.set_result(args[0])
+            self.futures.append(future)
+            return future
+    pool = ManualPool()
+    results = parallel.map_bounded(pool, None, ((i,) for i in range(5)), 3)
+    assert next(results) == 0
+    results.close()
+    assert len(pool.futures) == 4
+    assert all(future.cancelled() for future in pool.futures[1:])
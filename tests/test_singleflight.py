@@ -0,0 +1,47 @@
+"""
+test_singleflight.py ─────────────────────────────────────────────────────────
+Summary: Unit tests for single-flight request coalescing
+ModLog : 2026-10-18  Initial version
+"""
+
+import asyncio
+import pytest
+from utils.singleflight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"vocals": "v.wav"}
+
+    async def main():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("track", work) for _ in range(5)))
+        assert not flights.in_flight("track")
+        return results
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+def test_errors_are_shared_and_not_cached():
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError("download failed")
+
+    async def main():
+        flights = SingleFlight()
+        outcomes = await asyncio.gather(
+            flights.do("track", fail), flights.do("track", fail), return_exceptions=True
+        )
+        assert all(isinstance(o, RuntimeError) for o in outcomes)
+        with pytest.raises(RuntimeError):
+            await flights.do("track", fail)
+
+    asyncio.run(main())
+    assert len(calls) == 2
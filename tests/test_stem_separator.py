@@ -0,0 +1,96 @@
+"""
+test_stem_separator.py ───────────────────────────────────────────────────────
+Summary: Unit tests for in-memory separation and stem buffers
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Batch packing and output layout
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("spleeter")
+
+from src.audio_processing.backends import SeparationBackend
+from src.audio_processing.stem_separator import (
+    BATCH_GAP_SECONDS, SEPARATOR_SAMPLE_RATE, StemSeparator
+)
+
+class HalfBackend(SeparationBackend):
+    """Splits a mix into two equal halves and counts its calls"""
+    def __init__(self):
+        super().__init__("half")
+        self.calls = []
+    @property
+    def spec(self):
+        return "half"
+    def load(self):
+        pass
+    def separate(self, waveform):
+        self.calls.append(len(waveform))
+        return {"vocals": waveform * 0.5, "accompaniment": waveform * 0.5}
+
+class RecordingAdapter:
+    def __init__(self, clips=None):
+        self.saved = []
+        self.shapes = {}
+        self.clips = clips or {}
+    def load(self, path, sample_rate=None):
+        return self.clips[path], sample_rate
+    def save(self, path, data, sample_rate, codec):
+        self.saved.append(path)
+        self.shapes[path] = data.shape
+        with open(path, "wb") as f:
+            f.write(b"RIFF")
+
+def noise(seconds, channels=2, seed=0):
+    samples = int(seconds * SEPARATOR_SAMPLE_RATE)
+    return np.random.default_rng(seed).uniform(-0.5, 0.5, (samples, channels)).astype(np.float32)
+
+def test_separate_array_in_memory():
+    backend = HalfBackend()
+    separator = StemSeparator(backend)
+    mono = noise(1, channels=1)[:, 0]
+    buffers = separator.separate_array(mono, SEPARATOR_SAMPLE_RATE)
+    assert set(buffers) == {"vocals", "accompaniment"}
+    assert buffers["vocals"].shape == (len(mono), 2)
+    np.testing.assert_allclose(buffers["vocals"][:, 0], mono * 0.5)
+    assert buffers.paths == {}
+
+def test_separate_array_selects_stems():
+    separator = StemSeparator(HalfBackend())
+    buffers = separator.separate_array(noise(1), SEPARATOR_SAMPLE_RATE, ["instrumental"])
+    assert list(buffers) == ["instrumental"]
+
+def test_stem_buffers_write_each_file_once(tmp_path):
+    buffers = StemSeparator(HalfBackend()).separate_array(noise(1), SEPARATOR_SAMPLE_RATE)
+    adapter = buffers.audio_adapter = RecordingAdapter()
+    first = buffers.write(str(tmp_path))
+    again = buffers.path("vocals", str(tmp_path))
+    assert again == first["vocals"]
+    assert sorted(adapter.saved) == sorted(first.values())
+    buffers.path("vocals", str(tmp_path), codec="mp3")
+    assert len(adapter.saved) == 3
+
+def test_process_batch_packs_clips_and_keeps_outputs_apart(tmp_path):
+    paths = []
+    for relative in ("a/kick.wav", "b/kick.wav", "snare.wav"):
+        path = tmp_path / "in" / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+        paths.append(str(path))
+    clips = {path: noise(0.5 + index, seed=index) for index, path in enumerate(paths)}
+    backend = HalfBackend()
+    separator = StemSeparator(backend)
+    separator.audio_adapter = RecordingAdapter(clips)
+
+    results = separator.process_batch(paths, str(tmp_path / "out"))
+
+    # One separation call for all clips, with a gap between neighbours
+    gap = int(BATCH_GAP_SECONDS * SEPARATOR_SAMPLE_RATE)
+    assert backend.calls == [sum(len(clip) for clip in clips.values()) + 2 * gap]
+    dirs = [results[path]["output_dir"] for path in paths]
+    assert len(set(dirs)) == 3
+    assert dirs[2] == str(tmp_path / "out" / "snare")
+    for path in paths:
+        vocals = results[path]["paths"]["vocals"]
+        assert separator.audio_adapter.shapes[vocals] == clips[path].shape
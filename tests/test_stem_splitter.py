@@ -3,51 +3,62 @@ test_stem_splitter.py ───────────────────
 Author : ChatGPT for CBW  ✦ 2025-05-23
 Summary: Unit & E2E tests for stem_splitter using monkeypatch
 ModLog : 2025-05-23  Initial version
+         2026-10-18  In-memory dummy separator; requested-stem fast path
+         2026-10-18  Separators come from an exclusive lease
+         2026-10-18  Tracks never share download or stem paths
 """
 
 import os
 import json
+import numpy as np
+import pytest
+from contextlib import contextmanager
 from utils.stem_splitter import split_stems
 
-class DummyStream:
-    def __init__(self, dest, name):
-        self.dest = dest
-        self.name = name
-    def download(self, output_path, filename):
+class DummyYDL:
+    def __init__(self, opts):
+        self.outtmpl = opts["outtmpl"]
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def download(self, urls):
         # Create a fake audio.mp4 file
-        path = os.path.join(output_path, filename)
-        with open(path, "wb") as f:
+        with open(self.outtmpl, "wb") as f:
             f.write(b"FAKEAUDIO")
-        return path
-
-class DummyYT:
-    def __init__(self, url):
-        self.url = url
-        self.streams = self
-    def filter(self, only_audio):
-        return [self]
-    def order_by(self, key):
-        return self
-    def desc(self):
-        return self
-    def first(self):
-        return DummyStream(None, None)
 
 class DummySeparator:
+    models = []
     def __init__(self, model):
-        pass
-    def separate_to_file(self, audio_path, output_dir):
-        # Simulate output directory structure
-        stem_dir = os.path.join(output_dir, "audio")
-        os.makedirs(stem_dir, exist_ok=True)
-        for stem in ("vocals", "drums", "bass", "other"):
-            with open(os.path.join(stem_dir, f"{stem}.wav"), "wb") as f:
-                f.write(b"DUMMY")
+        self.models.append(model)
+        self.stems = {
+            "spleeter:2stems": ("vocals", "accompaniment"),
+            "spleeter:4stems": ("vocals", "drums", "bass", "other"),
+        }[model]
+    def separate(self, waveform):
+        return {stem: waveform for stem in self.stems}
+
+@contextmanager
+def dummy_lease(model):
+    yield DummySeparator(model)
+
+def fake_load_pcm(audio_path, sample_rate=44100):
+    return np.zeros((100, 2), dtype=np.float32)
+
+def fake_fingerprint(audio_path, model):
+    with open(audio_path, "rb") as f:
+        return f"{model}:{f.read().hex()}"
+
+@pytest.fixture(autouse=True)
+def fake_decode(monkeypatch):
+    monkeypatch.setattr('utils.stem_splitter.load_pcm', fake_load_pcm)
+    DummySeparator.models.clear()
 
 def test_split_stems_creates_files(monkeypatch, tmp_output_dir):
-    # Patch YouTube and Separator
-    monkeypatch.setattr('utils.stem_splitter.YouTube', DummyYT)
-    monkeypatch.setattr('utils.stem_splitter.Separator', DummySeparator)
+    # Patch yt-dlp and the separator pool
+    monkeypatch.setattr('utils.stem_splitter.yt_dlp.YoutubeDL', DummyYDL)
+    monkeypatch.setattr('utils.stem_splitter.spleeter_separator', dummy_lease)
+    monkeypatch.setattr('utils.stem_splitter.fingerprint_file', fake_fingerprint)
 
     stems = split_stems("https://youtu.be/fake", tmp_output_dir)
     # Expect 4 stems
@@ -58,12 +69,50 @@ def test_split_stems_creates_files(monkeypatch, tmp_output_dir):
 
 def test_split_stems_uses_cache(monkeypatch, tmp_output_dir):
     # First run to populate cache
-    monkeypatch.setattr('utils.stem_splitter.YouTube', DummyYT)
-    monkeypatch.setattr('utils.stem_splitter.Separator', DummySeparator)
+    monkeypatch.setattr('utils.stem_splitter.yt_dlp.YoutubeDL', DummyYDL)
+    monkeypatch.setattr('utils.stem_splitter.spleeter_separator', dummy_lease)
+    monkeypatch.setattr('utils.stem_splitter.fingerprint_file', fake_fingerprint)
     first = split_stems("https://youtu.be/fake", tmp_output_dir)
-    # Now monkeypatch to throw if YouTube called
+    # Now monkeypatch to throw if yt-dlp is called
     def fail(_):
         raise RuntimeError("Should not download again")
-    monkeypatch.setattr('utils.stem_splitter.YouTube', fail)
+    monkeypatch.setattr('utils.stem_splitter.yt_dlp.YoutubeDL', fail)
     cached = split_stems("https://youtu.be/fake", tmp_output_dir)
     assert cached == first
+
+def test_split_stems_reuses_identical_audio(monkeypatch, tmp_output_dir):
+    monkeypatch.setattr('utils.stem_splitter.yt_dlp.YoutubeDL', DummyYDL)
+    monkeypatch.setattr('utils.stem_splitter.spleeter_separator', dummy_lease)
+    monkeypatch.setattr('utils.stem_splitter.fingerprint_file', fake_fingerprint)
+    first = split_stems("https://youtu.be/fake", tmp_output_dir)
+    # A mirror of the same audio must not be separated again
+    def fail(_):
+        raise RuntimeError("Should not separate again")
+    monkeypatch.setattr('utils.stem_splitter.spleeter_separator', fail)
+    mirrored = split_stems("https://example.com/mirror/fake", tmp_output_dir)
+    assert mirrored == first
+
+def test_split_stems_instrumental_only(monkeypatch, tmp_output_dir):
+    monkeypatch.setattr('utils.stem_splitter.yt_dlp.YoutubeDL', DummyYDL)
+    monkeypatch.setattr('utils.stem_splitter.spleeter_separator', dummy_lease)
+    monkeypatch.setattr('utils.stem_splitter.fingerprint_file', fake_fingerprint)
+    stems = split_stems("https://youtu.be/karaoke", tmp_output_dir, stems=["instrumental"])
+    # The 2-stem model suffices and nothing else is written
+    assert DummySeparator.models == ["spleeter:2stems"]
+    assert list(stems) == ["instrumental"]
+    assert os.listdir(os.path.dirname(stems["instrumental"])) == ["instrumental.wav"]
+
+class PerUrlYDL(DummyYDL):
+    def download(self, urls):
+        with open(self.outtmpl, "wb") as f:
+            f.write(urls[0].encode())
+
+def test_split_stems_tracks_do_not_share_files(monkeypatch, tmp_output_dir):
+    monkeypatch.setattr('utils.stem_splitter.yt_dlp.YoutubeDL', PerUrlYDL)
+    monkeypatch.setattr('utils.stem_splitter.spleeter_separator', dummy_lease)
+    monkeypatch.setattr('utils.stem_splitter.fingerprint_file', fake_fingerprint)
+    first = split_stems("https://youtu.be/one", tmp_output_dir)
+    second = split_stems("https://youtu.be/two", tmp_output_dir)
+    assert set(first.values()).isdisjoint(second.values())
+    # Downloads live in private directories that are gone afterwards
+    assert os.listdir(tmp_output_dir) == ["audio"]
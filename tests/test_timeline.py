@@ -0,0 +1,50 @@
+"""
+test_timeline.py ──────────────────────────────────────────────────────────────
+Summary: Unit tests for the columnar lyric timeline
+ModLog : 2026-10-18  Initial version
+"""
+
+import numpy as np
+from src.audio_processing.timeline import LyricTimeline
+
+SEGMENTS = [
+    {"text": "la la", "start": 4.0, "end": 5.0},
+    {"text": "hello", "start": 0.0, "end": 1.0},
+    {"text": "world", "start": 1.2, "end": 2.0},
+    {"text": "la la", "start": 5.1, "end": 6.0},
+]
+
+def test_sorted_and_interned():
+    timeline = LyricTimeline.from_segments(SEGMENTS)
+    np.testing.assert_array_equal(timeline.starts, [0.0, 1.2, 4.0, 5.1])
+    assert len(timeline.texts) == 3
+    assert [timeline.text(i) for i in range(len(timeline))] == ["hello", "world", "la la", "la la"]
+
+def test_active_lookup():
+    timeline = LyricTimeline.from_segments(SEGMENTS)
+    assert timeline.active(0.5) == 0
+    assert timeline.active(1.1) is None  # between lines
+    assert timeline.active(5.5) == 3
+    assert timeline.active(-1) is None and timeline.active(7) is None
+    np.testing.assert_array_equal(timeline.active_many([0.0, 1.5, 3.0, 4.5]), [0, 1, -1, 2])
+    assert timeline.next_after(2.5) == 2
+    assert timeline.next_after(5.5) is None
+
+def test_karaoke_lines_merge_short_gaps():
+    lines = LyricTimeline.from_segments(SEGMENTS).karaoke_lines(max_gap=0.5)
+    assert lines.to_dicts() == [
+        {"text": "hello world", "start": 0.0, "end": 2.0},
+        {"text": "la la la la", "start": 4.0, "end": 6.0},
+    ]
+
+def test_estimated_words_cover_their_line():
+    words = LyricTimeline.from_segments(SEGMENTS[1:2]).estimate_words()
+    assert len(words) == 1 and words.unit(0)["end"] == 1.0
+    words = LyricTimeline.from_segments([{"text": "ab cd", "start": 0.0, "end": 2.0}]).estimate_words()
+    np.testing.assert_allclose(words.starts, [0.0, 1.0])
+    assert words.text(words.active(1.5)) == "cd"
+
+def test_empty_timeline():
+    timeline = LyricTimeline.from_segments([])
+    assert timeline.active(1.0) is None
+    assert timeline.karaoke_lines().to_dicts() == []
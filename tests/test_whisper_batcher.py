@@ -0,0 +1,98 @@
+"""
+test_whisper_batcher.py ───────────────────────────────────────────────────────
+Summary: Unit tests for cross-job Whisper window batching
+ModLog : 2026-10-18  Initial version
+         2026-10-18  Temperature fallback rule
+         2026-10-18  Whisper's consecutive-timestamp segment rule
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+import numpy as np
+from src.audio_processing.whisper_batcher import (
+    WhisperBatcher, is_silent, needs_fallback, tokens_to_segments
+)
+
+class RecordingBatcher(WhisperBatcher):
+    """Batcher whose 'model' echoes the first sample of each window"""
+    def __init__(self, **kwargs):
+        self.batches = []
+        self.lock = threading.Lock()
+        super().__init__(**kwargs)
+    def _decode(self, key, windows):
+        with self.lock:
+            self.batches.append((key, len(windows)))
+        return [{"text": str(window[0]), "segments": []} for window in windows]
+
+def words(ids):
+    return " ".join(map(str, ids))
+
+def test_tokens_to_segments():
+    # <|0.00|> 1 2 <|1.00|><|1.00|> 3 <|2.00|><|2.00|> 4 <|2.50|>
+    tokens = [100, 1, 2, 150, 150, 3, 200, 200, 4, 225]
+    assert tokens_to_segments(tokens, 100, words, 3.0) == [
+        {"text": "1 2", "start": 0.0, "end": 1.0},
+        {"text": "3", "start": 1.0, "end": 2.0},
+        {"text": "4", "start": 2.0, "end": 2.5},
+    ]
+
+def test_unclosed_last_segment_runs_to_window_end():
+    # <|0.00|> 1 <|1.00|><|1.00|> 2
+    assert tokens_to_segments([100, 1, 150, 150, 2], 100, words, 3.0) == [
+        {"text": "1", "start": 0.0, "end": 1.0},
+        {"text": "2", "start": 1.0, "end": 3.0},
+    ]
+
+def test_single_pair_free_window_ends_at_its_last_timestamp():
+    # <|0.00|> 1 2 <|1.50|>: one segment, closed by the single timestamp
+    assert tokens_to_segments([100, 1, 2, 175], 100, words, 3.0) == [
+        {"text": "1 2", "start": 0.0, "end": 1.5},
+    ]
+    # No timestamp at all: the whole window
+    assert tokens_to_segments([1, 2], 100, words, 3.0) == [
+        {"text": "1 2", "start": 0.0, "end": 3.0},
+    ]
+
+def test_text_before_the_first_timestamp_starts_the_window():
+    # 1 <|1.00|><|1.00|> 2 <|2.00|>
+    assert tokens_to_segments([1, 150, 150, 2, 200], 100, words, 3.0) == [
+        {"text": "1", "start": 0.0, "end": 1.0},
+        {"text": "2", "start": 1.0, "end": 2.0},
+    ]
+
+def test_full_batches_and_routing():
+    batcher = RecordingBatcher(max_batch=4, max_wait=5.0)
+    key = ("small", "cpu", "fp32", "en")
+    futures = [batcher.submit(key, np.full(10, i, np.float32)) for i in range(8)]
+    assert [f.result(timeout=2)["text"] for f in futures] == [str(float(i)) for i in range(8)]
+    assert batcher.batches == [(key, 4), (key, 4)]
+
+def test_partial_batch_leaves_after_max_wait():
+    batcher = RecordingBatcher(max_batch=8, max_wait=0.05)
+    started = time.monotonic()
+    future = batcher.submit(("small", "cpu", "fp32", "en"), np.zeros(10, np.float32))
+    future.result(timeout=2)
+    assert 0.04 <= time.monotonic() - started < 1.0
+
+def test_languages_are_not_mixed():
+    batcher = RecordingBatcher(max_batch=2, max_wait=0.05)
+    en = batcher.submit(("small", "cpu", "fp32", "en"), np.zeros(10, np.float32))
+    fr = batcher.submit(("small", "cpu", "fp32", "fr"), np.zeros(10, np.float32))
+    en.result(timeout=2), fr.result(timeout=2)
+    assert sorted(batcher.batches) == [
+        (("small", "cpu", "fp32", "en"), 1), (("small", "cpu", "fp32", "fr"), 1)
+    ]
+
+def test_fallback_follows_whisper_thresholds():
+    def result(ratio=1.5, logprob=-0.3, no_speech=0.1):
+        return SimpleNamespace(
+            compression_ratio=ratio, avg_logprob=logprob, no_speech_prob=no_speech
+        )
+    assert not needs_fallback(result())
+    # Repetitive text, or text the model itself finds unlikely
+    assert needs_fallback(result(ratio=3.0))
+    assert needs_fallback(result(logprob=-1.5))
+    # Silence is dropped, not decoded again
+    silence = result(logprob=-1.5, no_speech=0.9)
+    assert is_silent(silence) and not needs_fallback(silence)
@@ -1,6 +1,8 @@
 from langchain.tools import BaseTool
 from typing import Dict, Any, List
+from pathlib import Path
 from src.audio_processing.lyrics_generator import LyricsGenerator
+from src.audio_processing.timeline import LyricTimeline
 import os
 
 class LyricsTool(BaseTool):
@@ -14,30 +16,19 @@ class LyricsTool(BaseTool):
     def _run(self, url: str) -> Dict[str, Any]:
         """Generate lyrics and karaoke version"""
         try:
-            # Generate lyrics
-            lyrics = self.generator.generate_lyrics(url)
-            
-            # Format karaoke data
-            karaoke_data = []
-            current_line = None
-            
-            for line in lyrics:
-                if current_line and line['start'] - current_line['end'] > 0.5:
-                    karaoke_data.append(current_line)
-                    current_line = None
-                
-                if not current_line:
-                    current_line = {
-                        'text': line['text'],
-                        'start': line['start'],
-                        'end': line['end']
-                    }
-                else:
-                    current_line['end'] = line['end']
-                    current_line['text'] += f" {line['text']}"
+            # Generate lyrics (blocking; _arun goes through the inference executor)
+            segments = self.generator.transcribe(Path(url))
+            return self._format(segments)
+        except Exception as e:
+            return {'error': str(e)}
+
+    def _format(self, segments: List[Any]) -> Dict[str, Any]:
+        """Build the lyrics and karaoke payload from lyric segments"""
+        try:
+            lyrics = [segment.to_dict() for segment in segments]
             
-            if current_line:
-                karaoke_data.append(current_line)
+            # Merge segments into karaoke lines (vectorized over the timeline)
+            karaoke_data = LyricTimeline.from_segments(segments).karaoke_lines().to_dicts()
             
             return {
                 'lyrics': lyrics,
@@ -49,4 +40,8 @@ class LyricsTool(BaseTool):
 
     async def _arun(self, url: str) -> Dict[str, Any]:
         """Async version of _run"""
-        return self._run(url)
+        try:
+            segments = await self.generator.generate_lyrics(Path(url))
+        except Exception as e:
+            return {'error': str(e)}
+        return self._format(segments)
@@ -3,56 +3,667 @@
 cache.py ────────────────────────────────────────────────────────────────
 Author : ChatGPT for CBW  ✦ 2025-05-23
 Summary: Simple SQLite-based cache to store and retrieve processed stems
-Inputs : url (str), stems (dict), db_path (str)
+         and transcribed lyrics
+Inputs : url (str), stems (dict), lyrics (list), fingerprint (str), db_path (str)
 Outputs: cached JSON string in SQLite
 ModLog : 2025-05-23 Initial version
+         2026-10-18 Key stems on audio fingerprint + model, URL alias table
+         2026-10-18 Track artifact size/access, LRU+TTL eviction, integrity sweep
+         2026-10-18 WAL mode, per-thread connection reuse, batched lookups
+         2026-10-18 Lyrics table keyed by audio fingerprint, model, language, options
+         2026-10-18 Eviction spares files other rows share and entries just stored
+         2026-10-18 File identity (path, size, mtime) -> fingerprint map
 """
 
+import os
 import sqlite3
 import json
+import time
+import hashlib
+import logging
+import threading
 from contextlib import closing
+from typing import Iterable
+
+from utils.fingerprint import canonical_url
 
 DB_PATH = "cache.db"
+DEFAULT_MODEL = "spleeter:4stems"
+# Disk budget for cached stem files and optional max idle age (seconds).
+MAX_CACHE_BYTES = int(os.getenv("JAMSPLITTER_CACHE_MAX_BYTES", 20 * 1024 ** 3))
+CACHE_TTL = float(os.getenv("JAMSPLITTER_CACHE_TTL", 0)) or None
+SWEEP_INTERVAL = float(os.getenv("JAMSPLITTER_CACHE_SWEEP_INTERVAL", 600))
+# How long a writer waits on another process' lock before giving up (seconds).
+BUSY_TIMEOUT = 30.0
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER in IN (...) lookups.
+BATCH_SIZE = 500
+# Budget for cached lyrics JSON (they live in the database, not in files).
+MAX_LYRICS_BYTES = int(os.getenv("JAMSPLITTER_LYRICS_CACHE_MAX_BYTES", 64 * 1024 ** 2))
+
+logger = logging.getLogger(__name__)
+
+# One connection per (thread, db file); schema is created once per process.
+_local = threading.local()
+_initialized: set = set()
+_init_lock = threading.Lock()
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache reuses the prepared form on every call.
+SQL_LOOKUP_URL = """
+    SELECT s.fingerprint, s.stems_json FROM url_aliases a
+    JOIN stems s ON s.fingerprint = a.fingerprint
+    WHERE a.url = ? AND a.model = ?
+"""
+SQL_LOOKUP_FINGERPRINT = "SELECT fingerprint, stems_json FROM stems WHERE fingerprint = ?"
+SQL_TOUCH = "UPDATE stems SET last_access = ?, hit_count = hit_count + 1 WHERE fingerprint = ?"
+SQL_INSERT_STEMS = """
+    INSERT OR REPLACE INTO stems
+        (fingerprint, model, stems_json, bytes, created_at, last_access, hit_count)
+    VALUES (?, ?, ?, ?, ?, ?, 0)
+"""
+SQL_INSERT_ALIAS = "INSERT OR REPLACE INTO url_aliases (url, model, fingerprint) VALUES (?, ?, ?)"
+SQL_SELECT_JSON = "SELECT stems_json FROM stems WHERE fingerprint = ?"
+SQL_DELETE_ALIASES = "DELETE FROM url_aliases WHERE fingerprint = ?"
+SQL_DELETE_STEMS = "DELETE FROM stems WHERE fingerprint = ?"
+SQL_LOOKUP_LYRICS = "SELECT lyrics_json FROM lyrics WHERE key = ?"
+SQL_TOUCH_LYRICS = "UPDATE lyrics SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?"
+SQL_LOOKUP_FILE = """
+    SELECT fingerprint FROM file_fingerprints
+    WHERE path = ? AND model = ? AND size = ? AND mtime_ns = ?
+"""
+SQL_INSERT_FILE = """
+    INSERT OR REPLACE INTO file_fingerprints (path, model, size, mtime_ns, fingerprint)
+    VALUES (?, ?, ?, ?, ?)
+"""
+SQL_INSERT_LYRICS = """
+    INSERT OR REPLACE INTO lyrics
+        (key, fingerprint, model, language, options_json, lyrics_json, bytes,
+         created_at, last_access, hit_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+"""
 
 
-def init_cache(db_path: str = DB_PATH) -> sqlite3.Connection:
+def _create_schema(conn: sqlite3.Connection) -> None:
     """
-    Initialize the cache database and create tables if missing.
-    Returns a sqlite3.Connection object.
+    Create or migrate the cache tables.
+
+    `stems` holds one row per separation result, keyed by the fingerprint
+    of the decoded audio and separator model, with the bytes its files use
+    on disk and access statistics for eviction; `url_aliases` maps every
+    URL seen for that audio onto the fingerprint. `lyrics` holds
+    transcriptions keyed by audio fingerprint, model, language and options.
+    `file_fingerprints` remembers the fingerprint of a local file for as
+    long as its size and modification time stay the same, so cache lookups
+    need not decode it again.
     """
-    conn = sqlite3.connect(db_path)
     with closing(conn.cursor()) as cur:
+        cur.execute("PRAGMA table_info(stems)")
+        columns = {row[1] for row in cur.fetchall()}
+        if columns and "fingerprint" not in columns:
+            # Pre-fingerprint schema keyed on raw URL; it is only a cache.
+            logger.info("Dropping legacy URL-keyed stems cache")
+            cur.execute("DROP TABLE stems")
         cur.execute(
             """
             CREATE TABLE IF NOT EXISTS stems (
-                url TEXT PRIMARY KEY,
-                stems_json TEXT NOT NULL
+                fingerprint TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                stems_json TEXT NOT NULL,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL DEFAULT 0,
+                last_access REAL NOT NULL DEFAULT 0,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        cur.execute("PRAGMA table_info(stems)")
+        columns = {row[1] for row in cur.fetchall()}
+        for column, ddl in (
+            ("bytes", "INTEGER NOT NULL DEFAULT 0"),
+            ("created_at", "REAL NOT NULL DEFAULT 0"),
+            ("last_access", "REAL NOT NULL DEFAULT 0"),
+            ("hit_count", "INTEGER NOT NULL DEFAULT 0"),
+        ):
+            if column not in columns:
+                cur.execute(f"ALTER TABLE stems ADD COLUMN {column} {ddl}")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stems_last_access ON stems (last_access)"
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS url_aliases (
+                url TEXT NOT NULL,
+                model TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (url, model)
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_url_aliases_fingerprint ON url_aliases (fingerprint)"
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lyrics (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                model TEXT NOT NULL,
+                language TEXT NOT NULL,
+                options_json TEXT NOT NULL,
+                lyrics_json TEXT NOT NULL,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL DEFAULT 0,
+                last_access REAL NOT NULL DEFAULT 0,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_lyrics_last_access ON lyrics (last_access)"
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_fingerprints (
+                path TEXT NOT NULL,
+                model TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (path, model)
             )
             """
         )
         conn.commit()
+
+
+def _is_open(conn: sqlite3.Connection) -> bool:
+    """
+    True unless the connection has been closed by its user.
+    """
+    try:
+        conn.in_transaction
+    except sqlite3.ProgrammingError:
+        return False
+    return True
+
+
+def init_cache(db_path: str | None = None) -> sqlite3.Connection:
+    """
+    Return this thread's connection to the cache database, opening it and
+    creating tables if missing on first use.
+    Returns a sqlite3.Connection object.
+
+    Connections run in WAL mode so readers never block on the writer and
+    concurrent API workers wait on `busy_timeout` instead of failing with
+    `database is locked`.
+    """
+    path = db_path or DB_PATH
+    conns = _local.__dict__.setdefault("conns", {})
+    conn = conns.get(path)
+    if conn is not None and _is_open(conn):
+        return conn
+
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with _init_lock:
+        key = os.path.abspath(path)
+        if key not in _initialized:
+            _create_schema(conn)
+            _initialized.add(key)
+    conns[path] = conn
     return conn
 
 
-def get_cached_stems(url: str, conn: sqlite3.Connection) -> dict | None:
+def close_cache(db_path: str | None = None) -> None:
+    """
+    Close this thread's cache connections (all of them without `db_path`).
+    """
+    conns = _local.__dict__.get("conns", {})
+    paths = [db_path] if db_path else list(conns)
+    for path in paths:
+        conn = conns.pop(path, None)
+        if conn is not None:
+            conn.close()
+
+
+def url_key(url: str, model: str = DEFAULT_MODEL) -> str:
+    """
+    Placeholder fingerprint for results cached before the audio was decoded.
+    """
+    digest = hashlib.sha256(f"{model}\0{canonical_url(url)}".encode("utf-8"))
+    return "url:" + digest.hexdigest()
+
+
+def _stem_files_exist(stems: dict) -> bool:
+    """
+    True if every file a cached stems dict points to is still on disk.
+    """
+    return all(os.path.isfile(path) for path in stems.values())
+
+
+def _stems_bytes(stems: dict) -> int:
+    """
+    Total size on disk of the files in a stems dict.
+    """
+    total = 0
+    for path in stems.values():
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def _resolve_rows(rows: Iterable[tuple], conn: sqlite3.Connection) -> dict:
+    """
+    Turn (fingerprint, stems_json) rows into live stems dicts by fingerprint.
+
+    Records a hit for every live row and drops rows whose files have been
+    deleted so callers never get dead paths, all in one transaction.
+    """
+    live, dead = {}, []
+    for fingerprint, stems_json in rows:
+        stems = json.loads(stems_json)
+        if _stem_files_exist(stems):
+            live[fingerprint] = stems
+        else:
+            dead.append(fingerprint)
+    if not live and not dead:
+        return live
+
+    now = time.time()
+    with conn, closing(conn.cursor()) as cur:
+        if dead:
+            logger.info("Dropping %d cached stem entries with missing files", len(dead))
+            _delete_entries(cur, dead)
+        cur.executemany(SQL_TOUCH, [(now, fingerprint) for fingerprint in live])
+    return live
+
+
+def get_cached_stems(
+    url: str, conn: sqlite3.Connection, model: str = DEFAULT_MODEL
+) -> dict | None:
     """
     Retrieve cached stems for a given URL. Returns dict or None.
     """
     with closing(conn.cursor()) as cur:
-        cur.execute("SELECT stems_json FROM stems WHERE url = ?", (url,))
-        row = cur.fetchone()
-    if row:
-        return json.loads(row[0])
-    return None
+        cur.execute(SQL_LOOKUP_URL, (canonical_url(url), model))
+        rows = cur.fetchall()
+    return next(iter(_resolve_rows(rows, conn).values()), None)
 
 
-def cache_stems(url: str, stems: dict, conn: sqlite3.Connection) -> None:
+def get_cached_stems_many(
+    urls: Iterable[str], conn: sqlite3.Connection, model: str = DEFAULT_MODEL
+) -> dict:
     """
-    Store stems dict in cache under the given URL.
+    Retrieve cached stems for many URLs in a few round trips.
+    Returns {url: stems} for the URLs that hit; misses are omitted.
     """
+    by_canonical: dict = {}
+    for url in urls:
+        by_canonical.setdefault(canonical_url(url), []).append(url)
+    keys = list(by_canonical)
+
+    rows, fingerprints = {}, {}
     with closing(conn.cursor()) as cur:
-        cur.execute(
-            "INSERT OR REPLACE INTO stems (url, stems_json) VALUES (?, ?)" ,
-            (url, json.dumps(stems))
+        for start in range(0, len(keys), BATCH_SIZE):
+            chunk = keys[start:start + BATCH_SIZE]
+            cur.execute(
+                f"""
+                SELECT a.url, s.fingerprint, s.stems_json FROM url_aliases a
+                JOIN stems s ON s.fingerprint = a.fingerprint
+                WHERE a.model = ? AND a.url IN ({",".join("?" * len(chunk))})
+                """,
+                (model, *chunk)
+            )
+            for canonical, fingerprint, stems_json in cur.fetchall():
+                fingerprints[canonical] = fingerprint
+                rows[fingerprint] = stems_json
+
+    live = _resolve_rows(rows.items(), conn)
+    return {
+        url: live[fingerprint]
+        for canonical, fingerprint in fingerprints.items()
+        if fingerprint in live
+        for url in by_canonical[canonical]
+    }
+
+
+def get_stems_by_fingerprint(
+    fingerprint: str, conn: sqlite3.Connection
+) -> dict | None:
+    """
+    Retrieve cached stems for an audio fingerprint. Returns dict or None.
+    """
+    with closing(conn.cursor()) as cur:
+        cur.execute(SQL_LOOKUP_FINGERPRINT, (fingerprint,))
+        rows = cur.fetchall()
+    return _resolve_rows(rows, conn).get(fingerprint)
+
+
+def alias_url(
+    url: str, fingerprint: str, conn: sqlite3.Connection, model: str = DEFAULT_MODEL
+) -> None:
+    """
+    Point a URL at an already cached fingerprint.
+    """
+    with conn:
+        conn.execute(SQL_INSERT_ALIAS, (canonical_url(url), model, fingerprint))
+
+
+def cache_stems(
+    url: str,
+    stems: dict,
+    conn: sqlite3.Connection,
+    fingerprint: str | None = None,
+    model: str = DEFAULT_MODEL,
+) -> None:
+    """
+    Store stems dict in cache under the audio fingerprint and alias the URL.
+    Without a fingerprint the URL itself is used as the content key.
+    """
+    cache_stems_many(
+        {url: stems}, conn, model=model,
+        fingerprints={url: fingerprint} if fingerprint else None
+    )
+
+
+def cache_stems_many(
+    entries: dict,
+    conn: sqlite3.Connection,
+    model: str = DEFAULT_MODEL,
+    fingerprints: dict | None = None,
+) -> None:
+    """
+    Store many {url: stems} entries in a single transaction.
+    `fingerprints` optionally maps each URL to its audio fingerprint.
+    """
+    fingerprints = fingerprints or {}
+    now = time.time()
+    stem_rows, alias_rows = [], []
+    for url, stems in entries.items():
+        fingerprint = fingerprints.get(url) or url_key(url, model)
+        stem_rows.append(
+            (fingerprint, model, json.dumps(stems), _stems_bytes(stems), now, now)
         )
-        conn.commit()
+        alias_rows.append((canonical_url(url), model, fingerprint))
+    with conn, closing(conn.cursor()) as cur:
+        cur.executemany(SQL_INSERT_STEMS, stem_rows)
+        cur.executemany(SQL_INSERT_ALIAS, alias_rows)
+
+
+def _delete_entries(
+    cur: sqlite3.Cursor, fingerprints: list, remove_files: bool = False
+) -> None:
+    """
+    Delete stems rows and their URL aliases, optionally with their files.
+    Files still referenced by a remaining row are kept.
+    """
+    victims = []
+    if remove_files:
+        for fingerprint in fingerprints:
+            cur.execute(SQL_SELECT_JSON, (fingerprint,))
+            row = cur.fetchone()
+            if row:
+                victims.append(json.loads(row[0]))
+    params = [(fingerprint,) for fingerprint in fingerprints]
+    cur.executemany(SQL_DELETE_ALIASES, params)
+    cur.executemany(SQL_DELETE_STEMS, params)
+    if victims:
+        cur.execute("SELECT stems_json FROM stems")
+        shared = {
+            os.path.realpath(path)
+            for (stems_json,) in cur.fetchall()
+            for path in json.loads(stems_json).values()
+        }
+        for stems in victims:
+            _remove_files({
+                name: path for name, path in stems.items()
+                if os.path.realpath(path) not in shared
+            })
+
+
+def _remove_files(stems: dict) -> None:
+    """
+    Delete stem files and prune their directories once empty.
+    """
+    for path in stems.values():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove cached stem %s: %s", path, e)
+            continue
+        try:
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+
+
+def evict_stems(
+    conn: sqlite3.Connection,
+    max_bytes: int | None = None,
+    ttl: float | None = None,
+    keep: Iterable[str] = (),
+) -> int:
+    """
+    Evict cached stems and their files to respect the TTL and disk budget.
+
+    Entries idle for longer than `ttl` seconds go first, then least
+    recently used entries until the total size is within `max_bytes`.
+    Fingerprints in `keep` (e.g. stems just stored for a caller) are never
+    evicted. Returns the number of entries evicted.
+    """
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    ttl = CACHE_TTL if ttl is None else ttl
+    keep = set(keep)
+    evicted = []
+    with conn, closing(conn.cursor()) as cur:
+        if ttl:
+            cur.execute(
+                "SELECT fingerprint FROM stems WHERE last_access < ?",
+                (time.time() - ttl,)
+            )
+            evicted.extend(row[0] for row in cur.fetchall() if row[0] not in keep)
+            _delete_entries(cur, evicted, remove_files=True)
+
+        cur.execute("SELECT COALESCE(SUM(bytes), 0) FROM stems")
+        total = cur.fetchone()[0]
+        if total > max_bytes:
+            cur.execute("SELECT fingerprint, bytes FROM stems ORDER BY last_access")
+            victims = []
+            for fingerprint, size in cur.fetchall():
+                if total <= max_bytes:
+                    break
+                if fingerprint in keep:
+                    continue
+                victims.append(fingerprint)
+                total -= size
+            _delete_entries(cur, victims, remove_files=True)
+            evicted.extend(victims)
+    if evicted:
+        logger.info("Evicted %d cached stem entries", len(evicted))
+    return len(evicted)
+
+
+def _file_identity(audio_path: str) -> tuple | None:
+    """
+    (real path, size, mtime in ns) of a file, or None if it cannot be read.
+    """
+    try:
+        st = os.stat(audio_path)
+    except OSError:
+        return None
+    return os.path.realpath(audio_path), st.st_size, st.st_mtime_ns
+
+
+def get_file_fingerprint(
+    audio_path: str, conn: sqlite3.Connection, model: str
+) -> str | None:
+    """
+    Fingerprint recorded for a file, if the file is unchanged since
+    (same size and modification time). Returns str or None.
+    """
+    identity = _file_identity(audio_path)
+    if identity is None:
+        return None
+    path, size, mtime_ns = identity
+    with closing(conn.cursor()) as cur:
+        cur.execute(SQL_LOOKUP_FILE, (path, model, size, mtime_ns))
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def remember_file_fingerprint(
+    audio_path: str, fingerprint: str, conn: sqlite3.Connection, model: str
+) -> None:
+    """
+    Record the fingerprint of a file's audio under its current identity.
+    """
+    identity = _file_identity(audio_path)
+    if identity is None:
+        return
+    path, size, mtime_ns = identity
+    with conn:
+        conn.execute(SQL_INSERT_FILE, (path, model, size, mtime_ns, fingerprint))
+
+
+def lyrics_key(
+    fingerprint: str, model: str, language: str, options: dict | None = None
+) -> str:
+    """
+    Cache key of a transcription: the same audio transcribed by the same
+    model, in the same language and with the same options.
+    """
+    payload = json.dumps(
+        [fingerprint, model, language, options or {}], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_lyrics(
+    fingerprint: str,
+    conn: sqlite3.Connection,
+    model: str,
+    language: str,
+    options: dict | None = None,
+) -> list | None:
+    """
+    Retrieve cached lyrics (a list of segment dicts). Returns list or None.
+    """
+    key = lyrics_key(fingerprint, model, language, options)
+    with closing(conn.cursor()) as cur:
+        cur.execute(SQL_LOOKUP_LYRICS, (key,))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    with conn:
+        conn.execute(SQL_TOUCH_LYRICS, (time.time(), key))
+    return json.loads(row[0])
+
+
+def cache_lyrics(
+    fingerprint: str,
+    lyrics: list,
+    conn: sqlite3.Connection,
+    model: str,
+    language: str,
+    options: dict | None = None,
+) -> None:
+    """
+    Store a transcription (a list of segment dicts) for an audio fingerprint.
+    """
+    lyrics_json = json.dumps(lyrics)
+    now = time.time()
+    with conn:
+        conn.execute(SQL_INSERT_LYRICS, (
+            lyrics_key(fingerprint, model, language, options), fingerprint, model,
+            language, json.dumps(options or {}, sort_keys=True, default=str),
+            lyrics_json, len(lyrics_json), now, now,
+        ))
+
+
+def evict_lyrics(
+    conn: sqlite3.Connection,
+    max_bytes: int | None = None,
+    ttl: float | None = None,
+) -> int:
+    """
+    Evict cached lyrics idle for longer than `ttl` seconds, then least
+    recently used ones until their total size is within `max_bytes`.
+    Returns the number of entries evicted.
+    """
+    max_bytes = MAX_LYRICS_BYTES if max_bytes is None else max_bytes
+    ttl = CACHE_TTL if ttl is None else ttl
+    evicted = []
+    with conn, closing(conn.cursor()) as cur:
+        if ttl:
+            cur.execute("SELECT key FROM lyrics WHERE last_access < ?", (time.time() - ttl,))
+            evicted.extend(row[0] for row in cur.fetchall())
+
+        expired = set(evicted)
+        cur.execute("SELECT key, bytes FROM lyrics ORDER BY last_access")
+        rows = [(key, size) for key, size in cur.fetchall() if key not in expired]
+        total = sum(size for _, size in rows)
+        for key, size in rows:
+            if total <= max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+        cur.executemany("DELETE FROM lyrics WHERE key = ?", [(key,) for key in evicted])
+    if evicted:
+        logger.info("Evicted %d cached lyrics entries", len(evicted))
+    return len(evicted)
+
+
+def sweep_missing(conn: sqlite3.Connection) -> int:
+    """
+    Drop cache entries whose stem files no longer exist, and remembered
+    fingerprints of files that are gone.
+    Returns the number of stem entries removed.
+    """
+    with conn, closing(conn.cursor()) as cur:
+        cur.execute("SELECT fingerprint, stems_json FROM stems")
+        dead = [
+            fingerprint for fingerprint, stems_json in cur.fetchall()
+            if not _stem_files_exist(json.loads(stems_json))
+        ]
+        _delete_entries(cur, dead)
+        cur.execute("SELECT DISTINCT path FROM file_fingerprints")
+        gone = [(path,) for path, in cur.fetchall() if not os.path.exists(path)]
+        cur.executemany("DELETE FROM file_fingerprints WHERE path = ?", gone)
+    if dead:
+        logger.info("Swept %d cached stem entries with missing files", len(dead))
+    return len(dead)
+
+
+def start_cache_janitor(
+    interval: float = SWEEP_INTERVAL,
+    db_path: str | None = None,
+    max_bytes: int | None = None,
+    ttl: float | None = None,
+) -> threading.Event:
+    """
+    Run sweep_missing, evict_stems and evict_lyrics every `interval` seconds
+    in a daemon thread. Returns an Event that stops the thread when set.
+    """
+    stop = threading.Event()
+
+    def run() -> None:
+        conn = init_cache(db_path)
+        try:
+            while not stop.is_set():
+                try:
+                    sweep_missing(conn)
+                    evict_stems(conn, max_bytes=max_bytes, ttl=ttl)
+                    evict_lyrics(conn, ttl=ttl)
+                except sqlite3.Error as e:
+                    logger.warning("Cache maintenance failed: %s", e)
+                stop.wait(interval)
+        finally:
+            close_cache()
+
+    threading.Thread(target=run, name="stem-cache-janitor", daemon=True).start()
+    return stop
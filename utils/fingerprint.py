@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+fingerprint.py ──────────────────────────────────────────────────────────────
+Summary: Content fingerprints for decoded audio and canonical source URLs
+Inputs : audio path or PCM samples, separator model, source URL
+Outputs: hex digest identifying the separation result, normalized URL
+ModLog : 2026-10-18 Initial version
+         2026-10-18 Player/playlist params stripped on YouTube hosts only
+"""
+
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+from src.audio_processing.audio_io import load_pcm
+
+# Audio is fingerprinted as mono 22.05kHz: enough to tell tracks apart while
+# ignoring container, channel layout and sample-rate differences.
+FINGERPRINT_SAMPLE_RATE = 22050
+# Leading/trailing samples quieter than this (-60 dBFS) are trimmed.
+SILENCE_FLOOR = 1e-3
+
+YOUTUBE_HOSTS = {
+    "youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com",
+}
+# Tracking parameters that never change the media being served, on any host.
+IGNORED_PARAMS = {"fbclid", "gclid"}
+# YouTube player and sharing context. Only meaningless once a video id is
+# known; a bare playlist URL keeps its "list", which names the content.
+YOUTUBE_IGNORED_PARAMS = {"t", "start", "si", "feature", "index", "pp", "ab_channel"}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a source URL so links to the same media compare equal
+
+    YouTube short links, shorts and mobile/music hosts collapse to
+    ``https://www.youtube.com/watch?v=<id>``; other YouTube URLs lose their
+    player and sharing parameters. Elsewhere only tracking parameters are
+    dropped, since e.g. ``t`` or ``list`` may select the content.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    path = parts.path
+
+    video_id = None
+    if host == "youtu.be":
+        video_id = path.lstrip("/").split("/")[0]
+    elif host in YOUTUBE_HOSTS:
+        if path.startswith(("/shorts/", "/live/", "/embed/")):
+            video_id = path.split("/")[2]
+        else:
+            video_id = dict(parse_qsl(parts.query)).get("v")
+    if video_id:
+        return f"https://www.youtube.com/watch?v={video_id}"
+
+    ignored = IGNORED_PARAMS | YOUTUBE_IGNORED_PARAMS if host in YOUTUBE_HOSTS else IGNORED_PARAMS
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in ignored and not k.startswith("utm_")
+    ]
+    return urlunsplit((
+        parts.scheme.lower() or "https", host, path.rstrip("/") or "/",
+        urlencode(sorted(query)), "",
+    ))
+
+
+def fingerprint_pcm(samples: np.ndarray, model: str) -> str:
+    """
+    Fingerprint mono PCM at FINGERPRINT_SAMPLE_RATE for a separator model
+
+    Samples are trimmed of leading/trailing silence, peak-normalized and
+    quantized to 16 bits so gain changes and padding do not change the key.
+    """
+    mono = np.asarray(samples, dtype=np.float32)
+    if mono.ndim > 1:
+        mono = mono.mean(axis=1)
+    loud = np.flatnonzero(np.abs(mono) > SILENCE_FLOOR)
+    if loud.size:
+        mono = mono[loud[0]:loud[-1] + 1]
+        mono = mono / np.abs(mono).max()
+    pcm = np.round(mono * 32767).astype("<i2")
+
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(pcm.tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_file(audio_path: str, model: str) -> str:
+    """Decode an audio file and fingerprint it for a separator model"""
+    samples = load_pcm(audio_path, sample_rate=FINGERPRINT_SAMPLE_RATE, channels=1)
+    return fingerprint_pcm(samples, model)
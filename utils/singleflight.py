@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+singleflight.py ─────────────────────────────────────────────────────────────
+Summary: Coalesce concurrent async calls for the same key into one execution
+Inputs : key (hashable), coroutine factory
+Outputs: the shared result of the single in-flight call
+ModLog : 2026-10-18 Initial version
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; callers arriving while it is in
+    flight await the same result (or exception) instead of starting another.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await fn() for `key`, joining the in-flight call if there is one.
+        A caller being cancelled does not cancel the shared call.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        True while a call for `key` is running.
+        """
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -3,30 +3,65 @@
 stem_splitter.py ───────────────────────── Produce stems via yt-dlp + Spleeter
 Author : ChatGPT for CBW  ✦ 2025-05-23
 ModLog : 2025-05-23 Updated for yt-dlp + FastAPI readiness
+         2026-10-18 Reuse warm separators from the shared model pool
+         2026-10-18 Look up stems by decoded-audio fingerprint before separating
+         2026-10-18 Enforce the cache disk budget after storing new stems
+         2026-10-18 Requested stems pick the cheapest model; only they are written
+         2026-10-18 Separators are leased exclusively (Spleeter is not reentrant)
+         2026-10-18 Stems written per fingerprint; fresh stems survive eviction
+         2026-10-18 Private download directory per call; stems published atomically
 """
 import os
 import logging
-from spleeter.separator import Separator
+import tempfile
 from rich.console import Console
 from rich.progress import SpinnerColumn, TextColumn, Progress
-from utils.cache import init_cache, get_cached_stems, cache_stems
+from utils.cache import (
+    init_cache, get_cached_stems, get_stems_by_fingerprint, alias_url, cache_stems,
+    evict_stems
+)
+from utils.fingerprint import fingerprint_file
+from src.audio_processing.audio_io import load_pcm
+from src.audio_processing.backends import backend_for_stems, normalize_stems, select_stems
+from src.audio_processing.chunking import WavStreamWriter
+from src.audio_processing.model_pool import spleeter_separator
 import yt_dlp
 
 # Logging & console
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 console = Console()
 
-def split_stems(youtube_url: str, output_dir: str) -> dict:
+MODEL = "spleeter:4stems"
+SAMPLE_RATE = 44100
+
+def stems_model(stems=None) -> tuple:
+    """Cheapest Spleeter model for the requested stems, and its cache key"""
+    stems = normalize_stems(stems)
+    if stems is None:
+        return MODEL, MODEL
+    model = backend_for_stems(stems)
+    return model, f"{model}|{'+'.join(stems)}"
+
+def split_stems(youtube_url: str, output_dir: str, stems=None) -> dict:
+    """Separate a YouTube track; `stems` (e.g. ["instrumental"]) limits the work"""
     console.log(f"[bold]Processing URL:[/bold] {youtube_url}")
 
+    stems = normalize_stems(stems)
+    model, cache_model = stems_model(stems)
     conn = init_cache()
-    cached = get_cached_stems(youtube_url, conn)
+    cached = get_cached_stems(youtube_url, conn, model=cache_model)
     if cached:
         console.log("[green]Using cached stems[/green]")
         return cached
 
     os.makedirs(output_dir, exist_ok=True)
-    audio_path = os.path.join(output_dir, "audio.mp4")
+    # Concurrent calls share output_dir, so each downloads into its own directory
+    with tempfile.TemporaryDirectory(prefix="download-", dir=output_dir) as work_dir:
+        return _split_download(youtube_url, output_dir, work_dir, stems, model, cache_model, conn)
+
+def _split_download(youtube_url, output_dir, work_dir, stems, model, cache_model, conn) -> dict:
+    """Download into work_dir, then separate unless the audio is already cached"""
+    audio_path = os.path.join(work_dir, "audio.mp4")
 
     # Download via yt-dlp
     ydl_opts = {"format": "bestaudio", "outtmpl": audio_path}
@@ -34,18 +69,37 @@ def split_stems(youtube_url: str, output_dir: str) -> dict:
         console.log("Downloading audio with yt-dlp...")
         ydl.download([youtube_url])
 
+    # Same audio under another URL (mirror, re-upload, playlist link)?
+    fingerprint = fingerprint_file(audio_path, cache_model)
+    cached = get_stems_by_fingerprint(fingerprint, conn)
+    if cached:
+        console.log("[green]Using cached stems for identical audio[/green]")
+        alias_url(youtube_url, fingerprint, conn, model=cache_model)
+        return cached
+
     # Separation with Spleeter
     with Progress(SpinnerColumn(), TextColumn("{task.description}"), console=console) as progress:
-        sep = progress.add_task("Separating stems...", total=None)
-        separator = Separator("spleeter:4stems")
-        separator.separate_to_file(audio_path, output_dir)
+        sep = progress.add_task(f"Separating stems ({model})...", total=None)
+        waveform = load_pcm(audio_path, sample_rate=SAMPLE_RATE)
+        with spleeter_separator(model) as separator:
+            separated = select_stems(separator.separate(waveform), stems)
         progress.stop_task(sep)
 
-    stems = {}
-    stem_dir = os.path.join(output_dir, "audio")
-    for fname in os.listdir(stem_dir):
-        stems[fname.replace(".wav", "")] = os.path.join(stem_dir, fname)
-    console.log(f"[green]Generated stems:[/green] {list(stems.keys())}")
+    # Only the requested stems are ever written, in a directory of their own
+    # so cache eviction of another track never touches them. Each file is
+    # written privately and renamed into place, since a concurrent call for
+    # the same audio under another URL writes the same paths.
+    paths = {}
+    stem_dir = os.path.join(output_dir, "audio", fingerprint)
+    os.makedirs(stem_dir, exist_ok=True)
+    for name, samples in separated.items():
+        partial = os.path.join(work_dir, f"{name}.wav")
+        with WavStreamWriter(partial, SAMPLE_RATE, samples.shape[1]) as writer:
+            writer.write(samples)
+        paths[name] = os.path.join(stem_dir, f"{name}.wav")
+        os.replace(partial, paths[name])
+    console.log(f"[green]Generated stems:[/green] {list(paths.keys())}")
 
-    cache_stems(youtube_url, stems, conn)
-    return stems
+    cache_stems(youtube_url, paths, conn, fingerprint=fingerprint, model=cache_model)
+    evict_stems(conn, keep=(fingerprint,))
+    return paths